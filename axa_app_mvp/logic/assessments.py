@@ -0,0 +1,98 @@
+"""
+Stored detections of finished assessments.
+
+Each assessment's detections are saved under an assessment id in
+``outputs/assessments/<assessment_id>.json``. When the user changes their
+profile, the assessment is re-scored from these detections with hazard
+mapping and scoring only, without re-uploading the images or running the
+detector again. The profile itself is not stored.
+"""
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Mapping, Optional
+
+from axa_app_mvp.logic.detection import Detection, detections_to_dicts
+
+logger = logging.getLogger(__name__)
+
+# Stored detections are deleted after this long
+ASSESSMENT_RETENTION_HOURS = float(os.getenv("ASSESSMENT_RETENTION_HOURS", "168"))
+
+_ASSESSMENT_ID = re.compile(r"^[0-9a-f]{32}$")
+# Seconds between purges of expired assessments, run from save()
+_PURGE_INTERVAL_S = 3600
+
+
+class AssessmentStore:
+    """File-backed store of assessment detections."""
+
+    def __init__(self, root: Path, retention_hours: float = ASSESSMENT_RETENTION_HOURS):
+        self.root = Path(root)
+        self.retention_hours = retention_hours
+        self._last_purge = 0.0
+
+    def _path(self, assessment_id: str) -> Path:
+        if not _ASSESSMENT_ID.match(assessment_id):
+            raise KeyError(assessment_id)
+        return self.root / f"{assessment_id}.json"
+
+    def save(self, detections: Iterable[Mapping], config_version: Optional[str] = None) -> str:
+        """
+        Persist an assessment's detections.
+
+        Args:
+            detections: ``Detection`` records (or detection dicts) of every room
+            config_version: Hazard config the assessment was first scored with
+
+        Returns:
+            The new assessment id
+        """
+        assessment_id = uuid.uuid4().hex
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._path(assessment_id)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({
+                "assessment_id": assessment_id,
+                "created_at": datetime.utcnow().isoformat(),
+                "config_version": config_version,
+                "detections": detections_to_dicts(detections),
+            }, f)
+        os.replace(tmp, path)
+
+        if self.retention_hours > 0 and time.time() - self._last_purge > _PURGE_INTERVAL_S:
+            self._last_purge = time.time()
+            self.purge(self.retention_hours * 3600)
+        return assessment_id
+
+    def load(self, assessment_id: str) -> Optional[List[Detection]]:
+        """Return an assessment's detections, or None if there is no such assessment."""
+        try:
+            with open(self._path(assessment_id)) as f:
+                stored = json.load(f)
+        except (KeyError, FileNotFoundError, json.JSONDecodeError):
+            return None
+        return [Detection.from_dict(detection) for detection in stored["detections"]]
+
+    def purge(self, max_age_s: float) -> int:
+        """Delete assessments older than ``max_age_s``; returns how many were deleted."""
+        deleted = 0
+        if not self.root.exists():
+            return deleted
+        cutoff = time.time() - max_age_s
+        for path in self.root.glob("*.json"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    deleted += 1
+            except FileNotFoundError:
+                pass  # purged by another worker
+        if deleted:
+            logger.info(f"Purged {deleted} expired assessments")
+        return deleted
@@ -0,0 +1,133 @@
+"""
+CPU inference backends for the hazard detector.
+
+Every backend is served through ``ultralytics.YOLO``, which loads PyTorch
+weights as well as exported ONNX and OpenVINO artifacts and returns the same
+``Results`` objects (boxes, classes, confidences, class names) for all of
+them, so the detection post-processing does not depend on the engine.
+
+Exported artifacts are produced once with ``scripts/export_model.py`` and
+cached next to the PyTorch weights.
+"""
+import logging
+from dataclasses import dataclass
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Optional
+
+from ultralytics import YOLO
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Backend:
+    """An inference engine and the ultralytics export format it loads."""
+    name: str
+    export_format: Optional[str]  # None: load the PyTorch weights directly
+    artifact_suffix: str
+    requires: str = ""  # Python package the engine runs on, beyond ultralytics
+    supports_int8: bool = False
+
+
+BACKENDS = {
+    "pytorch": Backend("pytorch", None, ".pt"),
+    "onnx": Backend("onnx", "onnx", ".onnx", requires="onnxruntime", supports_int8=True),
+    "openvino": Backend("openvino", "openvino", "_openvino_model", requires="openvino"),
+}
+
+PRECISIONS = ("fp32", "int8")
+
+
+def get_backend(name: str) -> Backend:
+    """Look up a backend by name, raising ValueError for unknown names."""
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown inference backend: {name} (choose from {', '.join(BACKENDS)})")
+
+
+def check_requirements(backend: Backend):
+    """Raise ImportError naming the package to install if ``backend``'s engine is missing."""
+    if backend.requires and find_spec(backend.requires) is None:
+        raise ImportError(f"The {backend.name} backend needs {backend.requires}: pip install {backend.requires}")
+
+
+def artifact_path(model_path: Path, backend: Backend, precision: str = "fp32") -> Path:
+    """Path of the model artifact ``backend`` loads, e.g. models/yolov8n.onnx
+    or models/yolov8n_int8.onnx."""
+    model_path = Path(model_path)
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision} (choose from {', '.join(PRECISIONS)})")
+    if precision == "int8" and not backend.supports_int8:
+        raise ValueError(f"INT8 is not supported by the {backend.name} backend")
+    if backend.export_format is None:
+        return model_path
+    stem = model_path.stem if precision == "fp32" else f"{model_path.stem}_{precision}"
+    return model_path.with_name(stem + backend.artifact_suffix)
+
+
+def export_model(model_path: Path, backend_name: str, imgsz: int = 640, force: bool = False) -> Path:
+    """
+    Export PyTorch weights for a backend, reusing a cached artifact when it is
+    newer than the weights.
+
+    Args:
+        model_path: Path to the PyTorch ``.pt`` weights
+        backend_name: Key of ``BACKENDS``
+        imgsz: Export input size
+        force: Re-export even if a cached artifact exists
+
+    Returns:
+        Path to the exported artifact
+
+    Raises:
+        ImportError: If the backend's engine is not installed
+    """
+    model_path = Path(model_path)
+    backend = get_backend(backend_name)
+    target = artifact_path(model_path, backend)
+    if backend.export_format is None:
+        return target
+    # Checked before exporting so no artifact is built that could not be served
+    check_requirements(backend)
+
+    if not force and target.exists() and target.stat().st_mtime >= model_path.stat().st_mtime:
+        logger.info(f"Using cached {backend.name} export at {target}")
+        return target
+
+    # Dynamic axes so one export serves every batch size and letterbox shape
+    exported = YOLO(str(model_path)).export(format=backend.export_format, imgsz=imgsz, dynamic=True)
+    exported = Path(exported)
+    if exported != target:
+        exported.replace(target)
+    logger.info(f"Exported {model_path} for {backend.name} to {target}")
+    return target
+
+
+def load_model(model_path: Path, backend_name: str = "pytorch", precision: str = "fp32"):
+    """
+    Load the detector for a backend.
+
+    Args:
+        model_path: Path to the PyTorch ``.pt`` weights the artifact was exported from
+        backend_name: Key of ``BACKENDS``
+        precision: 'fp32', or 'int8' for the quantized model (ONNX only)
+
+    Returns:
+        ``ultralytics.YOLO`` model callable on a list of images
+
+    Raises:
+        ImportError: If the backend's engine is not installed
+        FileNotFoundError: If the backend's artifact has not been exported yet
+    """
+    backend = get_backend(backend_name)
+    check_requirements(backend)
+    path = artifact_path(model_path, backend, precision)
+    if backend.export_format is not None and not path.exists():
+        if precision == "int8":
+            hint = "python scripts/evaluate_quantized.py --images <calibration folder>"
+        else:
+            hint = f"python scripts/export_model.py --backend {backend.name}"
+        raise FileNotFoundError(f"No {backend.name} {precision} model at {path}; run '{hint}' first")
+    return YOLO(str(path), task="detect")
@@ -0,0 +1,251 @@
+"""
+Portfolio-scale re-scoring of stored assessments.
+
+Records of (profile, detected objects or hazards) are read lazily from a
+JSONL or CSV file, scored in chunks with the same array formula as
+``score_hazards`` and written out as they complete, so memory stays bounded
+by the chunk size and number of chunks in flight. Chunks are spread over a
+process pool; every worker scores against the same snapshot of config.json.
+
+JSONL records::
+
+    {"id": "u1", "profile": {"mobility": 0.8, "vision": 0.2, "cognition": 0.5},
+     "detected_objects": [{"object": "rug", "location": "hallway"}, "cord"]}
+    {"id": "u2", "mobility": 1, "hazards": ["loose_rugs", {"hazard_id": "cords"}]}
+
+CSV columns: ``id, mobility, vision, cognition`` and ``objects`` and/or
+``hazard_ids`` holding ``;``-separated labels.
+"""
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from axa_app_mvp.logic.hazard_scoring import (
+    DEFAULT_CONFIG_PATH,
+    PROFILE_FACTORS,
+    HazardConfig,
+    compute_hazard_scores
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+
+# Config snapshot of a pool worker, set by _init_worker
+_config: Optional[HazardConfig] = None
+
+
+def read_records(path, parse: bool = True) -> Iterator[Any]:
+    """
+    Yield records from a JSONL or CSV file ('-' reads JSONL from stdin).
+
+    Args:
+        path: Input file
+        parse: If False, JSONL lines are yielded unparsed for ``score_chunk``
+            to parse, which moves JSON decoding into the pool workers
+    """
+    path = str(path)
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                yield _csv_record(row)
+        return
+
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield _parse_line(line) if parse else line
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def _parse_line(line: str) -> Any:
+    try:
+        return json.loads(line)
+    except json.JSONDecodeError as e:
+        return {"error": f"Invalid JSON: {e}"}
+
+
+def _csv_record(row: Dict[str, str]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"id": row["id"]} if row.get("id") else {}
+    for factor in PROFILE_FACTORS:
+        if row.get(factor):
+            record[factor] = row[factor]
+    if row.get("hazard_ids"):
+        record["hazards"] = [h.strip() for h in row["hazard_ids"].split(";") if h.strip()]
+    if row.get("objects"):
+        record["detected_objects"] = [o.strip() for o in row["objects"].split(";") if o.strip()]
+    return record
+
+
+def _hazard_ids(record: Dict[str, Any], config: HazardConfig) -> List[str]:
+    """Hazard ids of a record, mapping detected objects like ``map_detected_objects_to_hazards``."""
+    if "hazards" in record:
+        return [h if isinstance(h, str) else h["hazard_id"] for h in record["hazards"]]
+    ids = []
+    for item in record.get("detected_objects") or []:
+        hazard = config.get_hazard_for_object(item if isinstance(item, str) else item["object"])
+        if hazard:
+            ids.append(hazard["id"])
+    return ids
+
+
+def score_chunk(records: List[Any], config: HazardConfig, start: int = 0) -> List[Dict[str, Any]]:
+    """
+    Score a list of records with one set of array operations.
+
+    Totals, clamping and risk levels match ``score_hazards`` for the same
+    profile and hazards.
+
+    Args:
+        records: Record dicts, or JSON strings of them
+        config: Config to score against
+        start: Position of the first record in the input; records without an
+            id are identified by their 1-based position
+
+    Returns:
+        One result per record, in order: its id, total_score, risk_level,
+        color, number of scored hazards and config_version, or its id and
+        an error
+    """
+    records = [_parse_line(record) if isinstance(record, str) else record for record in records]
+    ids = [record.get("id", start + i + 1) if isinstance(record, dict) else start + i + 1
+           for i, record in enumerate(records)]
+    results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+    parsed = []  # (result index, profile vector, hazard rows, hazards given)
+    for i, (record, record_id) in enumerate(zip(records, ids)):
+        try:
+            if not isinstance(record, dict):
+                raise ValueError("Record is not a JSON object")
+            if "error" in record:
+                raise ValueError(record["error"])
+            profile = record.get("profile", record)
+            if not isinstance(profile, dict):
+                raise ValueError("Profile is not a JSON object")
+            factors = [float(profile.get(factor, 0)) for factor in PROFILE_FACTORS]
+            hazard_ids = _hazard_ids(record, config)
+        except (KeyError, TypeError, ValueError) as e:
+            results[i] = {"id": record_id, "error": str(e)}
+            continue
+        rows = [config.hazard_index[hazard_id] for hazard_id in hazard_ids if hazard_id in config.hazard_index]
+        parsed.append((i, factors, rows, len(hazard_ids)))
+
+    counts = np.array([len(rows) for _, _, rows, _ in parsed], dtype=np.intp)
+    all_rows = np.fromiter((row for _, _, rows, _ in parsed for row in rows), dtype=np.intp, count=int(counts.sum()))
+    factors = np.repeat(np.array([f for _, f, _, _ in parsed], dtype=np.float64).reshape(-1, len(PROFILE_FACTORS)),
+                        counts, axis=0)
+    _, scores = compute_hazard_scores(config, all_rows, factors)
+
+    # Lay each record's scores out in a zero-padded row so cumsum adds them
+    # left to right, exactly like score_hazards' running total
+    padded = np.zeros((len(parsed), int(counts.max(initial=0)) + 1))
+    record_of = np.repeat(np.arange(len(parsed)), counts)
+    position = np.arange(len(all_rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    padded[record_of, position] = scores
+    totals = np.cumsum(padded, axis=1)[:, -1]
+
+    totals = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+    levels = config.classify_scores(totals)
+
+    for (i, _, rows, given), count, total, level in zip(parsed, counts.tolist(), totals.tolist(), levels.tolist()):
+        result = {"id": ids[i]}
+        if not given:
+            result.update(total_score=0, risk_level="None", color="green")
+        else:
+            band = config.risk_bands[level]
+            result.update(total_score=round(total, 1), risk_level=band["label"], color=band["color"])
+        result.update(hazards=count, config_version=config.version)
+        results[i] = result
+    return results
+
+
+def _init_worker(config_path: str, raw: bytes):
+    global _config
+    _config = HazardConfig(config_path, raw)
+
+
+def _score_chunk_in_worker(records: List[Any], start: int) -> List[Dict[str, Any]]:
+    return score_chunk(records, _config, start)
+
+
+def _chunks(records: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_records(records: Iterable[Any], config_path=DEFAULT_CONFIG_PATH,
+                  workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Score records (see ``score_chunk``) and yield results in input order.
+
+    Args:
+        records: Records as produced by ``read_records`` (parsed or not); consumed lazily
+        config_path: Hazard config to score against; read once up front
+        workers: Scoring processes (default: CPU count); 0 scores in this process
+        chunk_size: Records scored per array operation
+    """
+    raw = Path(config_path).read_bytes()
+    workers = os.cpu_count() or 1 if workers is None else workers
+    if workers <= 0:
+        config = HazardConfig(config_path, raw)
+        for n, chunk in enumerate(_chunks(records, chunk_size)):
+            yield from score_chunk(chunk, config, n * chunk_size)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(str(config_path), raw)) as pool:
+        # At most two chunks per worker are read ahead, which bounds memory
+        pending = deque()
+        for n, chunk in enumerate(_chunks(records, chunk_size)):
+            pending.append(pool.submit(_score_chunk_in_worker, chunk, n * chunk_size))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_results(results: Iterable[Dict[str, Any]], path) -> int:
+    """
+    Write results as JSONL, or CSV if ``path`` ends in .csv ('-' writes JSONL to stdout).
+
+    Returns:
+        Number of results written
+    """
+    path = str(path)
+    written = 0
+    if path.endswith(".csv"):
+        fields = ["id", "total_score", "risk_level", "color", "hazards", "config_version", "error"]
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            for result in results:
+                writer.writerow(result)
+                written += 1
+        return written
+
+    f = sys.stdout if path == "-" else open(path, "w")
+    try:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+            written += 1
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    return written
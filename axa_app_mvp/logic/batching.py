@@ -0,0 +1,231 @@
+"""
+Dynamic micro-batching for inference requests.
+
+Concurrent requests each submit single items; the scheduler groups them
+into batches, flushing when a batch is full or when the oldest waiting item
+has waited ``max_wait_ms``, and runs one ``batch_fn`` call per batch on the
+inference executor.
+
+Admission is bounded: at most ``max_concurrency`` batches run at once and at
+most ``max_queue_depth`` items wait for a batch. Beyond that, callers get a
+``QueueFullError`` straight away (served as 503 with Retry-After) instead of
+queueing until the HTTP timeout. Long one-off jobs such as video scans go
+through ``run_exclusive`` so they take the same slots and count against the
+same limit.
+"""
+import math
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable, List, Optional, Tuple
+
+from axa_app_mvp.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class QueueFullError(Exception):
+    """Raised when the inference queue is at its depth limit."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue is full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class BatchScheduler:
+    """Collects items from concurrent callers into batches."""
+
+    def __init__(self, executor, batch_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 8, max_wait_ms: float = 10.0,
+                 max_queue_depth: int = 0, max_concurrency: Optional[int] = None,
+                 name: str = "inference"):
+        """
+        Args:
+            executor: ``InferenceExecutor`` the batches run on
+            batch_fn: Picklable function taking a list of items and returning
+                one result per item, in order
+            max_batch_size: Flush as soon as this many items are waiting
+            max_wait_ms: Flush once the oldest item has waited this long
+            max_queue_depth: Reject items once this many are waiting (0: unbounded)
+            max_concurrency: Batches running at once (default: executor workers)
+            name: Prefix for the exported metrics
+        """
+        self.executor = executor
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue_depth = max(0, max_queue_depth)
+        self.max_concurrency = max(1, max_concurrency or getattr(executor, "workers", 1))
+        self._pending = deque()
+        self._exclusive_waiting = 0
+        self._exclusive_running = 0
+        self._loop = None
+        self._wakeup = None
+        self._slots = None
+        self._task = None
+
+        self.queue_depth = metrics.gauge(f"{name}_queue_depth", "Items waiting to be batched")
+        self.batch_size = metrics.histogram(
+            f"{name}_batch_size", "Items per dispatched batch", buckets=BATCH_SIZE_BUCKETS
+        )
+        self.batch_wait = metrics.histogram(
+            f"{name}_batch_wait_ms", "Time an item waited before its batch was dispatched"
+        )
+        self.batch_run = metrics.histogram(
+            f"{name}_batch_run_ms", "Time a dispatched batch took to run on the executor"
+        )
+        self.exclusive_run = metrics.histogram(
+            f"{name}_exclusive_run_ms", "Time a one-off job (e.g. a video scan) took to run on the executor"
+        )
+        self.batches = metrics.counter(f"{name}_batches_total", "Batches dispatched")
+        self.rejected = metrics.counter(f"{name}_rejected_total", "Items rejected because the queue was full")
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the previous event loop is gone (e.g. between tests)
+            self._loop = loop
+            self._pending.clear()
+            self._exclusive_waiting = self._exclusive_running = 0
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._task = loop.create_task(self._dispatch_loop())
+
+    @property
+    def depth(self) -> int:
+        """Items and one-off jobs waiting to be dispatched."""
+        return len(self._pending) + self._exclusive_waiting
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has likely drained, from recent batch and job run times."""
+        batch_ms = self.batch_run.percentile(50) or 1000.0
+        rounds = math.ceil(len(self._pending) / self.max_batch_size / self.max_concurrency)
+        wait_ms = rounds * batch_ms
+        jobs = self._exclusive_waiting + self._exclusive_running
+        if jobs:
+            wait_ms += jobs * (self.exclusive_run.percentile(50) or 10000.0) / self.max_concurrency
+        return max(1, math.ceil(wait_ms / 1000))
+
+    def check_capacity(self, count: int = 1):
+        """
+        Raise QueueFullError if ``count`` more items would exceed the queue depth limit.
+
+        Callers submitting several items for one request check once up front
+        so a request is admitted or rejected as a whole.
+        """
+        if self.max_queue_depth and self.depth + count > self.max_queue_depth:
+            self.rejected.inc(count)
+            raise QueueFullError(self.retry_after())
+
+    async def submit(self, item: Any, check_capacity: bool = True) -> Any:
+        """Queue one item and wait for its result from the batch it lands in."""
+        result, _, _ = await self.submit_timed(item, check_capacity)
+        return result
+
+    async def submit_timed(self, item: Any, check_capacity: bool = True) -> Tuple[Any, float, float]:
+        """
+        Queue one item and wait for its result.
+
+        Args:
+            item: Item passed to ``batch_fn``
+            check_capacity: Enforce the queue depth limit (see ``check_capacity``)
+
+        Returns:
+            (result, milliseconds queued before dispatch, milliseconds its batch ran)
+
+        Raises:
+            QueueFullError: If the queue is at its depth limit
+        """
+        if check_capacity:
+            self.check_capacity()
+        self._ensure_started()
+        future = self._loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        self.queue_depth.set(self.depth)
+        self._wakeup.set()
+        return await future
+
+    async def run_exclusive(self, fn: Callable, *args, check_capacity: bool = True) -> Any:
+        """
+        Run a one-off job on the executor in one of the batch slots.
+
+        The job is admitted like one queued item and counts towards the queue
+        depth until a slot is free, so batches queued behind it and the
+        Retry-After estimate account for it.
+
+        Raises:
+            QueueFullError: If the queue is at its depth limit
+        """
+        if check_capacity:
+            self.check_capacity()
+        self._ensure_started()
+        self._exclusive_waiting += 1
+        self.queue_depth.set(self.depth)
+        try:
+            await self._slots.acquire()
+        finally:
+            self._exclusive_waiting -= 1
+            self.queue_depth.set(self.depth)
+        self._exclusive_running += 1
+        start = time.perf_counter()
+        try:
+            result = await self.executor.run(fn, *args)
+            self.exclusive_run.observe((time.perf_counter() - start) * 1000)
+            return result
+        finally:
+            self._exclusive_running -= 1
+            self._slots.release()
+
+    async def _dispatch_loop(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Wait until the batch is full or the oldest item is due
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            size = min(len(self._pending), self.max_batch_size)
+            batch = [self._pending.popleft() for _ in range(size)]
+            self.queue_depth.set(self.depth)
+
+            now = time.perf_counter()
+            waits = [(now - queued_at) * 1000 for _, _, queued_at in batch]
+            for wait_ms in waits:
+                self.batch_wait.observe(wait_ms)
+            self.batch_size.observe(size)
+            self.batches.inc()
+
+            self._loop.create_task(self._run_batch(batch, waits))
+
+    async def _run_batch(self, batch, waits):
+        start = time.perf_counter()
+        try:
+            results = await self.executor.run(self.batch_fn, [item for item, _, _ in batch])
+        except Exception as e:
+            logger.error(f"Inference batch of {len(batch)} failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            run_ms = (time.perf_counter() - start) * 1000
+            self.batch_run.observe(run_ms)
+            for (_, future, _), wait_ms, result in zip(batch, waits, results):
+                if not future.done():
+                    future.set_result((result, wait_ms, run_ms))
+        finally:
+            self._slots.release()
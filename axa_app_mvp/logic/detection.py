@@ -0,0 +1,212 @@
+"""
+Object detection helpers for room hazard assessment.
+
+Runs the YOLO detector over every room image of an assessment in a single
+batched forward pass and converts the raw results into the ``Detection``
+records consumed by ``map_detected_objects_to_hazards``.
+"""
+import time
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from axa_app_mvp.logic.preprocessing import Letterbox
+
+
+class Detection(Mapping):
+    """
+    One detected object: object label, location, confidence and integer box.
+
+    A slotted record instead of a dict with a nested bbox dict, since busy
+    scans produce many of them and they are shared by the detection cache
+    (treat them as immutable). It reads like the JSON it is sent as
+    (``detection["bbox"]["x1"]``, equality with dicts); ``to_dict`` builds
+    that JSON at the response edge.
+    """
+    __slots__ = ("object", "location", "confidence", "x1", "y1", "x2", "y2")
+    _KEYS = ("object", "location", "confidence", "bbox")
+
+    def __init__(self, object: str, location: str, confidence: float, x1: int, y1: int, x2: int, y2: int):
+        self.object = object
+        self.location = location
+        self.confidence = confidence
+        self.x1, self.y1, self.x2, self.y2 = x1, y1, x2, y2
+
+    @property
+    def bbox(self) -> Dict[str, int]:
+        return {"x1": self.x1, "y1": self.y1, "x2": self.x2, "y2": self.y2}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def __repr__(self) -> str:
+        return f"Detection({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # Pickled as constructor arguments when returned from worker processes
+        return Detection, (self.object, self.location, self.confidence, self.x1, self.y1, self.x2, self.y2)
+
+    def with_location(self, location: str) -> "Detection":
+        """The same detection in another location."""
+        return Detection(self.object, location, self.confidence, self.x1, self.y1, self.x2, self.y2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"object": self.object, "location": self.location, "confidence": self.confidence,
+                "bbox": self.bbox}
+
+    @classmethod
+    def from_dict(cls, detection: Dict[str, Any]) -> "Detection":
+        """Rebuild a detection from its ``to_dict`` form."""
+        bbox = detection["bbox"]
+        return cls(detection["object"], detection["location"], detection["confidence"],
+                   bbox["x1"], bbox["y1"], bbox["x2"], bbox["y2"])
+
+
+def detections_to_dicts(detections: Iterable[Mapping]) -> List[Dict[str, Any]]:
+    """JSON-serialisable dicts of detections (``Detection`` records or dicts)."""
+    return [d.to_dict() if isinstance(d, Detection) else d for d in detections]
+
+
+def _to_numpy(values) -> np.ndarray:
+    """Convert a (possibly torch) tensor to a numpy array in one transfer."""
+    if hasattr(values, "cpu"):
+        values = values.cpu().numpy()
+    return np.asarray(values)
+
+
+def _detection_arrays(result, classes: Optional[List[int]] = None,
+                      min_conf: Optional[float] = None,
+                      letterbox: Optional[Letterbox] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Filtered (class ids, confidences, xyxy boxes) arrays of one YOLO result."""
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty(0, np.int64), np.empty(0, np.float64), np.empty((0, 4), np.float64)
+
+    cls_ids = _to_numpy(boxes.cls).astype(np.int64)
+    confidences = _to_numpy(boxes.conf).astype(np.float64)
+    xyxy = _to_numpy(boxes.xyxy)
+
+    keep = None
+    if classes is not None:
+        keep = np.isin(cls_ids, classes)
+    if min_conf is not None:
+        above = confidences >= min_conf
+        keep = above if keep is None else keep & above
+    if keep is not None:
+        cls_ids, confidences, xyxy = cls_ids[keep], confidences[keep], xyxy[keep]
+    if letterbox is not None:
+        xyxy = letterbox.to_original(xyxy)
+    return cls_ids, confidences, xyxy
+
+
+def _to_records(names: Dict[int, str], room_name: str, cls_ids: np.ndarray,
+                confidences: np.ndarray, xyxy: np.ndarray) -> List[Detection]:
+    """Build detection records from filtered result arrays."""
+    # Truncate towards zero like int() on each coordinate
+    xyxy = xyxy.astype(np.int64)
+    location = room_name.replace('_', ' ')
+    return [
+        Detection(names[cls_id], location, confidence, x1, y1, x2, y2)
+        for cls_id, confidence, (x1, y1, x2, y2)
+        in zip(cls_ids.tolist(), confidences.tolist(), xyxy.tolist())
+    ]
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float,
+        cls_ids: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Greedy non-maximum suppression.
+
+    Args:
+        boxes: (N, 4) xyxy boxes
+        scores: (N,) confidences
+        iou_threshold: Suppress boxes overlapping a kept box by more than this IoU
+        cls_ids: If given, boxes only suppress boxes of the same class
+
+    Returns:
+        Indices of the kept boxes, highest score first
+    """
+    boxes = np.asarray(boxes, dtype=np.float64)
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+    if cls_ids is not None:
+        # Shift each class into its own coordinate range so classes never overlap
+        boxes = boxes + (np.asarray(cls_ids, dtype=np.float64) * (boxes.max() + 1))[:, None]
+
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        width = (np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest])).clip(0)
+        height = (np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest])).clip(0)
+        inter = width * height
+        iou = inter / np.maximum(areas[best] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def detect_image_views(model, views: Sequence[Sequence[Tuple[Any, Letterbox]]], room_names: List[str],
+                       classes: Optional[List[int]] = None, conf: Optional[float] = None,
+                       iou: float = 0.5, timings: Optional[Dict[str, Any]] = None
+                       ) -> List[List[Detection]]:
+    """
+    Run object detection over several views (global view plus tiles) of
+    each image in one batch and merge each image's boxes.
+
+    Args:
+        model: Loaded YOLO model (see ``inference.get_model``)
+        views: Per image, its (model input, Letterbox) views (see ``preprocessing.prepare_views``)
+        room_names: Room each image was taken in, same order as ``views``
+        classes: Only keep boxes of these class ids (applied before NMS)
+        conf: Drop boxes below this confidence
+        iou: IoU above which overlapping same-class boxes from different
+            views are merged
+        timings: If given, filled with 'model_ms' (the forward pass over all
+            views) and 'postprocess_ms' (one entry per image)
+
+    Returns:
+        One list of detections per image, in input order, with boxes in
+        full-resolution image coordinates
+    """
+    flat = [view for image_views in views for view in image_views]
+    if not flat:
+        return []
+
+    kwargs = {"verbose": False}
+    if classes is not None:
+        kwargs["classes"] = classes
+    if conf is not None:
+        kwargs["conf"] = conf
+    start = time.perf_counter()
+    results = iter(model([image for image, _ in flat], **kwargs))
+    if timings is not None:
+        timings["model_ms"] = (time.perf_counter() - start) * 1000
+        timings["postprocess_ms"] = []
+
+    detections = []
+    for room_name, image_views in zip(room_names, views):
+        start = time.perf_counter()
+        arrays = [_detection_arrays(next(results), classes, conf, view_letterbox)
+                  for _, view_letterbox in image_views]
+        cls_ids, confidences, xyxy = (np.concatenate(parts) for parts in zip(*arrays))
+        if len(arrays) > 1:
+            # The model already ran NMS within each view; merge duplicates across views
+            keep = nms(xyxy, confidences, iou, cls_ids=cls_ids)
+            cls_ids, confidences, xyxy = cls_ids[keep], confidences[keep], xyxy[keep]
+        detections.append(_to_records(model.names, room_name, cls_ids, confidences, xyxy))
+        if timings is not None:
+            timings["postprocess_ms"].append((time.perf_counter() - start) * 1000)
+    return detections
+
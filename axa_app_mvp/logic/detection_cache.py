@@ -0,0 +1,84 @@
+"""
+LRU cache of detection results keyed by image content.
+
+Users often resubmit the same photos, e.g. after changing their profile in
+the ADAPT tool flow. Detections only depend on the image bytes and on the
+detector setup (model, backend, input size, allow-list, confidence floor),
+so a resubmitted photo can skip decoding and YOLO entirely and go straight
+to hazard mapping and scoring.
+
+Entries are stored without the room they were taken in, so the same photo
+uploaded for a different room is still a hit.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from axa_app_mvp.logic.detection import Detection
+from axa_app_mvp.utils.metrics import metrics
+
+
+def content_key(contents: bytes, version: str) -> str:
+    """Cache key for encoded image bytes under a detector ``version``."""
+    digest = hashlib.sha256(contents).hexdigest()
+    return f"{version}:{digest}"
+
+
+class DetectionCache:
+    """Bounded, least-recently-used map of content key -> room-agnostic detections."""
+
+    def __init__(self, max_entries: int = 256, name: str = "detection_cache"):
+        """
+        Args:
+            max_entries: Maximum number of cached images; 0 disables the cache
+            name: Prefix for the exported metrics
+        """
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[str, List[Detection]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.requests = metrics.counter(f"{name}_requests_total", "Detection cache lookups by outcome")
+        self.size = metrics.gauge(f"{name}_entries", "Images held in the detection cache")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, room_name: str) -> Optional[List[Detection]]:
+        """
+        Return cached detections for ``key`` labelled with ``room_name``, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+        self.requests.inc(label="hit" if cached is not None else "miss")
+        if cached is None:
+            return None
+        location = room_name.replace('_', ' ')
+        return [detection.with_location(location) for detection in cached]
+
+    def put(self, key: str, detections: List[Detection]):
+        """Store detections for ``key``, evicting the least recently used entries if full."""
+        if not self.enabled:
+            return
+        with self._lock:
+            # Detections are immutable, so the list can be kept as is; its
+            # locations are replaced on every hit
+            self._entries[key] = list(detections)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.size.set(len(self._entries))
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.size.set(0)
@@ -1,24 +1,74 @@
+import bisect
+import hashlib
 import json
+import logging
+import os
+import re
+import threading
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from axa_app_mvp.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+unmapped_labels = metrics.counter("hazard_unmapped_labels_total",
+                                  "Detected labels that map to no hazard, by label")
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent / "config.json"
+
+# Profile factors, in the column order of HazardConfig.weight_matrix
+PROFILE_FACTORS = ('mobility', 'vision', 'cognition')
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+def _singular(token: str) -> str:
+    """Strip a regular English plural ending ("cords", "boxes", "batteries")."""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 4 and token.endswith(('sses', 'xes', 'ches', 'shes')):
+        return token[:-2]
+    if len(token) > 3 and token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+@lru_cache(maxsize=4096)
+def normalize_label(label: str) -> str:
+    """
+    Normalize a detection label for alias lookup: lower case, words split on
+    any non-alphanumeric character and each word made singular
+    ("Extension_Cords" -> "extension cord").
+    """
+    return ' '.join(_singular(token) for token in _NON_ALNUM.split(label.lower()) if token)
 
 class HazardConfig:
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, raw: Optional[bytes] = None):
         """
         Load and manage the consolidated configuration.
         
         Args:
             config_path: Path to the config.json file
+            raw: Contents of the file, if already read
         """
-        self.config = self._load_config(config_path)
+        if raw is None:
+            raw = Path(config_path).read_bytes()
+        self.config = self._load_config(raw)
         self.hazards = self._process_hazards()
         self.detection_mapping = self._process_detection_mapping()
+        self.alias_index = self._compile_alias_index()
         self.risk_thresholds = self.config['risk_thresholds']
+        self._compile_scoring()
+        self._compile_risk_bands()
+        # The file's own version plus a content hash, so every edit is traceable
+        self.version = f"{self.config.get('version', '0')}+{hashlib.sha256(raw).hexdigest()[:12]}"
     
-    def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """Load and validate the JSON configuration."""
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+    def _load_config(self, raw: bytes) -> Dict[str, Any]:
+        """Parse and validate the JSON configuration."""
+        config = json.loads(raw)
         
         # Basic validation
         required_sections = ['hazards', 'detection_mappings', 'risk_thresholds']
@@ -37,47 +87,249 @@ class HazardConfig:
         return {mapping['object']: mapping['hazard_id'] 
                 for mapping in self.config['detection_mappings']}
     
+    def _compile_alias_index(self) -> Dict[str, str]:
+        """
+        Map the normalized form (see ``normalize_label``) of every mapped
+        object and of its ``aliases`` to its hazard_id.
+        
+        Raises:
+            ValueError: If two labels normalize to the same form but map to
+                different hazards
+        """
+        index: Dict[str, str] = {}
+        for mapping in self.config['detection_mappings']:
+            for label in [mapping['object'], *mapping.get('aliases', [])]:
+                key = normalize_label(label)
+                if index.setdefault(key, mapping['hazard_id']) != mapping['hazard_id']:
+                    raise ValueError(f"Detection label '{label}' maps to both "
+                                     f"{index[key]} and {mapping['hazard_id']}")
+        return index
+    
+    def _compile_scoring(self):
+        """
+        Compile hazard weights into arrays indexed by ``hazard_index[hazard_id]``:
+        ``weight_matrix`` (hazards x PROFILE_FACTORS, missing weights are 1)
+        and ``base_scores`` (missing base scores are 0). ``hazard_rows`` holds
+        the hazard entries in the same order.
+        """
+        self.hazard_index = {hazard_id: i for i, hazard_id in enumerate(self.hazards)}
+        self.hazard_rows = list(self.hazards.values())
+        self.weight_matrix = np.array(
+            [[hazard.get('weights', {}).get(factor, 1) for factor in PROFILE_FACTORS]
+             for hazard in self.hazards.values()],
+            dtype=np.float64).reshape(len(self.hazards), len(PROFILE_FACTORS))
+        self.base_scores = np.array([hazard.get('base_score', 0) for hazard in self.hazards.values()],
+                                    dtype=np.float64)
+    
+    def _compile_risk_bands(self):
+        """
+        Compile risk thresholds into contiguous bands for bisect lookup.
+        
+        ``risk_bands`` holds the thresholds sorted by min_score and
+        ``risk_boundaries`` the min_score of every band but the first. Bands
+        must be adjacent: each min_score is above the previous max_score by
+        at most 1, so integer bands such as 0-33 and 34-66 also cover the
+        fractional scores between them (33.5 is Low).
+        
+        Raises:
+            ValueError: If there are no thresholds or bands overlap or leave a gap
+        """
+        bands = sorted(self.risk_thresholds, key=lambda band: band['min_score'])
+        if not bands:
+            raise ValueError("risk_thresholds must not be empty")
+        for lower, upper in zip(bands, bands[1:]):
+            if upper['min_score'] <= lower['max_score']:
+                raise ValueError(f"Risk thresholds {lower['label']} and {upper['label']} overlap")
+            if upper['min_score'] - lower['max_score'] > 1:
+                raise ValueError(f"Risk thresholds leave a gap between {lower['label']} and {upper['label']}")
+        self.risk_bands = bands
+        self.risk_boundaries = [band['min_score'] for band in bands[1:]]
+        self._risk_boundary_array = np.array(self.risk_boundaries, dtype=np.float64)
+        self._risk_range = (bands[0]['min_score'], bands[-1]['max_score'])
+    
     def get_hazard(self, hazard_id: str) -> Optional[Dict]:
         """Get hazard configuration by ID."""
         return self.hazards.get(hazard_id)
     
     def get_hazard_for_object(self, object_name: str) -> Optional[Dict]:
-        """Get hazard configuration for a detected object."""
-        hazard_id = self.detection_mapping.get(object_name)
+        """
+        Get hazard configuration for a detected object.
+        
+        Exact object names are looked up first, then the normalized label in
+        the alias index, so "rugs", "Power Cord" and "extension_cord" map
+        like "rug" and "cord".
+        """
+        hazard_id = self.detection_mapping.get(object_name) or self.alias_index.get(normalize_label(object_name))
         return self.get_hazard(hazard_id) if hazard_id else None
     
+    def get_detection_class_ids(self, class_names: Dict[int, str]) -> List[int]:
+        """Get the model class ids whose labels map to a hazard (the detection allow-list)."""
+        return sorted(cls_id for cls_id, name in class_names.items()
+                      if self.get_hazard_for_object(name))
+    
     def get_risk_level(self, score: float) -> Dict:
         """Determine risk level based on score."""
-        for threshold in self.risk_thresholds:
-            if threshold['min_score'] <= score <= threshold['max_score']:
-                return threshold
-        return self.risk_thresholds[-1]  # Default to highest risk if no match
+        low, high = self._risk_range
+        if not low <= score <= high:
+            return self.risk_bands[-1]  # Default to highest risk if no match
+        return self.risk_bands[bisect.bisect_right(self.risk_boundaries, score)]
+    
+    def classify_scores(self, scores) -> np.ndarray:
+        """
+        Determine the risk level of many scores at once.
+        
+        Returns:
+            Index into ``risk_bands`` of each score, matching ``get_risk_level``
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        low, high = self._risk_range
+        levels = np.searchsorted(self._risk_boundary_array, scores, side='right')
+        # Out of range (and NaN) scores default to the highest risk
+        return np.where((scores >= low) & (scores <= high), levels, len(self.risk_bands) - 1)
+
+_config_lock = threading.Lock()
+# Path -> ((mtime_ns, size) the config was last checked at, config)
+_configs: Dict[Path, Tuple[Tuple[int, int], HazardConfig]] = {}
+
+def get_hazard_config(config_path=DEFAULT_CONFIG_PATH) -> HazardConfig:
+    """
+    Return the process-wide HazardConfig for a config file.
+    
+    The file is parsed once and shared by all requests. Each call only
+    stats the file; when its mtime or size changes it is re-read and, if
+    the content hash differs, the new config replaces the old one for
+    subsequent calls. Requests already holding the old config keep using it.
+    An edit that leaves the file invalid or missing (e.g. mid-way through a
+    deploy replacing it) is logged and the last good config stays in use.
+    
+    Raises:
+        OSError, ValueError: If the file cannot be loaded and no earlier
+            version of it was
+    """
+    path = Path(config_path)
+    cached = _configs.get(path)
+    try:
+        stat = os.stat(path)
+    except OSError as e:
+        if cached is None:
+            raise
+        logger.error(f"Keeping hazard config {cached[1].version}; cannot stat {path}: {e}")
+        return cached[1]
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    
+    with _config_lock:
+        cached = _configs.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            raw = path.read_bytes()
+            if cached is not None and cached[1].version.endswith(hashlib.sha256(raw).hexdigest()[:12]):
+                config = cached[1]  # touched but unchanged
+            else:
+                config = HazardConfig(path, raw)
+        except (OSError, ValueError, KeyError) as e:
+            if cached is None:
+                raise
+            logger.error(f"Keeping hazard config {cached[1].version}; reloading {path} failed: {e}")
+            return cached[1]
+        if cached is None or config is not cached[1]:
+            logger.info(f"Loaded hazard config {config.version} from {path}")
+        _configs[path] = (stamp, config)
+        return config
+
+class HazardRecord(Mapping):
+    """
+    A detected object mapped to its hazard.
+    
+    Slotted and holding a reference to the hazard's config entry instead of
+    copying its fields; reads like the dict it replaces (hazard_id,
+    hazard_name, location, object, base_score and weights).
+    """
+    __slots__ = ('hazard', 'object', 'location')
+    _KEYS = ('hazard_id', 'hazard_name', 'location', 'object', 'base_score', 'weights')
+    
+    def __init__(self, hazard: Dict, object: str, location: str):
+        self.hazard = hazard
+        self.object = object
+        self.location = location
+    
+    @property
+    def hazard_id(self) -> str:
+        return self.hazard['id']
+    
+    @property
+    def hazard_name(self) -> str:
+        return self.hazard['display_name']
+    
+    @property
+    def base_score(self):
+        return self.hazard['base_score']
+    
+    @property
+    def weights(self) -> Dict:
+        return self.hazard['weights']
+    
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __iter__(self):
+        return iter(self._KEYS)
+    
+    def __len__(self) -> int:
+        return len(self._KEYS)
+    
+    def __repr__(self) -> str:
+        return f"HazardRecord({dict(self)!r})"
 
 def map_detected_objects_to_hazards(ai_output, config):
     """
     Map detected objects to their corresponding hazards using the configuration.
     
     Args:
-        ai_output: List of dictionaries with 'object' and optional 'location' keys
+        ai_output: Detections (mappings with 'object' and optional 'location' keys)
         config: Instance of HazardConfig
         
     Returns:
-        List of dictionaries with hazard information
+        List of HazardRecord
     """
     hazards = []
     for item in ai_output:
         hazard = config.get_hazard_for_object(item['object'])
         if hazard:
-            hazards.append({
-                'hazard_id': hazard['id'],
-                'hazard_name': hazard['display_name'],
-                'location': item.get('location', 'unknown'),
-                'object': item['object'],
-                'base_score': hazard['base_score'],
-                'weights': hazard['weights']
-            })
+            hazards.append(HazardRecord(hazard, item['object'], item.get('location', 'unknown')))
+        else:
+            unmapped_labels.inc(label=item['object'])
     return hazards
 
+def profile_factors(profile: Dict[str, Any]) -> np.ndarray:
+    """A profile's PROFILE_FACTORS as a vector (missing factors are 0)."""
+    return np.array([profile.get(factor, 0) for factor in PROFILE_FACTORS], dtype=np.float64)
+
+def compute_hazard_scores(config: HazardConfig, rows, factors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score hazards with a few array operations.
+    
+    Args:
+        config: Compiled HazardConfig
+        rows: ``hazard_index`` row of each hazard
+        factors: Profile vector shared by all hazards, or one row per hazard
+        
+    Returns:
+        (unclamped scores, scores clamped to 0-100)
+    """
+    # Evaluated in the same order as the scalar formula
+    # base * (1 + (mobility*w_m + vision*w_v + cognition*w_c) / 3) so results match it exactly
+    impacts = config.weight_matrix[rows] * factors
+    raw = config.base_scores[rows] * (1 + (impacts[:, 0] + impacts[:, 1] + impacts[:, 2]) / 3)
+    # Clamp to 0-100 like min(max(0, score), 100), which also maps NaN to 0
+    scores = np.where(raw > 0, raw, 0.0)
+    scores = np.where(scores > 100, 100.0, scores)
+    return raw, scores
+
 def score_hazards(hazards, profile, config, thresholds):
     """
     Calculate risk scores for detected hazards based on user profile.
@@ -104,43 +356,34 @@ def score_hazards(hazards, profile, config, thresholds):
             'recommendation': 'No hazards detected. Consider scheduling a follow-up scan in 6 months.'
         }
     
-    hazard_scores = []
-    total_score = 0
+    # Only hazards known to the config are scored
+    index = config.hazard_index
+    known = [hazard for hazard in hazards if hazard['hazard_id'] in index]
+    rows = [index[hazard['hazard_id']] for hazard in known]
     
-    # Calculate score for each hazard
-    for hazard in hazards:
-        hazard_config = config.get_hazard(hazard['hazard_id'])
-        if not hazard_config:
-            continue
-            
-        # Get weights from hazard config
-        weights = hazard_config.get('weights', {})
-        base_score = hazard_config.get('base_score', 0)
-        
-        # Calculate weighted score (0-100)
-        mobility_impact = profile.get('mobility', 0) * weights.get('mobility', 1)
-        vision_impact = profile.get('vision', 0) * weights.get('vision', 1)
-        cognition_impact = profile.get('cognition', 0) * weights.get('cognition', 1)
-        
-        # Calculate hazard score (0-100)
-        hazard_score = base_score * (1 + (mobility_impact + vision_impact + cognition_impact) / 3)
-        hazard_score = min(max(0, hazard_score), 100)  # Clamp to 0-100
-        
+    raw, scores = compute_hazard_scores(config, rows, profile_factors(profile))
+    
+    hazard_scores = []
+    configs = config.hazard_rows
+    for hazard, row, score, clamped_low, clamped_high in zip(known, rows, scores.tolist(),
+                                                             (~(raw > 0)).tolist(), (raw > 100).tolist()):
+        hazard_config = configs[row]
+        if clamped_low or clamped_high:
+            score = 0 if clamped_low else 100
         hazard_scores.append({
             'hazard_id': hazard['hazard_id'],
             'hazard_name': hazard['hazard_name'],
             'object': hazard.get('object', 'unknown'),
             'location': hazard.get('location', 'unknown'),
-            'score': round(hazard_score, 1),
-            'base_score': base_score,
-            'weights': weights
+            'score': round(score, 1),
+            'base_score': hazard_config.get('base_score', 0),
+            'weights': hazard_config.get('weights', {})
         })
-        
-        total_score += hazard_score
     
-    # Calculate average score if we have hazards
+    # Average score; accumulated left to right like a running total
+    total_score = 0
     if hazard_scores:
-        total_score = total_score / len(hazard_scores)
+        total_score = float(np.cumsum(scores)[-1]) / len(hazard_scores)
     
     # Determine risk level
     risk_level = config.get_risk_level(total_score)
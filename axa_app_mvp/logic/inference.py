@@ -0,0 +1,564 @@
+"""
+Model loading and inference execution for hazard detection.
+
+Decoding and YOLO inference are CPU bound, so the assessment endpoints hand
+them to an ``InferenceExecutor`` instead of running them on the event loop.
+Images are submitted one at a time to ``batch_scheduler``, which groups
+images from concurrent requests into shared forward passes.
+In the default ``process`` mode every pool process loads its own model
+through ``get_model`` when it starts.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from axa_app_mvp.logic.backends import artifact_path, get_backend, load_model
+from axa_app_mvp.logic.batching import BatchScheduler
+from axa_app_mvp.logic.detection import Detection, detect_image_views
+from axa_app_mvp.logic.detection_cache import DetectionCache, content_key
+from axa_app_mvp.logic.hazard_scoring import get_hazard_config
+from axa_app_mvp.logic.preprocessing import Letterbox, letterbox, letterbox_buffer, prepare_views
+from axa_app_mvp.logic.sidecar import SidecarClient, SidecarUnavailableError
+from axa_app_mvp.logic.video import ObjectCounter, select_keyframes
+from axa_app_mvp.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+MODEL_PATH = Path(os.getenv("MODEL_PATH", BASE_DIR / "models" / "yolov8n.pt"))
+
+# 'pytorch' (default), 'onnx' or 'openvino'; exported backends need scripts/export_model.py first
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "pytorch")
+# 'fp32' (default) or 'int8' (ONNX backend, built by scripts/evaluate_quantized.py)
+INFERENCE_PRECISION = os.getenv("INFERENCE_PRECISION", "fp32")
+
+HAZARD_CONFIG_PATH = BASE_DIR / "axa_app_mvp" / "logic" / "config.json"
+
+# Side of the square model input; uploads are decoded at reduced scale and letterboxed to it
+INFERENCE_IMGSZ = int(os.getenv("INFERENCE_IMGSZ", "640"))
+
+# Tiled mode for small hazards: images with a long side of at least INFERENCE_TILE_MIN_SIZE
+# are also detected as overlapping INFERENCE_IMGSZ tiles of a INFERENCE_TILE_RESOLUTION decode
+INFERENCE_TILING = os.getenv("INFERENCE_TILING", "false").lower() in ("1", "true", "yes")
+INFERENCE_TILE_MIN_SIZE = int(os.getenv("INFERENCE_TILE_MIN_SIZE", "2000"))
+INFERENCE_TILE_RESOLUTION = int(os.getenv("INFERENCE_TILE_RESOLUTION", "1920"))
+INFERENCE_TILE_OVERLAP = float(os.getenv("INFERENCE_TILE_OVERLAP", "0.2"))
+INFERENCE_TILE_NMS_IOU = float(os.getenv("INFERENCE_TILE_NMS_IOU", "0.5"))
+
+# Boxes below this confidence are dropped inside the model call
+DETECTION_MIN_CONFIDENCE = float(os.getenv("DETECTION_MIN_CONFIDENCE", "0.25"))
+
+# 'process' (default), 'thread', 'sidecar' (scripts/inference_sidecar.py) or 'inline'
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "process")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "1"))
+
+# Cross-request micro-batching: flush at this many images or after this long
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "8"))
+INFERENCE_MAX_WAIT_MS = float(os.getenv("INFERENCE_MAX_WAIT_MS", "10"))
+
+# Admission control: batches running at once, and images allowed to wait for one
+# before requests are turned away with 503 + Retry-After (0: unbounded)
+INFERENCE_MAX_CONCURRENCY = int(os.getenv("INFERENCE_MAX_CONCURRENCY", str(INFERENCE_WORKERS)))
+INFERENCE_MAX_QUEUE_DEPTH = int(os.getenv("INFERENCE_MAX_QUEUE_DEPTH", "64"))
+
+# Warm-up at startup on synthetic frames of these sizes ("640" or "HxW", comma separated)
+INFERENCE_WARMUP = os.getenv("INFERENCE_WARMUP", "true").lower() in ("1", "true", "yes")
+INFERENCE_WARMUP_SIZES = os.getenv("INFERENCE_WARMUP_SIZES", "640")
+# A failed warm-up is retried, backing off exponentially from the first delay to the max (seconds)
+INFERENCE_WARMUP_RETRY_S = float(os.getenv("INFERENCE_WARMUP_RETRY_S", "5"))
+INFERENCE_WARMUP_RETRY_MAX_S = float(os.getenv("INFERENCE_WARMUP_RETRY_MAX_S", "300"))
+
+# Detections of this many recently seen images are reused on resubmission (0 disables)
+DETECTION_CACHE_SIZE = int(os.getenv("DETECTION_CACHE_SIZE", "256"))
+
+EXECUTOR_KINDS = ("process", "thread", "sidecar", "inline")
+
+
+class ModelLoadError(Exception):
+    """Raised when the object detection model cannot be loaded."""
+    pass
+
+
+# Load YOLO model (lazy load on first use, once per process)
+_model = None
+
+
+def get_model():
+    """Return the process-wide YOLO model, loading it on first use."""
+    global _model
+    if _model is None:
+        try:
+            _model = load_model(MODEL_PATH, INFERENCE_BACKEND, INFERENCE_PRECISION)
+            logger.info(f"Loaded YOLO model from {MODEL_PATH} ({INFERENCE_BACKEND} backend, {INFERENCE_PRECISION})")
+        except Exception as e:
+            logger.error(f"Failed to load YOLO model: {e}")
+            raise ModelLoadError("Failed to load object detection model") from e
+    return _model
+
+
+_detection_classes = None
+_detection_classes_version = None
+
+# Class names of the model served by the workers, for a web process that does not load it
+_worker_class_names: Optional[Dict[int, str]] = None
+# (config version, model class names, the classes that map to no hazard under that config)
+_unmapped_classes: Tuple[Optional[str], Dict[int, str], List[str]] = (None, {}, [])
+
+unmapped_classes_gauge = metrics.gauge("hazard_unmapped_model_classes",
+                                       "Model classes that map to no hazard in the current config.json")
+
+
+def get_detection_classes(model) -> List[int]:
+    """
+    Return the model class ids that map to a hazard in config.json.
+
+    Only these classes are kept by the detector, so boxes for scene clutter
+    that ``map_detected_objects_to_hazards`` would discard are never built.
+    Recomputed when config.json is hot-reloaded.
+    """
+    global _detection_classes, _detection_classes_version
+    config = get_hazard_config(HAZARD_CONFIG_PATH)
+    if _detection_classes is None or _detection_classes_version != config.version:
+        _detection_classes = config.get_detection_class_ids(model.names)
+        _detection_classes_version = config.version
+        if not _detection_classes:
+            logger.warning("None of the model's classes map to a hazard in config.json; "
+                           "detection will return no objects")
+        elif len(_detection_classes) < len(model.names):
+            logger.info(f"{len(model.names) - len(_detection_classes)} of the model's classes "
+                        "map to no hazard in config.json")
+    return _detection_classes
+
+
+def model_class_names() -> Dict[int, str]:
+    """Class id -> name mapping of the loaded model (run on the inference executor)."""
+    return dict(get_model().names)
+
+
+def unmapped_model_classes() -> Optional[List[str]]:
+    """
+    Names of the model's classes that map to no hazard in the current config.
+
+    As such classes are left out of the detection allow-list they never reach
+    hazard mapping, so they are reported here (and in the
+    ``hazard_unmapped_model_classes`` gauge) rather than in
+    ``hazard_unmapped_labels_total``. Recomputed when config.json is
+    hot-reloaded. Uses the class names fetched from the workers at warm-up,
+    or this process's model; None if neither is known yet.
+    """
+    global _unmapped_classes
+    names = _worker_class_names
+    if names is None and _model is not None:
+        names = _model.names
+    if names is None:
+        return None
+    config = get_hazard_config(HAZARD_CONFIG_PATH)
+    if _unmapped_classes[:2] != (config.version, names):
+        mapped = set(config.get_detection_class_ids(names))
+        _unmapped_classes = (config.version, dict(names),
+                             [name for cls_id, name in sorted(names.items()) if cls_id not in mapped])
+        unmapped_classes_gauge.set(len(_unmapped_classes[2]))
+    return list(_unmapped_classes[2])
+
+
+def detect_encoded_images_timed(items: List[Tuple[str, bytes]]
+                                ) -> List[Tuple[Optional[List[Detection]], Dict[str, float]]]:
+    """
+    Decode a batch of images and run one detection pass over them.
+
+    This is the unit of work submitted to the inference executor, so it only
+    takes and returns picklable data. Items may come from different requests.
+    Images are decoded at reduced resolution and letterboxed into this
+    worker's reusable buffers; bounding boxes are reported in the
+    coordinates of the full-resolution upright image. With INFERENCE_TILING,
+    large images add their tiles to the same forward pass.
+
+    Args:
+        items: (room name, encoded image bytes) pairs as uploaded
+
+    Returns:
+        One (detections, stage timings) pair per item. Detections are None
+        if the image could not be decoded; timings hold 'decode_ms' (decode
+        and letterbox), 'model_ms' (the batch's forward pass, shared by its
+        items) and 'postprocess_ms' (box mapping, merging and records)
+    """
+    results: List[Optional[List[Detection]]] = [None] * len(items)
+    stages = [{"decode_ms": 0.0, "model_ms": 0.0, "postprocess_ms": 0.0} for _ in items]
+    indices, views, room_names = [], [], []
+    tile_min_size = INFERENCE_TILE_MIN_SIZE if INFERENCE_TILING else None
+    for i, (room_name, contents) in enumerate(items):
+        start = time.perf_counter()
+        image_views = prepare_views(
+            contents, INFERENCE_IMGSZ,
+            out=letterbox_buffer(INFERENCE_IMGSZ, len(views)),
+            tile_min_size=tile_min_size,
+            tile_resolution=INFERENCE_TILE_RESOLUTION,
+            tile_overlap=INFERENCE_TILE_OVERLAP,
+        )
+        stages[i]["decode_ms"] = (time.perf_counter() - start) * 1000
+        if image_views is not None:
+            indices.append(i)
+            views.append(image_views)
+            room_names.append(room_name)
+
+    if not views:
+        return list(zip(results, stages))
+
+    model = get_model()
+    classes = get_detection_classes(model)
+    timings: Dict[str, Any] = {}
+    if classes:
+        detections = detect_image_views(model, views, room_names, classes=classes,
+                                        conf=DETECTION_MIN_CONFIDENCE, iou=INFERENCE_TILE_NMS_IOU,
+                                        timings=timings)
+    else:
+        detections = [[] for _ in views]
+    for n, (i, image_detections) in enumerate(zip(indices, detections)):
+        results[i] = image_detections
+        if timings:
+            stages[i]["model_ms"] = timings["model_ms"]
+            stages[i]["postprocess_ms"] = timings["postprocess_ms"][n]
+    return list(zip(results, stages))
+
+
+def detect_encoded_images(items: List[Tuple[str, bytes]]) -> List[Optional[List[Detection]]]:
+    """
+    Like ``detect_encoded_images_timed``, without the stage timings.
+
+    Returns:
+        One entry per item: its list of detections, or None if the image
+        could not be decoded
+    """
+    return [detections for detections, _ in detect_encoded_images_timed(items)]
+
+
+def detect_video(path: str, room_name: str) -> Dict[str, Any]:
+    """
+    Detect objects in a walkthrough video of one room.
+
+    Keyframes are selected while the clip is decoded (see ``video.select_keyframes``),
+    letterboxed and detected in batches of INFERENCE_MAX_BATCH_SIZE, and
+    deduplicated across keyframes (see ``video.ObjectCounter``) so each
+    object is reported once. Runs on the
+    inference executor like ``detect_encoded_images_timed``.
+
+    Args:
+        path: Video file readable by this process
+        room_name: Room the video was taken in
+
+    Returns:
+        Dict with the deduplicated 'detections' (boxes in frame coordinates) and
+        the number of 'keyframes' they were found in
+
+    Raises:
+        VideoDecodeError: If the file is not a readable video
+    """
+    model = get_model()
+    classes = get_detection_classes(model)
+    counter = ObjectCounter()
+    pending: List[Tuple[np.ndarray, Letterbox]] = []
+    keyframes = 0
+
+    def detect_pending():
+        views = [[view] for view in pending]
+        for detections in detect_image_views(model, views, [room_name] * len(views), classes=classes,
+                                             conf=DETECTION_MIN_CONFIDENCE):
+            counter.update(detections)
+        pending.clear()
+
+    for _, frame in select_keyframes(path):
+        keyframes += 1
+        if not classes:
+            continue
+        height, width = frame.shape[:2]
+        boxed, scale, (pad_x, pad_y) = letterbox(frame, INFERENCE_IMGSZ)
+        pending.append((boxed, Letterbox(scale, scale, pad_x, pad_y, width, height)))
+        if len(pending) >= INFERENCE_MAX_BATCH_SIZE:
+            detect_pending()
+    if pending:
+        detect_pending()
+
+    return {"detections": counter.objects(), "keyframes": keyframes}
+
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def detector_version() -> str:
+    """
+    Identify everything detections depend on besides the image itself.
+
+    Replacing the model artifact or editing config.json (which drives the
+    class allow-list) changes the version, so stale cache entries are never
+    served.
+    """
+    try:
+        model_file = artifact_path(MODEL_PATH, get_backend(INFERENCE_BACKEND), INFERENCE_PRECISION)
+    except ValueError:
+        model_file = MODEL_PATH
+    tiling = (f"tiles:{INFERENCE_TILE_MIN_SIZE}/{INFERENCE_TILE_RESOLUTION}/"
+              f"{INFERENCE_TILE_OVERLAP}/{INFERENCE_TILE_NMS_IOU}" if INFERENCE_TILING else "tiles:off")
+    return (f"{model_file}@{_mtime_ns(model_file)}|{INFERENCE_PRECISION}|{INFERENCE_IMGSZ}|"
+            f"{DETECTION_MIN_CONFIDENCE}|{tiling}|config@{_mtime_ns(HAZARD_CONFIG_PATH)}")
+
+
+def submit_room_images(room_bytes: Dict[str, bytes],
+                       timings: Optional[Dict[str, Dict[str, float]]] = None
+                       ) -> AsyncIterator[Tuple[str, Optional[List[Detection]]]]:
+    """
+    Start detection of each room's image and return its results as they finish.
+
+    Images seen before are answered from the detection cache; the rest are
+    submitted to ``batch_scheduler`` right away and stored in the cache once
+    they complete. The request is admitted as a whole: if its misses do not
+    fit in the inference queue, nothing is queued. Must be called from the
+    event loop.
+
+    Args:
+        room_bytes: Room name -> encoded image bytes as uploaded
+        timings: If given, filled as rooms finish with room name ->
+            {'queue_ms', 'inference_ms'} (both 0 for cache hits) plus, for
+            detected images, the worker stages of ``detect_encoded_images_timed``
+
+    Returns:
+        Async iterator of (room name, list of detections or None if the image
+        could not be decoded), cache hits first, then in completion order
+
+    Raises:
+        QueueFullError: If the inference queue is at its depth limit
+    """
+    version = detector_version() if detection_cache.enabled else ""
+    hits = []
+    misses = []
+    for room_name, contents in room_bytes.items():
+        key = content_key(contents, version) if detection_cache.enabled else None
+        cached = detection_cache.get(key, room_name) if key else None
+        if cached is not None:
+            hits.append((room_name, cached))
+            if timings is not None:
+                timings[room_name] = {"queue_ms": 0.0, "inference_ms": 0.0}
+        else:
+            misses.append((room_name, key))
+
+    if misses:
+        batch_scheduler.check_capacity(len(misses))
+
+    async def detect(room_name: str, key: Optional[str]):
+        (room_detections, stages), queue_ms, inference_ms = await batch_scheduler.submit_timed(
+            (room_name, room_bytes[room_name]), check_capacity=False)
+        if key and room_detections is not None:
+            detection_cache.put(key, room_detections)
+        if timings is not None:
+            timings[room_name] = {"queue_ms": round(queue_ms, 2), "inference_ms": round(inference_ms, 2),
+                                  **{stage: round(ms, 2) for stage, ms in stages.items()}}
+        return room_name, room_detections
+
+    tasks = [asyncio.ensure_future(detect(room_name, key)) for room_name, key in misses]
+
+    async def results():
+        try:
+            for hit in hits:
+                yield hit
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            # The consumer stopped early (e.g. a client disconnected)
+            for task in tasks:
+                task.cancel()
+
+    return results()
+
+
+async def detect_room_images(room_bytes: Dict[str, bytes],
+                             timings: Optional[Dict[str, Dict[str, float]]] = None
+                             ) -> Dict[str, Optional[List[Detection]]]:
+    """
+    Detect objects in each room's image (see ``submit_room_images``).
+
+    Returns:
+        Room name -> list of detections, or None if the image could not be decoded
+
+    Raises:
+        QueueFullError: If the inference queue is at its depth limit
+    """
+    results = {}
+    async for room_name, room_detections in submit_room_images(room_bytes, timings):
+        results[room_name] = room_detections
+    return {room_name: results[room_name] for room_name in room_bytes}
+
+
+async def scan_video(path: str, room_name: str) -> Dict[str, Any]:
+    """
+    Run ``detect_video`` on the inference executor.
+
+    A scan can hold an inference worker for tens of seconds, so it takes one
+    of the batch scheduler's slots and is admitted against the same queue
+    depth limit as room images.
+
+    Raises:
+        QueueFullError: If the inference queue is at its depth limit
+    """
+    return await batch_scheduler.run_exclusive(detect_video, path, room_name)
+
+
+def parse_warmup_sizes(spec: str) -> List[Tuple[int, int]]:
+    """Parse "640,480x640" into [(640, 640), (480, 640)] (height, width) pairs."""
+    sizes = []
+    for part in spec.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if "x" in part:
+            height, width = part.split("x", 1)
+            sizes.append((int(height), int(width)))
+        else:
+            sizes.append((int(part), int(part)))
+    return sizes
+
+
+_warmed_up = False
+
+
+def warm_up_model(sizes: Optional[List[Tuple[int, int]]] = None) -> float:
+    """
+    Load the model and run it on synthetic frames so the first real request
+    does not pay for weight loading, graph setup or allocator growth.
+
+    Idempotent per process.
+
+    Args:
+        sizes: (height, width) frame sizes; defaults to INFERENCE_WARMUP_SIZES
+
+    Returns:
+        Seconds spent warming up (0 if this process was already warm)
+    """
+    global _warmed_up
+    if _warmed_up:
+        return 0.0
+    start = time.perf_counter()
+    model = get_model()
+    for height, width in sizes or parse_warmup_sizes(INFERENCE_WARMUP_SIZES):
+        model([np.full((height, width, 3), 114, dtype=np.uint8)], verbose=False)
+    _warmed_up = True
+    return time.perf_counter() - start
+
+
+def _init_worker():
+    """Process pool initializer: load and warm the model before the first job arrives."""
+    try:
+        if INFERENCE_WARMUP:
+            warm_up_model()
+        else:
+            get_model()
+    except ModelLoadError:
+        # Keep the pool usable; jobs will raise ModelLoadError themselves
+        pass
+
+
+class InferenceExecutor:
+    """Runs blocking inference work off the event loop."""
+
+    def __init__(self, kind: str = INFERENCE_EXECUTOR, workers: int = INFERENCE_WORKERS):
+        """
+        Args:
+            kind: 'process' for a process pool with one model per process,
+                'thread' for a thread pool sharing this process's model,
+                'sidecar' to call the shared inference sidecar, or
+                'inline' to run on the caller (tests and debugging only)
+            workers: Number of pool workers (for 'sidecar', calls in flight)
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown inference executor: {kind}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self._pool = None
+        self._sidecar = SidecarClient() if kind == "sidecar" else None
+
+    def _get_pool(self):
+        if self._pool is None:
+            if self.kind == "process":
+                # Spawn rather than fork so children do not inherit torch thread state
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+            else:
+                # Sidecar calls block on the socket, so they also run on threads
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.workers,
+                    thread_name_prefix="inference",
+                )
+            logger.info(f"Started {self.kind} inference executor with {self.workers} worker(s)")
+        return self._pool
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Submit ``fn(*args)`` to the pool from synchronous code ('process' and 'thread' only)."""
+        if self.kind not in ("process", "thread"):
+            raise ValueError(f"submit is not supported by the {self.kind} executor")
+        return self._get_pool().submit(fn, *args)
+
+    async def run(self, fn: Callable, *args):
+        """Run ``fn(*args)`` on the executor and await its result."""
+        if self.kind == "inline":
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        try:
+            if self.kind == "sidecar":
+                return await loop.run_in_executor(self._get_pool(), self._sidecar.call, fn.__name__, *args)
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        except SidecarUnavailableError as e:
+            logger.error(f"Inference sidecar unavailable: {e}")
+            raise ModelLoadError("Failed to load object detection model") from e
+        except BrokenExecutor:
+            # A worker died (e.g. OOM kill); start a fresh pool for the next call
+            logger.error("Inference executor broke, restarting it")
+            self.shutdown(wait=False)
+            raise
+
+    async def warm_up(self):
+        """Load and warm the model in every worker that will serve requests."""
+        global _worker_class_names
+        # Concurrent jobs make the process pool spawn all of its workers,
+        # each of which warms up in its initializer. The sidecar warms its
+        # own workers; one call waits until it is reachable and warm.
+        jobs = self.workers if self.kind == "process" else 1
+        await asyncio.gather(*(self.run(warm_up_model) for _ in range(jobs)))
+        if self.kind in ("process", "sidecar"):
+            # The model is loaded in the workers; keep its class names to check config.json against
+            _worker_class_names = await self.run(model_class_names)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the pool; it is recreated on next use."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+        if self._sidecar is not None:
+            self._sidecar.close()
+
+
+inference_executor = InferenceExecutor()
+
+# Images from concurrent requests share forward passes through this scheduler
+batch_scheduler = BatchScheduler(
+    inference_executor,
+    detect_encoded_images_timed,
+    max_batch_size=INFERENCE_MAX_BATCH_SIZE,
+    max_wait_ms=INFERENCE_MAX_WAIT_MS,
+    max_queue_depth=INFERENCE_MAX_QUEUE_DEPTH,
+    max_concurrency=INFERENCE_MAX_CONCURRENCY,
+)
+
+# Detections of recently seen images, held in the web process
+detection_cache = DetectionCache(DETECTION_CACHE_SIZE)
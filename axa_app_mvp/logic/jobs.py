@@ -0,0 +1,290 @@
+"""
+Asynchronous assessment jobs.
+
+A job is created with the uploaded room images and profile, gets an id back
+immediately and is processed by a ``JobRunner`` in the background; clients
+poll its state or fetch the result later.
+
+Job state lives on disk under ``outputs/jobs/<job_id>/`` (``job.json``, the
+uploaded images and a ``pending`` marker until the job has finished), so
+queued jobs survive a restart. Every web worker runs a ``JobRunner`` over the
+same directory; a job is only processed by the worker holding the lock on its
+claim file, which the OS releases when that worker dies.
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from axa_app_mvp.logic.batching import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+# Concurrent jobs per web worker
+ASSESSMENT_JOB_WORKERS = int(os.getenv("ASSESSMENT_JOB_WORKERS", "2"))
+# How often each web worker looks for queued jobs submitted elsewhere or left by a restart
+ASSESSMENT_JOB_POLL_S = float(os.getenv("ASSESSMENT_JOB_POLL_S", "2"))
+# Finished jobs are deleted after this long
+ASSESSMENT_JOB_RETENTION_HOURS = float(os.getenv("ASSESSMENT_JOB_RETENTION_HOURS", "24"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class JobError(Exception):
+    """Raised by job processing with a message safe to show to the client."""
+    pass
+
+
+_owner_id = None
+
+
+def _owner() -> str:
+    """Claim owner id of this process: its pid plus a token, as pids are reused across restarts."""
+    global _owner_id
+    if _owner_id is None or not _owner_id.startswith(f"{os.getpid()}:"):
+        _owner_id = f"{os.getpid()}:{uuid.uuid4().hex}"
+    return _owner_id
+
+
+class JobStore:
+    """File-backed store of assessment jobs."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        # job_id -> open claim file holding the lock, for jobs claimed by this process
+        self._claims: Dict[str, int] = {}
+
+    def _dir(self, job_id: str) -> Path:
+        if not _JOB_ID.match(job_id):
+            raise KeyError(job_id)
+        return self.root / job_id
+
+    def _write(self, job: Dict[str, Any]):
+        path = self._dir(job["job_id"]) / "job.json"
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp, path)
+
+    def create(self, room_bytes: Dict[str, bytes], profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Persist a new queued job with its images and profile."""
+        job_id = uuid.uuid4().hex
+        job_dir = self.root / job_id
+        (job_dir / "images").mkdir(parents=True)
+        for room_name, contents in room_bytes.items():
+            (job_dir / "images" / room_name).write_bytes(contents)
+        job = {
+            "job_id": job_id,
+            "status": QUEUED,
+            "created_at": datetime.utcnow().isoformat(),
+            "rooms": list(room_bytes),
+            "profile": profile,
+        }
+        self._write(job)
+        # Lets unfinished() find queued jobs without parsing every job.json
+        (job_dir / "pending").write_text(job["created_at"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's state, or None if there is no such job."""
+        try:
+            with open(self._dir(job_id) / "job.json") as f:
+                return json.load(f)
+        except (KeyError, FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def update(self, job_id: str, **fields) -> Dict[str, Any]:
+        """Merge ``fields`` into a job's state."""
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        job.update(fields)
+        self._write(job)
+        if job["status"] in FINISHED_STATES:
+            (self._dir(job_id) / "pending").unlink(missing_ok=True)
+        return job
+
+    def load_images(self, job_id: str) -> Dict[str, bytes]:
+        """Return the job's room name -> image bytes, in upload order."""
+        job = self.get(job_id)
+        images = self._dir(job_id) / "images"
+        return {room_name: (images / room_name).read_bytes() for room_name in job["rooms"]}
+
+    def claim(self, job_id: str) -> bool:
+        """
+        Take exclusive ownership of a job for this process until ``release``.
+
+        Ownership is an exclusive lock on the job's claim file, so taking over
+        the job of a dead process is as atomic as the first claim.
+
+        Returns False if another live process (or this one) already owns it.
+        """
+        if job_id in self._claims:
+            return False
+        try:
+            fd = os.open(self._dir(job_id) / "claim", os.O_CREAT | os.O_RDWR)
+        except FileNotFoundError:
+            return False  # purged
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # Record the owner for diagnostics; the lock is what counts
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, _owner().encode(), 0)
+        self._claims[job_id] = fd
+        return True
+
+    def release(self, job_id: str):
+        """Give up ownership of a job and drop its images once it has finished."""
+        job = self.get(job_id)
+        if job is not None and job["status"] in FINISHED_STATES:
+            shutil.rmtree(self._dir(job_id) / "images", ignore_errors=True)
+        fd = self._claims.pop(job_id, None)
+        if fd is not None:
+            os.close(fd)
+
+    def unfinished(self) -> List[str]:
+        """Ids of queued or interrupted jobs, oldest first."""
+        jobs = []
+        if not self.root.exists():
+            return jobs
+        for job_dir in self.root.iterdir():
+            if not _JOB_ID.match(job_dir.name):
+                continue
+            try:
+                created_at = (job_dir / "pending").read_text()
+            except FileNotFoundError:
+                continue  # finished
+            jobs.append((created_at, job_dir.name))
+        return [job_id for _, job_id in sorted(jobs)]
+
+    def purge(self, max_age_s: float) -> int:
+        """Delete finished jobs older than ``max_age_s``; returns how many were deleted."""
+        deleted = 0
+        if not self.root.exists():
+            return deleted
+        cutoff = time.time() - max_age_s
+        for job_dir in self.root.iterdir():
+            if not _JOB_ID.match(job_dir.name) or (job_dir / "pending").exists():
+                continue
+            try:
+                if (job_dir / "job.json").stat().st_mtime >= cutoff:
+                    continue
+            except FileNotFoundError:
+                continue  # still being created, or purged by another worker
+            shutil.rmtree(job_dir, ignore_errors=True)
+            deleted += 1
+        return deleted
+
+
+class JobRunner:
+    """Processes jobs from a JobStore on this process's event loop."""
+
+    def __init__(self, store: JobStore,
+                 process: Callable[[Dict[str, bytes], Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 workers: int = ASSESSMENT_JOB_WORKERS, poll_interval: float = ASSESSMENT_JOB_POLL_S,
+                 retention_hours: float = ASSESSMENT_JOB_RETENTION_HOURS):
+        """
+        Args:
+            store: Where jobs are persisted
+            process: Coroutine function (room images, profile) -> JSON-serialisable result
+            workers: Jobs processed concurrently
+            poll_interval: Seconds between scans of the store for unclaimed jobs
+            retention_hours: Finished jobs older than this are deleted
+        """
+        self.store = store
+        self.process = process
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.retention_s = retention_hours * 3600
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued = set()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start the worker tasks and the store scan (picks up jobs left by a restart)."""
+        self._queue = asyncio.Queue()
+        self._queued.clear()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._poll()))
+
+    async def stop(self):
+        """Cancel the runner; unfinished jobs stay queued on disk for the next start."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, job_id: str):
+        """Schedule a job on this process (no-op if it is already scheduled)."""
+        if self._queue is not None and job_id not in self._queued:
+            self._queued.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    async def _poll(self):
+        while True:
+            try:
+                for job_id in await asyncio.to_thread(self.store.unfinished):
+                    self.enqueue(job_id)
+                await asyncio.to_thread(self.store.purge, self.retention_s)
+            except Exception:
+                logger.exception("Failed to scan assessment jobs")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _work(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                if await asyncio.to_thread(self.store.claim, job_id):
+                    try:
+                        await self._run(job_id)
+                    finally:
+                        await asyncio.to_thread(self.store.release, job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Assessment job {job_id} could not be processed")
+            finally:
+                self._queued.discard(job_id)
+
+    async def _run(self, job_id: str):
+        # Store access is file I/O (up to five images); keep it off the event loop
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job["status"] in FINISHED_STATES:
+            return
+        await asyncio.to_thread(self.store.update, job_id, status=RUNNING,
+                                started_at=datetime.utcnow().isoformat())
+        images = await asyncio.to_thread(self.store.load_images, job_id)
+        while True:
+            try:
+                result = await self.process(images, job["profile"])
+            except QueueFullError as e:
+                # Jobs have no client waiting on them: wait for capacity instead of failing
+                await asyncio.sleep(e.retry_after)
+                continue
+            except JobError as e:
+                await self._finish(job_id, FAILED, error=str(e))
+            except Exception:
+                logger.exception(f"Assessment job {job_id} failed")
+                await self._finish(job_id, FAILED, error="Unexpected error during assessment")
+            else:
+                await self._finish(job_id, SUCCEEDED, result=result)
+            return
+
+    async def _finish(self, job_id: str, status: str, **fields):
+        await asyncio.to_thread(self.store.update, job_id, status=status,
+                                finished_at=datetime.utcnow().isoformat(), **fields)
+        logger.info(f"Assessment job {job_id} {status}")
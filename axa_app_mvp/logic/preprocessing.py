@@ -0,0 +1,293 @@
+"""
+Image preprocessing for the hazard detector.
+
+Phone photos are often 12+ MP while the detector only sees a 640px square.
+``prepare_image`` reads the image header first, decodes JPEGs at a reduced
+scale (1/2, 1/4 or 1/8 via DCT scaling) that is still at least the model
+size, applies the EXIF orientation and letterboxes the result into a
+preallocated buffer. Decode time and peak memory then scale with the model
+input rather than the camera resolution. The returned ``Letterbox`` maps
+detected boxes back to full-resolution image coordinates.
+
+Small hazards (cords, thresholds) can vanish when a 4000px photo shrinks to
+640px, so ``prepare_views`` can add overlapping native-resolution tiles of
+large images next to the global view (see ``plan_tiles``).
+"""
+import math
+import io
+import threading
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# Padding value ultralytics uses for letterboxing
+LETTERBOX_COLOR = 114
+
+EXIF_ORIENTATION = 0x0112
+
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+@dataclass(frozen=True)
+class Letterbox:
+    """
+    Mapping between a model input and full-resolution image coordinates.
+
+    ``pad_x``/``pad_y`` are where the decoded image's origin sits in the model
+    input: the letterbox padding, or minus the tile offset for a tile.
+    """
+    scale_x: float
+    scale_y: float
+    pad_x: int
+    pad_y: int
+    width: int
+    height: int
+
+    def to_original(self, xyxy: np.ndarray) -> np.ndarray:
+        """Map an (N, 4) array of letterbox-space boxes to image coordinates."""
+        boxes = np.asarray(xyxy, dtype=np.float64)
+        boxes = (boxes - [self.pad_x, self.pad_y, self.pad_x, self.pad_y]) / \
+            [self.scale_x, self.scale_y, self.scale_x, self.scale_y]
+        return np.clip(boxes, 0, [self.width, self.height, self.width, self.height])
+
+
+def letterbox(image: np.ndarray, size: int = 640,
+              out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Resize an image to fit a ``size`` x ``size`` square, keeping aspect ratio
+    and padding the remainder, as the YOLO models expect.
+
+    Args:
+        image: BGR image
+        size: Side of the square model input
+        out: Optional preallocated ``size`` x ``size`` x 3 uint8 buffer to write into
+
+    Returns:
+        (letterboxed image, scale factor applied, (pad_x, pad_y) offsets)
+    """
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    if out is None:
+        canvas = np.full((size, size, 3), LETTERBOX_COLOR, dtype=np.uint8)
+    else:
+        canvas = out
+        canvas.fill(LETTERBOX_COLOR)
+    target = canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w]
+    if (new_w, new_h) == (width, height):
+        target[...] = image
+    else:
+        cv2.resize(image, (new_w, new_h), dst=target, interpolation=cv2.INTER_LINEAR)
+    return canvas, scale, (pad_x, pad_y)
+
+
+def to_model_input(image: np.ndarray) -> np.ndarray:
+    """Convert a letterboxed BGR image into a 1x3xHxW float32 RGB tensor in [0, 1]."""
+    rgb = image[:, :, ::-1].transpose(2, 0, 1)
+    return np.ascontiguousarray(rgb, dtype=np.float32)[None] / 255.0
+
+
+_buffers = threading.local()
+
+
+def letterbox_buffer(size: int, slot: int = 0) -> np.ndarray:
+    """
+    Return this thread's reusable ``size`` x ``size`` x 3 buffer for batch position ``slot``.
+
+    The contents are only valid until the same slot is requested again.
+    """
+    pool = getattr(_buffers, "pool", None)
+    if pool is None:
+        pool = _buffers.pool = {}
+    buffer = pool.get((size, slot))
+    if buffer is None:
+        buffer = pool[(size, slot)] = np.empty((size, size, 3), dtype=np.uint8)
+    return buffer
+
+
+def read_image_header(contents: bytes) -> Optional[Tuple[int, int, int]]:
+    """
+    Read (width, height, EXIF orientation) without decoding pixel data.
+
+    Returns None if the header cannot be parsed.
+    """
+    try:
+        with Image.open(io.BytesIO(contents)) as img:
+            width, height = img.size
+            orientation = img.getexif().get(EXIF_ORIENTATION, 1)
+    except Exception:
+        return None
+    return width, height, orientation if orientation in range(1, 9) else 1
+
+
+def choose_reduce_factor(width: int, height: int, target_size: int) -> int:
+    """Largest decode reduction (8, 4, 2 or 1) that keeps the long side >= ``target_size``."""
+    longest = max(width, height)
+    for factor in (8, 4, 2):
+        if longest / factor >= target_size:
+            return factor
+    return 1
+
+
+def apply_exif_orientation(image: np.ndarray, orientation: int) -> np.ndarray:
+    """Rotate/flip a decoded image so it displays upright for an EXIF orientation value."""
+    if orientation == 2:
+        return cv2.flip(image, 1)
+    if orientation == 3:
+        return cv2.rotate(image, cv2.ROTATE_180)
+    if orientation == 4:
+        return cv2.flip(image, 0)
+    if orientation == 5:
+        return cv2.transpose(image)
+    if orientation == 6:
+        return cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
+    if orientation == 7:
+        return cv2.flip(cv2.transpose(image), -1)
+    if orientation == 8:
+        return cv2.rotate(image, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    return image
+
+
+def decode_image(contents: bytes, target_size: Optional[int] = None,
+                 header: Optional[Tuple[int, int, int]] = None) -> Optional[Tuple[np.ndarray, Tuple[int, int]]]:
+    """
+    Decode image bytes upright, at reduced resolution when ``target_size`` allows.
+
+    Args:
+        contents: Encoded image bytes as uploaded
+        target_size: Smallest long side needed; None decodes at full resolution
+        header: Result of ``read_image_header`` if the caller already has it
+
+    Returns:
+        (BGR image, (width, height) of the full-resolution upright image),
+        or None if the bytes are not a decodable image
+    """
+    if not contents:
+        return None
+    buffer = np.frombuffer(contents, np.uint8)
+
+    if header is None:
+        header = read_image_header(contents)
+    if header is None:
+        # Unknown to PIL: let OpenCV decode at full size and handle orientation itself
+        image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+        if image is None:
+            return None
+        return image, (image.shape[1], image.shape[0])
+
+    width, height, orientation = header
+    factor = choose_reduce_factor(width, height, target_size) if target_size else 1
+    image = cv2.imdecode(buffer, REDUCED_DECODE_FLAGS[factor] | cv2.IMREAD_IGNORE_ORIENTATION)
+    if image is None:
+        return None
+    image = apply_exif_orientation(image, orientation)
+    if orientation >= 5:
+        width, height = height, width
+    return image, (width, height)
+
+
+def prepare_image(contents: bytes, size: int = 640,
+                  out: Optional[np.ndarray] = None) -> Optional[Tuple[np.ndarray, Letterbox]]:
+    """
+    Decode image bytes and letterbox them into a model input.
+
+    Args:
+        contents: Encoded image bytes as uploaded
+        size: Side of the square model input
+        out: Optional preallocated buffer (see ``letterbox_buffer``)
+
+    Returns:
+        (letterboxed BGR image, Letterbox mapping back to full resolution),
+        or None if the bytes are not a decodable image
+    """
+    decoded = decode_image(contents, target_size=size)
+    if decoded is None:
+        return None
+    image, (width, height) = decoded
+
+    boxed, scale, (pad_x, pad_y) = letterbox(image, size, out=out)
+    decoded_h, decoded_w = image.shape[:2]
+    return boxed, Letterbox(
+        scale_x=scale * decoded_w / width,
+        scale_y=scale * decoded_h / height,
+        pad_x=pad_x,
+        pad_y=pad_y,
+        width=width,
+        height=height,
+    )
+
+
+def plan_tiles(width: int, height: int, tile_size: int, overlap: float) -> List[Tuple[int, int, int, int]]:
+    """
+    Split an image into square tiles that overlap by at least ``overlap``
+    (fraction of the tile side) and are spread evenly edge to edge.
+
+    Returns:
+        (x0, y0, x1, y1) tile rectangles, row by row
+    """
+    def starts(length):
+        tile = min(tile_size, length)
+        if length <= tile:
+            return [0], tile
+        stride = tile * (1 - overlap)
+        count = math.ceil((length - tile) / stride) + 1
+        return [round(i * (length - tile) / (count - 1)) for i in range(count)], tile
+
+    xs, tile_w = starts(width)
+    ys, tile_h = starts(height)
+    return [(x, y, x + tile_w, y + tile_h) for y in ys for x in xs]
+
+
+def prepare_views(contents: bytes, size: int = 640, out: Optional[np.ndarray] = None,
+                  tile_min_size: Optional[int] = None, tile_resolution: int = 1920,
+                  tile_overlap: float = 0.2) -> Optional[List[Tuple[np.ndarray, Letterbox]]]:
+    """
+    Decode image bytes into the model inputs to detect on.
+
+    Every image gets a letterboxed global view. Images whose long side is at
+    least ``tile_min_size`` are also decoded at (about) ``tile_resolution``
+    and cut into overlapping ``size`` x ``size`` tiles, so small objects are
+    seen at a higher resolution. Tiles are views into the decoded image.
+
+    Args:
+        contents: Encoded image bytes as uploaded
+        size: Side of the square model input
+        out: Optional preallocated buffer for the global view
+        tile_min_size: Long side from which tiles are added; None disables tiling
+        tile_resolution: Long side to decode tiled images at (at least)
+        tile_overlap: Minimum overlap between neighbouring tiles, as a fraction of ``size``
+
+    Returns:
+        (model input, Letterbox) views, global view first, or None if the
+        bytes are not a decodable image
+    """
+    if not tile_min_size:
+        prepared = prepare_image(contents, size, out=out)
+        return [prepared] if prepared is not None else None
+
+    header = read_image_header(contents)
+    tiled = header is not None and max(header[:2]) >= tile_min_size
+    decoded = decode_image(contents, target_size=tile_resolution if tiled else size, header=header)
+    if decoded is None:
+        return None
+    image, (width, height) = decoded
+    decoded_h, decoded_w = image.shape[:2]
+
+    boxed, scale, (pad_x, pad_y) = letterbox(image, size, out=out)
+    views = [(boxed, Letterbox(scale * decoded_w / width, scale * decoded_h / height,
+                               pad_x, pad_y, width, height))]
+    if tiled:
+        for x0, y0, x1, y1 in plan_tiles(decoded_w, decoded_h, size, tile_overlap):
+            views.append((image[y0:y1, x0:x1], Letterbox(decoded_w / width, decoded_h / height,
+                                                         -x0, -y0, width, height)))
+    return views
@@ -0,0 +1,110 @@
+"""
+INT8 quantization of the hazard detector and FP32/INT8 comparison helpers.
+
+The INT8 model is the ONNX export statically quantized with ONNX Runtime,
+calibrated on a folder of local room photos. Use
+``scripts/evaluate_quantized.py`` to build it and check that it does not
+change the hazard list before serving it with ``INFERENCE_PRECISION=int8``.
+"""
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+from axa_app_mvp.logic.backends import BACKENDS, artifact_path, export_model
+from axa_app_mvp.logic.hazard_scoring import map_detected_objects_to_hazards
+from axa_app_mvp.logic.preprocessing import prepare_image, to_model_input
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def list_images(folder: Path) -> List[Path]:
+    """Return the image files in ``folder``, sorted by name."""
+    return sorted(p for p in Path(folder).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def calibration_inputs(paths: Iterable[Path], imgsz: int = 640) -> Iterator[np.ndarray]:
+    """
+    Model input tensors of calibration photos, preprocessed as the app serves
+    uploads (``preprocessing.prepare_image``: reduced-size decode, EXIF
+    orientation, letterbox). Unreadable photos are skipped.
+    """
+    for path in paths:
+        prepared = prepare_image(Path(path).read_bytes(), imgsz)
+        if prepared is not None:
+            yield to_model_input(prepared[0])
+
+
+def quantize_model(model_path: Path, calibration_images: Sequence[Path],
+                   imgsz: int = 640, force: bool = False) -> Path:
+    """
+    Build the INT8 ONNX model, reusing a cached one that is newer than the FP32 export.
+
+    Args:
+        model_path: PyTorch ``.pt`` weights
+        calibration_images: Representative room photos for activation ranges
+        imgsz: Model input size
+        force: Re-quantize even if a cached INT8 model exists
+
+    Returns:
+        Path to the INT8 ONNX model
+    """
+    try:
+        from onnxruntime.quantization import (
+            CalibrationDataReader, QuantFormat, QuantType, quantize_static
+        )
+    except ImportError:
+        raise ImportError("INT8 quantization needs onnxruntime: pip install onnxruntime")
+
+    fp32_path = export_model(model_path, "onnx", imgsz=imgsz)
+    int8_path = artifact_path(model_path, BACKENDS["onnx"], precision="int8")
+    if not force and int8_path.exists() and int8_path.stat().st_mtime >= fp32_path.stat().st_mtime:
+        logger.info(f"Using cached INT8 model at {int8_path}")
+        return int8_path
+    if not calibration_images:
+        raise ValueError("At least one calibration image is needed for INT8 quantization")
+
+    class ImageFolderReader(CalibrationDataReader):
+        def __init__(self, paths):
+            self._inputs = calibration_inputs(paths, imgsz)
+
+        def get_next(self):
+            tensor = next(self._inputs, None)
+            return None if tensor is None else {"images": tensor}
+
+    quantize_static(
+        str(fp32_path),
+        str(int8_path),
+        ImageFolderReader(calibration_images),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    logger.info(f"Quantized {fp32_path} to {int8_path} using {len(calibration_images)} images")
+    return int8_path
+
+
+def hazard_counts(detections: Iterable[Dict], config) -> Counter:
+    """Count the hazards ``map_detected_objects_to_hazards`` derives from detections."""
+    return Counter(h['hazard_id'] for h in map_detected_objects_to_hazards(list(detections), config))
+
+
+def compare_hazard_counts(reference: Counter, candidate: Counter) -> int:
+    """Number of hazards that differ between two hazard counts (added plus removed)."""
+    return sum(((reference - candidate) + (candidate - reference)).values())
+
+
+def latency_summary(latencies_ms: Sequence[float]) -> Dict[str, float]:
+    """Mean and p50/p95 of a list of latencies in milliseconds."""
+    if not latencies_ms:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0}
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    return {
+        "mean": round(float(values.mean()), 2),
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p95": round(float(np.percentile(values, 95)), 2),
+    }
@@ -0,0 +1,284 @@
+"""
+Shared inference sidecar.
+
+By default every gunicorn worker owns its inference pool and therefore its
+own copy of the model. With ``INFERENCE_EXECUTOR=sidecar`` the web workers
+instead send their batches to one local inference service
+(``scripts/inference_sidecar.py``) that owns ``INFERENCE_SIDECAR_WORKERS``
+model processes, so web workers can scale with I/O load and inference
+processes with cores.
+
+Requests travel over a ``multiprocessing.connection`` Unix socket (or
+loopback TCP port). They are pickled, so the authkey is all that stands
+between a peer and code execution in the sidecar: TCP mode requires an
+explicit ``INFERENCE_SIDECAR_AUTHKEY`` and only binds to loopback addresses. Image bytes are not sent over the socket: the web
+worker writes them into a ``shared_memory`` segment and only the segment
+name and (offset, length) slices are passed on, down to the model process
+that decodes them.
+"""
+import ipaddress
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Unix socket path, or host:port for a loopback TCP socket
+INFERENCE_SIDECAR_ADDRESS = os.getenv("INFERENCE_SIDECAR_ADDRESS", "/tmp/axa-inference.sock")
+# The default only suits Unix sockets, which file permissions protect; TCP requires setting it
+DEFAULT_SIDECAR_AUTHKEY = b"axa-inference"
+INFERENCE_SIDECAR_AUTHKEY = os.getenv("INFERENCE_SIDECAR_AUTHKEY", "").encode() or None
+INFERENCE_SIDECAR_WORKERS = int(os.getenv("INFERENCE_SIDECAR_WORKERS", str(os.cpu_count() or 1)))
+# How long web workers wait for the sidecar to accept a connection
+INFERENCE_SIDECAR_CONNECT_TIMEOUT = float(os.getenv("INFERENCE_SIDECAR_CONNECT_TIMEOUT", "30"))
+# How long web workers wait for the result of one call (video scans are the slowest)
+INFERENCE_SIDECAR_CALL_TIMEOUT = float(os.getenv("INFERENCE_SIDECAR_CALL_TIMEOUT", "600"))
+
+# Inference functions the sidecar runs on behalf of web workers
+SIDECAR_FUNCTIONS = ("detect_encoded_images", "detect_encoded_images_timed", "detect_video", "warm_up_model",
+                     "model_class_names")
+# ...of which these take (room name, image bytes) items, passed through shared memory
+SHARED_MEMORY_FUNCTIONS = ("detect_encoded_images", "detect_encoded_images_timed")
+
+
+class SidecarUnavailableError(Exception):
+    """Raised when the inference sidecar cannot be reached."""
+    pass
+
+
+def parse_address(address: str):
+    """
+    '/path/to.sock' -> Unix socket path; 'host:port' -> (host, port).
+
+    Raises:
+        ValueError: If the host is not a loopback address
+    """
+    if ":" in address and not address.startswith("/"):
+        host, port = address.rsplit(":", 1)
+        host = host.strip("[]")
+        try:
+            loopback = host == "localhost" or ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            loopback = False
+        if not loopback:
+            raise ValueError(f"Inference sidecar must listen on a loopback address, not {host}")
+        return host, int(port)
+    return address
+
+
+def resolve_authkey(address, authkey: Optional[bytes]) -> bytes:
+    """
+    The authkey for a parsed sidecar address.
+
+    Raises:
+        ValueError: If a TCP address has no explicitly configured authkey
+    """
+    if authkey:
+        return authkey
+    if not isinstance(address, str):
+        raise ValueError("INFERENCE_SIDECAR_AUTHKEY must be set to use the inference sidecar over TCP")
+    return DEFAULT_SIDECAR_AUTHKEY
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a segment owned by another process without adopting its cleanup."""
+    shm = shared_memory.SharedMemory(name=name)
+    # Before Python 3.13 attaching registers the segment with this process's
+    # resource tracker, which would unlink it when this process exits
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+def pack_items(items: List[Tuple[str, bytes]]) -> Tuple[Optional[shared_memory.SharedMemory], List[Tuple[str, int, int]]]:
+    """
+    Copy (room name, image bytes) items into one new shared memory segment.
+
+    Returns:
+        (segment, or None if every item is empty, [(room name, offset, length)])
+    """
+    total = sum(len(contents) for _, contents in items)
+    if total == 0:
+        return None, [(room_name, 0, 0) for room_name, _ in items]
+    shm = shared_memory.SharedMemory(create=True, size=total)
+    slices, offset = [], 0
+    for room_name, contents in items:
+        shm.buf[offset:offset + len(contents)] = contents
+        slices.append((room_name, offset, len(contents)))
+        offset += len(contents)
+    return shm, slices
+
+
+def run_job(name: str, args: tuple, shm_name: Optional[str] = None):
+    """
+    Run a sidecar function in a model process.
+
+    For ``SHARED_MEMORY_FUNCTIONS`` the items are (room name, offset, length)
+    slices of the shared memory segment ``shm_name``, decoded in place.
+    """
+    from axa_app_mvp.logic import inference
+
+    if name not in SIDECAR_FUNCTIONS:
+        raise ValueError(f"Unknown sidecar function: {name}")
+    fn = getattr(inference, name)
+    if name not in SHARED_MEMORY_FUNCTIONS:
+        return fn(*args)
+
+    slices = args[0]
+    if shm_name is None:
+        return fn([(room_name, b"") for room_name, _, _ in slices])
+    shm = _attach(shm_name)
+    views = [(room_name, shm.buf[offset:offset + length]) for room_name, offset, length in slices]
+    try:
+        return fn(views)
+    finally:
+        try:
+            for _, view in views:
+                view.release()
+            del views
+            shm.close()
+        except BufferError:
+            # A traceback still references a view; the mapping goes with the process
+            logger.warning(f"Could not release shared memory segment {shm_name}")
+
+
+class SidecarClient:
+    """Web worker side of the sidecar: one pooled connection per in-flight call."""
+
+    def __init__(self, address: str = INFERENCE_SIDECAR_ADDRESS, authkey: Optional[bytes] = INFERENCE_SIDECAR_AUTHKEY,
+                 connect_timeout: float = INFERENCE_SIDECAR_CONNECT_TIMEOUT,
+                 call_timeout: float = INFERENCE_SIDECAR_CALL_TIMEOUT):
+        self.address = parse_address(address)
+        self.authkey = resolve_authkey(self.address, authkey)
+        self.connect_timeout = connect_timeout
+        self.call_timeout = call_timeout
+        self._idle = queue.SimpleQueue()
+
+    def _connect(self):
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return Client(self.address, authkey=self.authkey)
+            except (OSError, EOFError) as e:
+                if time.monotonic() >= deadline:
+                    raise SidecarUnavailableError(f"Inference sidecar not reachable at {self.address}") from e
+                time.sleep(0.2)
+
+    def call(self, name: str, *args) -> Any:
+        """Run inference function ``name`` in the sidecar and return its result (blocking)."""
+        shm = None
+        if name in SHARED_MEMORY_FUNCTIONS:
+            shm, slices = pack_items(args[0])
+            args = (slices,)
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                conn.send((name, args, shm.name if shm is not None else None))
+                if not conn.poll(self.call_timeout):
+                    # The late reply would be read by the next call; drop the connection
+                    conn.close()
+                    raise SidecarUnavailableError(f"Inference sidecar did not answer within {self.call_timeout}s")
+                ok, result = conn.recv()
+            except (OSError, EOFError) as e:
+                conn.close()
+                raise SidecarUnavailableError("Lost connection to the inference sidecar") from e
+            self._idle.put(conn)
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        if not ok:
+            raise result
+        return result
+
+    def close(self):
+        """Close idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SidecarServer:
+    """Accepts web worker connections and runs their jobs on a pool of model processes."""
+
+    def __init__(self, executor, address: str = INFERENCE_SIDECAR_ADDRESS,
+                 authkey: Optional[bytes] = INFERENCE_SIDECAR_AUTHKEY):
+        """
+        Args:
+            executor: ``InferenceExecutor`` in 'process' (or 'thread') mode owning the models
+            address: Unix socket path or loopback host:port
+            authkey: Shared secret web workers authenticate with; required for TCP
+
+        Raises:
+            ValueError: For a non-loopback TCP address or a TCP address without an authkey
+        """
+        self.executor = executor
+        self.address = parse_address(address)
+        self.authkey = resolve_authkey(self.address, authkey)
+        self._listener = None
+
+    def serve_forever(self):
+        """Accept connections until ``close`` is called; one thread per connection."""
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)  # stale socket from a previous run
+        self._listener = Listener(self.address, authkey=self.authkey)
+        logger.info(f"Inference sidecar listening on {self.address} "
+                    f"with {self.executor.workers} {self.executor.kind} worker(s)")
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                if self._listener is None:
+                    return
+                logger.exception("Failed to accept sidecar connection")
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    name, args, shm_name = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    result = (True, self.executor.submit(run_job, name, args, shm_name).result())
+                except Exception as e:
+                    result = (False, e)
+                try:
+                    conn.send(result)
+                except (OSError, EOFError):
+                    return
+                except Exception as e:
+                    # Unpicklable result or exception
+                    conn.send((False, RuntimeError(f"Sidecar could not return the result: {e!r}")))
+
+    def close(self):
+        """Stop accepting connections."""
+        listener, self._listener = self._listener, None
+        if listener is None:
+            return
+        # Closing the socket does not interrupt a blocked accept(); connect once to wake it
+        try:
+            if isinstance(self.address, str):
+                with socket.socket(socket.AF_UNIX) as wake:
+                    wake.connect(self.address)
+            else:
+                socket.create_connection(self.address, timeout=1).close()
+        except OSError:
+            pass
+        listener.close()
@@ -0,0 +1,208 @@
+"""
+Video walkthrough support for room hazard assessment.
+
+A walkthrough clip is read as a stream: frames are sampled at a fixed rate,
+scored for scene change (colour histogram distance from the start of the
+current shot) and sharpness (variance of the Laplacian), and only the
+sharpest frame of each shot becomes a keyframe for the detector. At most one
+candidate frame is held at a time, so memory does not grow with clip length.
+
+Keyframes are seconds and shots apart, so an object's box moves too much
+between them to link sightings by overlap. ``ObjectCounter`` instead counts
+each class by the keyframe that shows most of it: an object seen in several
+keyframes is reported once, at the cost of undercounting same-class objects
+that never appear together in one shot.
+"""
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Frames per second of video that are scored for keyframe selection
+VIDEO_SAMPLE_FPS = float(os.getenv("VIDEO_SAMPLE_FPS", "4"))
+# Histogram (Bhattacharyya) distance from the current shot that starts a new one
+VIDEO_SCENE_THRESHOLD = float(os.getenv("VIDEO_SCENE_THRESHOLD", "0.35"))
+# Frames with a lower Laplacian variance are too blurry to detect on
+VIDEO_MIN_SHARPNESS = float(os.getenv("VIDEO_MIN_SHARPNESS", "20"))
+# Emit a keyframe at least this often (seconds) during slow pans
+VIDEO_MAX_KEYFRAME_INTERVAL_S = float(os.getenv("VIDEO_MAX_KEYFRAME_INTERVAL_S", "3"))
+VIDEO_MAX_KEYFRAMES = int(os.getenv("VIDEO_MAX_KEYFRAMES", "30"))
+VIDEO_MAX_UPLOAD_MB = int(os.getenv("VIDEO_MAX_UPLOAD_MB", "200"))
+
+# Long side frames are shrunk to before scoring sharpness...
+ANALYSIS_SIZE = 160
+# ...and before taking the colour histogram, so blur and sensor noise barely move it
+HISTOGRAM_SIZE = 32
+
+
+class VideoDecodeError(Exception):
+    """Raised when an uploaded video cannot be opened or contains no frames."""
+    pass
+
+
+def _shrink(frame: np.ndarray, size: int) -> np.ndarray:
+    height, width = frame.shape[:2]
+    scale = size / max(height, width)
+    if scale >= 1:
+        return frame
+    return cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                      interpolation=cv2.INTER_AREA)
+
+
+def sharpness(frame: np.ndarray) -> float:
+    """Variance of the Laplacian of the grayscale frame; low values mean blur."""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+def colour_histogram(frame: np.ndarray) -> np.ndarray:
+    """Normalised hue/saturation histogram of a BGR frame."""
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    hist = cv2.calcHist([hsv], [0, 1], None, [16, 8], [0, 180, 0, 256])
+    return cv2.normalize(hist, hist).flatten()
+
+
+def scene_change(reference: np.ndarray, hist: np.ndarray) -> float:
+    """Bhattacharyya distance between two histograms: 0 same scene, 1 unrelated."""
+    return float(cv2.compareHist(reference, hist, cv2.HISTCMP_BHATTACHARYYA))
+
+
+class KeyframeSelector:
+    """Streaming selection of the sharpest frame per shot."""
+
+    def __init__(self, scene_threshold: float = VIDEO_SCENE_THRESHOLD,
+                 min_sharpness: float = VIDEO_MIN_SHARPNESS, max_interval: Optional[int] = None):
+        """
+        Args:
+            scene_threshold: Histogram distance from the shot's first frame that starts a new shot
+            min_sharpness: Shots whose sharpest frame is below this produce no keyframe
+            max_interval: End a shot after this many frames even without a scene change
+        """
+        self.scene_threshold = scene_threshold
+        self.min_sharpness = min_sharpness
+        self.max_interval = max_interval
+        self._reference = None
+        self._shot_start = 0
+        self._best: Optional[Tuple[int, np.ndarray, float]] = None
+
+    def push(self, index: int, frame: np.ndarray) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Score a sampled frame.
+
+        Returns:
+            (frame index, frame) of the previous shot's keyframe when this
+            frame starts a new shot, otherwise None
+        """
+        small = _shrink(frame, ANALYSIS_SIZE)
+        hist = colour_histogram(_shrink(small, HISTOGRAM_SIZE))
+        score = sharpness(small)
+
+        keyframe = None
+        if self._reference is not None:
+            new_shot = scene_change(self._reference, hist) >= self.scene_threshold
+            too_long = self.max_interval is not None and index - self._shot_start >= self.max_interval
+            if new_shot or too_long:
+                keyframe = self.flush()
+        if self._reference is None:
+            self._reference = hist
+            self._shot_start = index
+        if self._best is None or score > self._best[2]:
+            self._best = (index, frame, score)
+        return keyframe
+
+    def flush(self) -> Optional[Tuple[int, np.ndarray]]:
+        """End the current shot and return its keyframe, if sharp enough."""
+        best, self._best, self._reference = self._best, None, None
+        if best is None or best[2] < self.min_sharpness:
+            return None
+        return best[0], best[1]
+
+
+def iter_video_frames(path: str, sample_fps: float = VIDEO_SAMPLE_FPS) -> Iterator[Tuple[int, float, np.ndarray]]:
+    """
+    Yield (frame index, fps, frame) for frames sampled at about ``sample_fps``.
+
+    Skipped frames are only grabbed, not converted, and frames are not kept.
+
+    Raises:
+        VideoDecodeError: If the file cannot be opened as a video
+    """
+    capture = cv2.VideoCapture(str(path))
+    if not capture.isOpened():
+        raise VideoDecodeError("Could not open video")
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        step = max(1, int(round(fps / sample_fps))) if sample_fps > 0 else 1
+        index = 0
+        while capture.grab():
+            if index % step == 0:
+                ok, frame = capture.retrieve()
+                if ok and frame is not None:
+                    yield index, fps, frame
+            index += 1
+    finally:
+        capture.release()
+
+
+def select_keyframes(path: str, max_keyframes: int = VIDEO_MAX_KEYFRAMES,
+                     sample_fps: float = VIDEO_SAMPLE_FPS,
+                     selector: Optional[KeyframeSelector] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Yield (frame index, frame) keyframes of a video file as it is decoded.
+
+    Raises:
+        VideoDecodeError: If the file cannot be opened or has no frames
+    """
+    emitted = 0
+    sampled = 0
+    for index, fps, frame in iter_video_frames(path, sample_fps):
+        if selector is None:
+            selector = KeyframeSelector(max_interval=int(fps * VIDEO_MAX_KEYFRAME_INTERVAL_S))
+        sampled += 1
+        keyframe = selector.push(index, frame)
+        if keyframe is not None:
+            yield keyframe
+            emitted += 1
+            if emitted >= max_keyframes:
+                logger.info(f"Stopped video scan at frame {index}: {max_keyframes} keyframes reached")
+                return
+    if not sampled:
+        raise VideoDecodeError("Video contains no decodable frames")
+    keyframe = selector.flush()
+    if keyframe is not None:
+        yield keyframe
+
+
+class ObjectCounter:
+    """
+    Deduplicates same-class detections across keyframes.
+
+    For each class, the detections of the keyframe containing the most of
+    that class (ties go to the higher total confidence) are kept, so a class
+    is counted as many times as it was seen at once.
+    """
+
+    def __init__(self):
+        self._best: Dict[str, List[Dict[str, Any]]] = {}
+
+    def update(self, detections: List[Dict[str, Any]]):
+        """Add one keyframe's detections (dicts with 'object' and 'confidence')."""
+        by_class: Dict[str, List[Dict[str, Any]]] = {}
+        for detection in detections:
+            by_class.setdefault(detection["object"], []).append(detection)
+        for name, sightings in by_class.items():
+            best = self._best.get(name)
+            if best is None or (len(sightings), sum(d["confidence"] for d in sightings)) > \
+                    (len(best), sum(d["confidence"] for d in best)):
+                self._best[name] = sorted(sightings, key=lambda d: d["confidence"], reverse=True)
+
+    def objects(self) -> List[Dict[str, Any]]:
+        """The kept detections, grouped by class in order first seen, most confident first."""
+        return [detection for sightings in self._best.values() for detection in sightings]
+
+    def __len__(self) -> int:
+        return sum(len(sightings) for sightings in self._best.values())
@@ -0,0 +1,192 @@
+"""
+Lightweight in-process metrics.
+
+Counters, gauges and histograms kept in memory and exposed as JSON by the
+``/api/metrics`` endpoint. Each web worker process has its own registry.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence
+
+# Default histogram buckets, in milliseconds
+DEFAULT_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by label."""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, label: str = ""):
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + amount
+
+    def value(self, label: str = "") -> float:
+        return self._values.get(label, 0)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            values = dict(self._values)
+        if set(values) <= {""}:
+            return {"type": "counter", "value": values.get("", 0)}
+        return {"type": "counter", "values": values}
+
+
+class Gauge:
+    """Value that can go up and down, e.g. a queue depth."""
+
+    def __init__(self, name: str, description: str = ""):
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> Dict:
+        return {"type": "gauge", "value": self._value}
+
+
+class Histogram:
+    """Bucketed distribution with percentiles over a window of recent samples."""
+
+    def __init__(self, name: str, description: str = "",
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, window: int = 1024):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            index = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    index = i
+                    break
+            self._counts[index] += 1
+            self._count += 1
+            self._sum += value
+            self._recent.append(value)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-th percentile (0-100) of recent samples, or None if empty."""
+        with self._lock:
+            recent = sorted(self._recent)
+        if not recent:
+            return None
+        index = min(len(recent) - 1, int(round(q / 100 * (len(recent) - 1))))
+        return recent[index]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counts = list(self._counts)
+            count, total = self._count, self._sum
+        bucket_labels = [str(b) for b in self.buckets] + ["+Inf"]
+        return {
+            "type": "histogram",
+            "count": count,
+            "sum": round(total, 3),
+            "mean": round(total / count, 3) if count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": dict(zip(bucket_labels, counts)),
+        }
+
+
+class MetricsRegistry:
+    """Named collection of metrics; asking twice for a name returns the same metric."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {type(metric).__name__}")
+            return metric
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        return self._get_or_create(Counter, name, description)
+
+    def gauge(self, name: str, description: str = "") -> Gauge:
+        return self._get_or_create(Gauge, name, description)
+
+    def histogram(self, name: str, description: str = "", **kwargs) -> Histogram:
+        return self._get_or_create(Histogram, name, description, **kwargs)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Return all metrics as a JSON-serialisable dictionary."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: metric.snapshot() for name, metric in sorted(metrics.items())}
+
+
+class StageTimer:
+    """
+    Per-stage durations of one request, overall and per room.
+
+    Every duration is also observed by the ``{prefix}_{stage}_ms`` histogram,
+    so the breakdown of a single request and the latency distribution of
+    each stage come from the same measurements.
+    """
+
+    def __init__(self, prefix: str, registry: Optional[MetricsRegistry] = None):
+        self.prefix = prefix
+        self.registry = registry if registry is not None else metrics
+        self.stages: Dict[str, float] = {}
+        self.rooms: Dict[str, Dict[str, float]] = {}
+
+    def add(self, stage: str, ms: float, room: Optional[str] = None):
+        """Record ``ms`` milliseconds spent in ``stage`` (for ``room``, if given)."""
+        target = self.stages if room is None else self.rooms.setdefault(room, {})
+        target[stage] = round(target.get(stage, 0.0) + ms, 2)
+        self.registry.histogram(f"{self.prefix}_{stage}_ms", f"Time spent in the {stage} stage").observe(ms)
+
+    @contextmanager
+    def stage(self, stage: str, room: Optional[str] = None):
+        """Time the body of a ``with`` block as ``stage``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, (time.perf_counter() - start) * 1000, room)
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return {"stages": dict(self.stages), "rooms": {room: dict(stages) for room, stages in self.rooms.items()}}
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
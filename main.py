@@ -7,13 +7,12 @@ with risk assessment based on user profile.
 
 import os
 import json
+import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from pathlib import Path
 
-import cv2
-import numpy as np
 import os
 import json
 import logging
@@ -21,17 +20,15 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 
-import cv2
-import numpy as np
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Depends, Query, status
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Depends, Query, Body, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, RedirectResponse
+from fastapi.responses import JSONResponse, FileResponse, HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
-from ultralytics import YOLO
 from apscheduler.schedulers.background import BackgroundScheduler
 import shutil
+import tempfile
 import uuid
 from pathlib import Path
 from datetime import datetime
@@ -39,10 +36,27 @@ from typing import List, Dict, Optional
 
 # Import improved core logic
 from axa_app_mvp.logic.hazard_scoring import (
-    HazardConfig,
+    get_hazard_config,
     map_detected_objects_to_hazards,
     score_hazards
 )
+from axa_app_mvp.logic.inference import (
+    detect_room_images,
+    scan_video,
+    submit_room_images,
+    inference_executor,
+    unmapped_model_classes,
+    ModelLoadError,
+    INFERENCE_WARMUP,
+    INFERENCE_WARMUP_RETRY_S,
+    INFERENCE_WARMUP_RETRY_MAX_S
+)
+from axa_app_mvp.logic.assessments import AssessmentStore
+from axa_app_mvp.logic.batching import QueueFullError
+from axa_app_mvp.logic.detection import detections_to_dicts
+from axa_app_mvp.logic.jobs import JobError, JobRunner, JobStore
+from axa_app_mvp.logic.video import VideoDecodeError, VIDEO_MAX_UPLOAD_MB
+from axa_app_mvp.utils.metrics import StageTimer, metrics
 from axa_app_mvp.logic.qr_utils import (
     generate_secure_url,
     create_qr_code,
@@ -61,7 +75,6 @@ logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).parent
 OUTPUT_DIR = BASE_DIR / "outputs"
 PROFILES_DIR = BASE_DIR / "axa_app_mvp" / "profiles"
-MODEL_PATH = BASE_DIR / "models" / "yolov8n.pt"  # Update with your model path
 
 # Ensure required directories exist
 OUTPUT_DIR.mkdir(exist_ok=True)
@@ -90,22 +103,6 @@ app.mount("/static/images", StaticFiles(directory="axa_app_mvp/static/images"),
 scheduler = BackgroundScheduler()
 scheduler.start()
 
-# Load YOLO model (lazy load on first request)
-model = None
-def get_model():
-    global model
-    if model is None:
-        try:
-            model = YOLO(str(MODEL_PATH))
-            logger.info(f"Loaded YOLO model from {MODEL_PATH}")
-        except Exception as e:
-            logger.error(f"Failed to load YOLO model: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to load object detection model"
-            )
-    return model
-
 # Pydantic models for request/response validation
 class UserProfile(BaseModel):
     id: str
@@ -396,6 +393,37 @@ async def health_check():
     """
     return {"status": "ok", "message": "AXA ADAPT API is running"}
 
+@app.get("/api/ready")
+async def readiness_check():
+    """
+    Readiness endpoint for the load balancer.
+    Returns:
+        dict: 'ready' once the detection model is loaded and warmed up,
+        otherwise a 503 while warm-up is still running or has failed.
+    """
+    if getattr(app.state, "model_ready", False):
+        return {"status": "ready"}
+    error = getattr(app.state, "model_error", None)
+    return JSONResponse(
+        status_code=503,
+        content={"status": "error" if error else "warming_up", "detail": error}
+    )
+
+@app.get("/api/metrics")
+async def get_metrics():
+    """
+    Metrics endpoint.
+    Returns:
+        dict: In-process metrics for this worker (inference queue depth,
+        batch sizes, batch wait times, ...), plus the model classes that
+        map to no hazard in the current config.json.
+    """
+    # Refreshes the hazard_unmapped_model_classes gauge for the current config
+    unmapped = unmapped_model_classes()
+    snapshot = metrics.snapshot()
+    snapshot["unmapped_model_classes"] = unmapped
+    return snapshot
+
 @app.get("/qr/{qr_id}", response_class=HTMLResponse)
 async def view_health_summary(qr_id: str, request: Request):
     """
@@ -652,8 +680,49 @@ async def startup_event():
     expired, stale = cleanup_expired_tokens(output_dir=OUTPUT_DIR)
     logger.info(f"Cleaned up {expired} expired and {stale} stale tokens on startup")
     
-    # Preload model (optional)
-    # get_model()
+    # Preload and warm up the model in the background; /api/ready reports
+    # not-ready until this finishes so traffic only reaches warm workers
+    app.state.model_ready = False
+    app.state.model_error = None
+    if INFERENCE_WARMUP:
+        app.state.warmup_task = asyncio.create_task(warm_up_inference())
+    else:
+        app.state.model_ready = True
+    
+    # Process assessment jobs, including any queued before a restart
+    job_runner.start()
+
+async def warm_up_inference():
+    """
+    Load the detection model into every inference worker and run warm-up passes.
+
+    Failures (e.g. model weights still being mounted, or the sidecar not up
+    yet) are retried with exponential backoff; /api/ready reports the last
+    error meanwhile and turns ready once an attempt succeeds.
+    """
+    start = datetime.utcnow()
+    delay = INFERENCE_WARMUP_RETRY_S
+    while True:
+        try:
+            await inference_executor.warm_up()
+            break
+        except Exception as e:
+            app.state.model_error = str(e)
+            logger.error(f"Model warm-up failed, retrying in {delay:.0f}s: {e}")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, INFERENCE_WARMUP_RETRY_MAX_S)
+    app.state.model_error = None
+    app.state.model_ready = True
+    logger.info(f"Model warm-up finished in {(datetime.utcnow() - start).total_seconds():.1f}s")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release application services on shutdown."""
+    warmup_task = getattr(app.state, "warmup_task", None)
+    if warmup_task is not None:
+        warmup_task.cancel()
+    await job_runner.stop()
+    inference_executor.shutdown(wait=False)
 
 # Scheduled task for cleaning up expired tokens (runs daily)
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -1403,7 +1472,7 @@ def generate_qr_code_url(qr_data: Dict[str, Any], base_url: str = "https://axa-a
 
 from fastapi import Request, Form, Depends
 from axa_app_mvp.logic.hazard_scoring import (
-    HazardConfig, map_detected_objects_to_hazards, score_hazards
+    map_detected_objects_to_hazards, score_hazards
 )
 
 # ADAPT Tool Routes
@@ -1645,6 +1714,152 @@ async def adapt_tool_results(request: Request):
         "current_year": datetime.now().year
     })
 
+assessment_store = AssessmentStore(OUTPUT_DIR / "assessments")
+
+async def store_assessment(report: Dict, detected_objects: List[Dict]):
+    """
+    Persist an assessment's detections so a changed profile can be re-scored,
+    adding its 'assessment_id' and 'rescore_url' to the report.
+    
+    A failure to persist is logged; the report is still returned, just
+    without an assessment id.
+    """
+    try:
+        assessment_id = await asyncio.to_thread(assessment_store.save, detected_objects,
+                                                report.get("config_version"))
+    except OSError as e:
+        logger.error(f"Failed to store assessment detections: {e}")
+        return
+    report["assessment_id"] = assessment_id
+    report["rescore_url"] = f"/api/assessments/{assessment_id}/rescore"
+
+def build_hazard_report(detected_objects: List[Dict], profile: Dict,
+                        timer: Optional[StageTimer] = None) -> Dict:
+    """
+    Map detected objects to hazards and score them for a user profile.
+    
+    Args:
+        detected_objects: Detections from every room of the assessment
+        profile: User profile information
+        timer: If given, records the 'config' and 'scoring' stages
+        
+    Returns:
+        JSON-serialisable risk assessment report
+    """
+    # Load risk assessment configuration (parsed once per process, reloaded when edited)
+    try:
+        timer = timer or StageTimer("assessment")
+        with timer.stage("config"):
+            hazard_config = get_hazard_config(BASE_DIR / "axa_app_mvp" / "logic" / "config.json")
+        
+        if not detected_objects:
+            return {
+                "status": "success",
+                "message": "No hazards detected",
+                "score": 0,
+                "risk_level": "Low",
+                "hazards": [],
+                "config_version": hazard_config.version
+            }
+        
+        # Map detected objects to hazards and score them
+        with timer.stage("scoring"):
+            hazards = map_detected_objects_to_hazards(detected_objects, hazard_config)
+            report = score_hazards(hazards, profile, hazard_config, hazard_config.risk_thresholds)
+        
+        # Add timestamp and metadata
+        report["timestamp"] = datetime.utcnow().isoformat()
+        report["detected_objects"] = detections_to_dicts(detected_objects)
+        report["config_version"] = hazard_config.version
+        report["status"] = "success"
+        
+        return report
+        
+    except Exception as e:
+        logger.error(f"Error in risk assessment: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error in risk assessment: {str(e)}"
+        )
+
+async def read_room_uploads(room_files: Dict[str, Optional[UploadFile]],
+                            timer: Optional[StageTimer] = None) -> Dict[str, bytes]:
+    """
+    Read the uploaded room images that were provided, recording the 'read'
+    stage of each room on ``timer`` if given.
+    
+    Raises:
+        HTTPException: 400 if no image was provided
+    """
+    # Filter out None values (not provided files)
+    room_files = {k: v for k, v in room_files.items() if v is not None}
+    
+    if not room_files:
+        raise HTTPException(status_code=400, detail="No images provided")
+    
+    # Read every room image up front so they can be detected as one batch
+    room_bytes = {}
+    timer = timer or StageTimer("assessment")
+    for room_name, file in room_files.items():
+        try:
+            with timer.stage("read", room=room_name):
+                room_bytes[room_name] = await file.read()
+        except Exception as e:
+            logger.error(f"Error reading {room_name}: {e}")
+            continue
+    return room_bytes
+
+def inference_summary(room_timings: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """Time spent waiting for a batch slot vs running the model (slowest room)."""
+    return {
+        "queue_ms": max((t["queue_ms"] for t in room_timings.values()), default=0.0),
+        "inference_ms": max((t["inference_ms"] for t in room_timings.values()), default=0.0),
+    }
+
+def record_room_timings(timer: StageTimer, room_timings: Dict[str, Dict[str, float]]):
+    """Record each room's detection stages ('queue', 'inference', 'decode', 'model', 'postprocess')."""
+    for room_name, stages in room_timings.items():
+        for stage, ms in stages.items():
+            timer.add(stage[:-len("_ms")], ms, room=room_name)
+
+async def run_assessment(room_bytes: Dict[str, bytes], profile: Dict,
+                         timer: Optional[StageTimer] = None) -> Dict:
+    """
+    Detect objects in the room images and build the hazard report.
+    
+    Args:
+        room_bytes: Room name -> uploaded image bytes
+        profile: User profile information
+        timer: If given, records the detection and scoring stages
+    
+    Raises:
+        QueueFullError: If the inference queue is full
+        ModelLoadError: If the detection model cannot be loaded
+        HTTPException: 500 if scoring fails
+    """
+    # Decode and run object detection off the event loop; previously seen images
+    # come from the detection cache, the rest are batched together with images
+    # from other concurrent requests
+    timer = timer or StageTimer("assessment")
+    room_timings = {}
+    with timer.stage("detection"):
+        room_detections = await detect_room_images(room_bytes, timings=room_timings)
+    record_room_timings(timer, room_timings)
+    
+    detected_objects = []
+    for room_name, detections in room_detections.items():
+        if detections is None:
+            logger.warning(f"Failed to decode image for {room_name}")
+            continue
+        detected_objects.extend(detections)
+        logger.info(f"Processed {room_name}: {len(detections)} objects detected")
+    
+    report = build_hazard_report(detected_objects, profile, timer)
+    with timer.stage("store"):
+        await store_assessment(report, detected_objects)
+    report["inference"] = inference_summary(room_timings)
+    return report
+
 @app.post("/api/assess-hazards", response_model=Dict)
 async def assess_hazards(
     request: Request,
@@ -1653,7 +1868,8 @@ async def assess_hazards(
     hallway: UploadFile = File(None),
     steps: UploadFile = File(None),
     bedroom: UploadFile = File(None),
-    profile_json: str = Form(...)
+    profile_json: str = Form(...),
+    debug: bool = Query(False)
 ):
     """
     Accepts room images and user profile, returns fall hazard risk assessment.
@@ -1665,10 +1881,13 @@ async def assess_hazards(
         steps: Image of the stairs/steps
         bedroom: Image of the bedroom
         profile_json: JSON string containing user profile information
+        debug: Add a 'debug' block with per-stage timings, overall and per room
         
     Returns:
         JSON with risk assessment results
     """
+    timer = StageTimer("assessment")
+    start = datetime.utcnow()
     try:
         # Parse and validate profile
         try:
@@ -1676,96 +1895,31 @@ async def assess_hazards(
         except json.JSONDecodeError:
             raise HTTPException(status_code=400, detail="Invalid profile JSON")
         
-        # Process uploaded images
-        room_files = {
+        room_bytes = await read_room_uploads({
             "sitting_room": sitting_room,
             "bathroom": bathroom,
             "hallway": hallway,
             "steps": steps,
             "bedroom": bedroom,
-        }
+        }, timer)
         
-        # Filter out None values (not provided files)
-        room_files = {k: v for k, v in room_files.items() if v is not None}
-        
-        if not room_files:
-            raise HTTPException(status_code=400, detail="No images provided")
-        
-        # Load YOLO model
-        model = get_model()
-        
-        # Process each image
-        detected_objects = []
-        for room_name, file in room_files.items():
-            try:
-                contents = await file.read()
-                img_np = cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
-                if img_np is None:
-                    logger.warning(f"Failed to decode image for {room_name}")
-                    continue
-                
-                # Run object detection
-                results = model(img_np)
-                
-                # Process detection results
-                for r in results:
-                    for box in r.boxes:
-                        cls_id = int(box.cls[0])
-                        name = model.names[cls_id]
-                        confidence = float(box.conf[0])
-                        
-                        # Get bounding box coordinates
-                        x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                        
-                        detected_objects.append({
-                            "object": name,
-                            "location": room_name.replace('_', ' '),
-                            "confidence": confidence,
-                            "bbox": {
-                                "x1": x1,
-                                "y1": y1,
-                                "x2": x2,
-                                "y2": y2
-                            }
-                        })
-                        
-                logger.info(f"Processed {room_name}: {len(detected_objects)} objects detected")
-                
-            except Exception as e:
-                logger.error(f"Error processing {room_name}: {e}")
-                continue
-        
-        if not detected_objects:
-            return {
-                "status": "success",
-                "message": "No hazards detected",
-                "score": 0,
-                "risk_level": "Low",
-                "hazards": []
-            }
-        
-        # Load risk assessment configuration
         try:
-            config_path = BASE_DIR / "axa_app_mvp" / "logic" / "config.json"
-            hazard_config = HazardConfig(config_path)
-            
-            # Map detected objects to hazards and score them
-            hazards = map_detected_objects_to_hazards(detected_objects, hazard_config)
-            report = score_hazards(hazards, profile, hazard_config)
-            
-            # Add timestamp and metadata
-            report["timestamp"] = datetime.utcnow().isoformat()
-            report["detected_objects"] = detected_objects
-            report["status"] = "success"
-            
-            return report
-            
-        except Exception as e:
-            logger.error(f"Error in risk assessment: {e}")
+            report = await run_assessment(room_bytes, profile, timer)
+        except QueueFullError as e:
+            raise HTTPException(
+                status_code=503,
+                detail="Hazard detection is busy, please retry shortly",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        except ModelLoadError:
             raise HTTPException(
                 status_code=500,
-                detail=f"Error in risk assessment: {str(e)}"
+                detail="Failed to load object detection model"
             )
+        timer.add("total", (datetime.utcnow() - start).total_seconds() * 1000)
+        if debug:
+            report["debug"] = {"timings_ms": timer.as_dict()}
+        return report
             
     except HTTPException:
         raise
@@ -1776,3 +1930,268 @@ async def assess_hazards(
             detail=f"An unexpected error occurred: {str(e)}"
         )
     return report
+
+def sse_event(event: str, data: Dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/assess-hazards/stream")
+async def assess_hazards_stream(
+    request: Request,
+    sitting_room: UploadFile = File(None),
+    bathroom: UploadFile = File(None),
+    hallway: UploadFile = File(None),
+    steps: UploadFile = File(None),
+    bedroom: UploadFile = File(None),
+    profile_json: str = Form(...)
+):
+    """
+    Streaming variant of ``/api/assess-hazards`` using Server-Sent Events.
+    
+    Takes the same fields. A ``room`` event is sent as soon as each room is
+    processed, with that room's detections and hazard score; a final
+    ``report`` event carries the assessment over every room, identical to
+    the ``/api/assess-hazards`` response. Failures after the stream has
+    started are sent as an ``error`` event.
+    """
+    try:
+        profile = json.loads(profile_json)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid profile JSON")
+    
+    room_bytes = await read_room_uploads({
+        "sitting_room": sitting_room,
+        "bathroom": bathroom,
+        "hallway": hallway,
+        "steps": steps,
+        "bedroom": bedroom,
+    })
+    
+    # Admission happens before the stream starts so a full queue is still a 503
+    room_timings = {}
+    try:
+        rooms = submit_room_images(room_bytes, timings=room_timings)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Hazard detection is busy, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    async def events():
+        detected_objects = []
+        try:
+            async for room_name, detections in rooms:
+                if detections is None:
+                    logger.warning(f"Failed to decode image for {room_name}")
+                    yield sse_event("room", {"room": room_name, "status": "error",
+                                             "message": "Image could not be decoded"})
+                    continue
+                logger.info(f"Processed {room_name}: {len(detections)} objects detected")
+                detected_objects.extend(detections)
+                room_report = build_hazard_report(detections, profile)
+                room_report["room"] = room_name
+                room_report["inference"] = room_timings.get(room_name)
+                yield sse_event("room", room_report)
+            
+            report = build_hazard_report(detected_objects, profile)
+            await store_assessment(report, detected_objects)
+            report["inference"] = inference_summary(room_timings)
+            yield sse_event("report", report)
+        except ModelLoadError:
+            yield sse_event("error", {"status_code": 500, "detail": "Failed to load object detection model"})
+        except HTTPException as e:
+            yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.exception("Unexpected error in streamed hazard assessment")
+            yield sse_event("error", {"status_code": 500, "detail": f"An unexpected error occurred: {str(e)}"})
+        finally:
+            await rooms.aclose()
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+async def process_assessment_job(room_bytes: Dict[str, bytes], profile: Dict) -> Dict:
+    """Run an assessment job; failures are reported on the job instead of as an HTTP error."""
+    try:
+        return await run_assessment(room_bytes, profile)
+    except ModelLoadError:
+        raise JobError("Failed to load object detection model")
+    except HTTPException as e:
+        raise JobError(e.detail)
+
+job_store = JobStore(OUTPUT_DIR / "jobs")
+job_runner = JobRunner(job_store, process_assessment_job)
+
+@app.post("/api/assessment-jobs", status_code=202)
+async def create_assessment_job(
+    request: Request,
+    sitting_room: UploadFile = File(None),
+    bathroom: UploadFile = File(None),
+    hallway: UploadFile = File(None),
+    steps: UploadFile = File(None),
+    bedroom: UploadFile = File(None),
+    profile_json: str = Form(...)
+):
+    """
+    Queue a fall hazard risk assessment and return its job id immediately.
+    
+    Takes the same fields as ``/api/assess-hazards``. The job survives a
+    worker restart; poll ``status_url`` until its status is ``succeeded``
+    (the report is in ``result``) or ``failed`` (the reason is in ``error``).
+    
+    Returns:
+        JSON with the job id, its status and where to poll it
+    """
+    try:
+        profile = json.loads(profile_json)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid profile JSON")
+    
+    room_bytes = await read_room_uploads({
+        "sitting_room": sitting_room,
+        "bathroom": bathroom,
+        "hallway": hallway,
+        "steps": steps,
+        "bedroom": bedroom,
+    })
+    
+    job = await asyncio.to_thread(job_store.create, room_bytes, profile)
+    job_runner.enqueue(job["job_id"])
+    return {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "status_url": f"/api/assessment-jobs/{job['job_id']}"
+    }
+
+@app.get("/api/assessment-jobs/{job_id}", response_model=Dict)
+async def get_assessment_job(job_id: str):
+    """
+    Return the status of an assessment job, with its report once it has succeeded.
+    """
+    job = await asyncio.to_thread(job_store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Assessment job not found")
+    # The profile holds health data; it is only needed to run the job
+    job.pop("profile", None)
+    return job
+
+@app.post("/api/assessments/{assessment_id}/rescore", response_model=Dict)
+async def rescore_assessment(
+    assessment_id: str,
+    profile: Dict = Body(...),
+    debug: bool = Query(False)
+):
+    """
+    Re-score a stored assessment for a changed user profile.
+    
+    Maps and scores the detections saved by the original assessment (its
+    'assessment_id') under the current hazard config; no images are uploaded
+    and the detector is not run again.
+    
+    Args:
+        assessment_id: Id returned with the original assessment
+        profile: JSON user profile, as in ``profile_json`` of ``/api/assess-hazards``
+        debug: Add a 'debug' block with per-stage timings
+        
+    Returns:
+        JSON with risk assessment results
+    """
+    timer = StageTimer("rescore")
+    with timer.stage("load"):
+        detections = await asyncio.to_thread(assessment_store.load, assessment_id)
+    if detections is None:
+        raise HTTPException(status_code=404, detail="Assessment not found")
+    
+    report = build_hazard_report(detections, profile, timer)
+    report["assessment_id"] = assessment_id
+    if debug:
+        report["debug"] = {"timings_ms": timer.as_dict()}
+    return report
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def copy_upload(source, target, max_bytes: int) -> Optional[int]:
+    """
+    Copy an upload in chunks, stopping as soon as it exceeds ``max_bytes``.
+    
+    Returns:
+        Bytes copied, or None if the upload is larger than ``max_bytes``
+    """
+    size = 0
+    while True:
+        chunk = source.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            return size
+        size += len(chunk)
+        if size > max_bytes:
+            return None
+        target.write(chunk)
+
+@app.post("/api/assess-hazards/video", response_model=Dict)
+async def assess_hazards_video(
+    request: Request,
+    video: UploadFile = File(...),
+    room: str = Form(...),
+    profile_json: str = Form(...)
+):
+    """
+    Accepts a walkthrough video of a room and user profile, returns fall hazard risk assessment.
+    
+    The clip is decoded as a stream in the inference worker; only the sharpest
+    frame of each shot is run through the detector, and objects seen in several
+    keyframes are counted once.
+    
+    Args:
+        video: Walkthrough video (any format OpenCV can read, e.g. MP4)
+        room: Room the video was taken in, e.g. "sitting_room"
+        profile_json: JSON string containing user profile information
+        
+    Returns:
+        JSON with risk assessment results and video scan statistics
+    """
+    try:
+        profile = json.loads(profile_json)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid profile JSON")
+    
+    # The upload is already spooled to disk; copy it to a named file the worker can open
+    suffix = Path(video.filename or "").suffix or ".mp4"
+    with tempfile.NamedTemporaryFile(prefix="walkthrough_", suffix=suffix, delete=False) as tmp:
+        video_path = tmp.name
+    try:
+        with open(video_path, "wb") as buffer:
+            size = await asyncio.to_thread(copy_upload, video.file, buffer,
+                                           int(VIDEO_MAX_UPLOAD_MB * 1024 * 1024))
+        if size is None:
+            raise HTTPException(status_code=413, detail=f"Video larger than {VIDEO_MAX_UPLOAD_MB} MB")
+        if size == 0:
+            raise HTTPException(status_code=400, detail="No video provided")
+        
+        try:
+            scan = await scan_video(video_path, room)
+        except QueueFullError as e:
+            raise HTTPException(
+                status_code=503,
+                detail="Hazard detection is busy, please retry shortly",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        except ModelLoadError:
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to load object detection model"
+            )
+        except VideoDecodeError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        os.unlink(video_path)
+    
+    logger.info(f"Processed {room} video: {scan['keyframes']} keyframes, "
+                f"{len(scan['detections'])} objects found")
+    report = build_hazard_report(scan["detections"], profile)
+    await store_assessment(report, scan["detections"])
+    report["video"] = {
+        "keyframes": scan["keyframes"],
+        "unique_objects": len(scan["detections"])
+    }
+    return report
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Re-score stored assessments against the current hazard config.
+
+Reads (profile, detected objects or hazards) records from a JSONL or CSV
+file and writes one result per record, in input order, as results are
+scored (see ``axa_app_mvp.logic.batch_scoring`` for the record format).
+
+    python scripts/batch_score.py assessments.jsonl --output rescored.csv
+    python scripts/batch_score.py assessments.csv --workers 8 --chunk-size 5000 > rescored.jsonl
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from axa_app_mvp.logic.batch_scoring import DEFAULT_CHUNK_SIZE, read_records, score_records, write_results
+from axa_app_mvp.logic.hazard_scoring import DEFAULT_CONFIG_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL or CSV file of records ('-' for JSONL on stdin)")
+    parser.add_argument("--output", default="-",
+                        help="Results file, CSV if it ends in .csv, otherwise JSONL (default: stdout)")
+    parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG_PATH,
+                        help=f"Hazard config to score against (default: {DEFAULT_CONFIG_PATH})")
+    parser.add_argument("--workers", type=int, help="Scoring processes (default: CPU count; 0 scores inline)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Records per vectorized chunk (default: {DEFAULT_CHUNK_SIZE})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    start = time.perf_counter()
+    # JSONL lines are decoded by the scoring workers, not this process
+    results = score_records(read_records(args.input, parse=False), config_path=args.config,
+                            workers=args.workers, chunk_size=args.chunk_size)
+    written = write_results(results, args.output)
+    elapsed = time.perf_counter() - start
+    logging.info(f"Scored {written} records in {elapsed:.1f}s ({written / max(elapsed, 1e-9):.0f} records/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of /api/assess-hazards.
+
+Generates synthetic room photos at several resolutions and room counts,
+drives the endpoint in-process through the ASGI app at a fixed concurrency
+and reports throughput plus p50/p95/p99 latency of every pipeline stage
+(the ``?debug=true`` timing breakdown) and of the whole request.
+
+By default it runs fully offline on a randomly initialised YOLOv8n built
+from its architecture file, with the detection cache disabled, so results
+are comparable across commits on the same machine; detection quality is
+meaningless. The random weights detect nothing, so with the thread and
+inline executors each result is given fixed boxes of hazard classes to
+exercise hazard mapping and scoring (process workers load their own model,
+and the report then notes that scoring was skipped). Pass --model to
+benchmark real weights instead. Assessments and jobs are stored in a
+temporary directory that is removed afterwards.
+
+    python scripts/benchmark_assessment.py
+    python scripts/benchmark_assessment.py --resolutions 1920x1080 --rooms 5 --concurrency 8 \\
+        --requests 50 --output bench.json
+
+Requires httpx.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+# Add the project root to the Python path
+sys.path.insert(0, str(ROOT))
+
+ROOMS = ("sitting_room", "bathroom", "hallway", "steps", "bedroom")
+PROFILE = {"mobility": 1, "vision": 0, "cognition": 0.5}
+STAND_IN_MODEL = ROOT / "outputs" / "benchmark" / "yolov8n-random.pt"
+
+
+def build_stand_in_model(path: Path = STAND_IN_MODEL) -> Path:
+    """
+    Save a randomly initialised YOLOv8n (no download needed).
+
+    Its first classes are named after the hazard objects in config.json so
+    the app runs the full detection path instead of skipping the model.
+    """
+    if not path.exists():
+        from ultralytics import YOLO
+        from axa_app_mvp.logic.hazard_scoring import HazardConfig
+
+        config = HazardConfig(ROOT / "axa_app_mvp" / "logic" / "config.json")
+        objects = list(config.detection_mapping)
+        model = YOLO("yolov8n.yaml")
+        model.model.names = {i: objects[i] if i < len(objects) else f"class_{i}"
+                             for i in range(len(model.names))}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        model.save(str(path))
+    return path
+
+
+class FixedDetectionsModel:
+    """
+    Wraps the stand-in model so every image shows a few hazard objects.
+
+    The wrapped model still runs on every batch, so inference cost is real;
+    its (empty) results are replaced by fixed boxes of the first classes the
+    caller asked for, so hazard mapping and scoring see real work.
+    """
+
+    def __init__(self, model, objects_per_image: int = 3):
+        self.model = model
+        self.names = model.names
+        self.objects_per_image = objects_per_image
+
+    def __call__(self, images, **kwargs):
+        import torch
+
+        results = self.model(images, **kwargs)
+        classes = list(kwargs.get("classes") or [])[:self.objects_per_image]
+        for result in results:
+            if not classes:
+                continue
+            height, width = result.orig_shape
+            result.update(boxes=torch.tensor([
+                [width * 0.1 * i, height * 0.1 * i, width * (0.3 + 0.1 * i), height * (0.3 + 0.1 * i), 0.9, cls_id]
+                for i, cls_id in enumerate(classes)
+            ], dtype=torch.float32))
+        return results
+
+
+def parse_resolutions(spec: str) -> List[Tuple[int, int]]:
+    """Parse "640x480,1920x1080" into [(640, 480), (1920, 1080)] (width, height) pairs."""
+    resolutions = []
+    for part in spec.split(","):
+        if part.strip():
+            width, height = part.lower().split("x", 1)
+            resolutions.append((int(width), int(height)))
+    return resolutions
+
+
+def synthetic_room(rng: np.random.Generator, width: int, height: int) -> bytes:
+    """JPEG of a textured 'room': a gradient, random furniture-sized blocks and sensor noise."""
+    gradient = np.linspace(60, 200, width, dtype=np.float32)
+    image = np.empty((height, width, 3), np.float32)
+    image[:] = gradient[None, :, None]
+    for _ in range(12):
+        x1, y1 = int(rng.integers(0, width)), int(rng.integers(0, height))
+        x2 = min(width, x1 + int(rng.integers(width // 20 + 1, width // 3 + 2)))
+        y2 = min(height, y1 + int(rng.integers(height // 20 + 1, height // 3 + 2)))
+        image[y1:y2, x1:x2] = rng.integers(0, 256, 3)
+    image += rng.normal(0, 8, image.shape).astype(np.float32)
+    ok, buf = cv2.imencode(".jpg", image.clip(0, 255).astype(np.uint8), [cv2.IMWRITE_JPEG_QUALITY, 90])
+    assert ok
+    return buf.tobytes()
+
+
+def summarise(values_ms: Sequence[float]) -> Dict[str, float]:
+    """Count, mean and p50/p95/p99 of latencies in milliseconds."""
+    if not values_ms:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0}
+    values = np.asarray(values_ms, dtype=np.float64)
+    return {
+        "count": len(values),
+        "mean": round(float(values.mean()), 2),
+        "p50": round(float(np.percentile(values, 50)), 2),
+        "p95": round(float(np.percentile(values, 95)), 2),
+        "p99": round(float(np.percentile(values, 99)), 2),
+    }
+
+
+async def run_scenario(client, width: int, height: int, rooms: int, requests: int,
+                       concurrency: int, seed: int) -> Dict:
+    """Send ``requests`` assessments of ``rooms`` images each, ``concurrency`` at a time."""
+    rng = np.random.default_rng(seed)
+    # Every request gets its own images so nothing is answered from a cache
+    payloads = [{room: synthetic_room(rng, width, height) for room in ROOMS[:rooms]} for _ in range(requests)]
+    stages = defaultdict(list)
+    errors = defaultdict(int)
+    detections = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(images):
+        async with semaphore:
+            files = {room: (f"{room}.jpg", contents, "image/jpeg") for room, contents in images.items()}
+            start = time.perf_counter()
+            response = await client.post("/api/assess-hazards", params={"debug": "true"},
+                                         files=files, data={"profile_json": json.dumps(PROFILE)})
+            elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            errors[response.status_code] += 1
+            return
+        stages["request"].append(elapsed)
+        report = response.json()
+        detections.append(len(report.get("detected_objects", [])))
+        timings = report.get("debug", {}).get("timings_ms", {})
+        for stage, ms in timings.get("stages", {}).items():
+            stages[stage].append(ms)
+        for room_stages in timings.get("rooms", {}).values():
+            for stage, ms in room_stages.items():
+                stages[stage].append(ms)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(images) for images in payloads))
+    wall_s = time.perf_counter() - start
+    completed = len(stages["request"])
+    return {
+        "resolution": f"{width}x{height}",
+        "rooms": rooms,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": dict(errors),
+        "wall_s": round(wall_s, 3),
+        "requests_per_s": round(completed / wall_s, 2),
+        "images_per_s": round(completed * rooms / wall_s, 2),
+        "detections_per_request": round(sum(detections) / completed, 2) if completed else 0.0,
+        "stages_ms": {stage: summarise(values) for stage, values in stages.items()},
+    }
+
+
+async def benchmark(args) -> Dict:
+    import httpx
+    import main
+    from axa_app_mvp.logic import inference
+    from axa_app_mvp.logic.inference import inference_executor
+
+    # Score with fixed detections unless the model runs in worker processes this one cannot reach
+    scoring_skipped = False
+    if args.model is None:
+        if inference_executor.kind == "process":
+            scoring_skipped = True
+            print("Note: the random-weight stand-in detects nothing in process workers, "
+                  "so hazard mapping and scoring are not measured")
+        else:
+            inference._model = FixedDetectionsModel(inference.get_model())
+
+    await inference_executor.warm_up()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="axa-benchmark-") as storage:
+        # Keep the assessments each request stores out of the repo's outputs/
+        main.assessment_store.root = Path(storage) / "assessments"
+        main.job_store.root = Path(storage) / "jobs"
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for width, height in parse_resolutions(args.resolutions):
+                for rooms in args.rooms:
+                    # Untimed round so lazily created pools and buffers exist before measuring
+                    await run_scenario(client, width, height, rooms, args.warmup, args.concurrency, args.seed + 1)
+                    result = await run_scenario(client, width, height, rooms, args.requests,
+                                                args.concurrency, args.seed)
+                    results.append(result)
+                    print_result(result)
+    inference_executor.shutdown()
+    return {
+        "model": os.environ["MODEL_PATH"],
+        "executor": inference_executor.kind,
+        "workers": inference_executor.workers,
+        "scoring_skipped": scoring_skipped,
+        "scenarios": results,
+    }
+
+
+def print_result(result: Dict):
+    print(f"\n{result['resolution']} x {result['rooms']} room(s), {result['requests']} requests "
+          f"at concurrency {result['concurrency']}: {result['requests_per_s']} req/s, "
+          f"{result['images_per_s']} images/s, {result['detections_per_request']} detections/request"
+          + (f", errors {result['errors']}" if result["errors"] else ""))
+    print(f"  {'stage':<12} {'count':>6} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for stage, summary in result["stages_ms"].items():
+        print(f"  {stage:<12} {summary['count']:>6} {summary['mean']:>9} {summary['p50']:>9} "
+              f"{summary['p95']:>9} {summary['p99']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resolutions", default="640x480,1920x1080,4032x3024",
+                        help="Comma-separated WIDTHxHEIGHT photo sizes (default: 640x480,1920x1080,4032x3024)")
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1, 5],
+                        help="Room counts per request, 1-5 (default: 1 5)")
+    parser.add_argument("--requests", type=int, default=20, help="Timed requests per scenario (default: 20)")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed requests per scenario (default: 2)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight (default: 4)")
+    parser.add_argument("--executor", default="thread", choices=["process", "thread", "inline"],
+                        help="INFERENCE_EXECUTOR to benchmark (default: thread)")
+    parser.add_argument("--workers", type=int, help="INFERENCE_WORKERS (default: the app's default)")
+    parser.add_argument("--model", type=Path, help="Model weights (default: random-weight YOLOv8n stand-in)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic photos")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+    if not all(1 <= rooms <= len(ROOMS) for rooms in args.rooms):
+        parser.error(f"--rooms must be between 1 and {len(ROOMS)}")
+
+    # The app reads its settings at import time
+    os.environ["MODEL_PATH"] = str(args.model or build_stand_in_model())
+    os.environ["INFERENCE_EXECUTOR"] = args.executor
+    os.environ["DETECTION_CACHE_SIZE"] = "0"
+    os.environ["INFERENCE_MAX_QUEUE_DEPTH"] = "0"
+    if args.workers:
+        os.environ["INFERENCE_WORKERS"] = str(args.workers)
+    os.chdir(ROOT)
+
+    report = asyncio.run(benchmark(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -43,6 +43,10 @@ def load_detection_mapping(csv_path):
                 'example': row['example'],
                 'notes': row['notes']
             }
+            # Optional ';'-separated synonyms of the object label
+            aliases = [a.strip() for a in (row.get('aliases') or '').split(';') if a.strip()]
+            if aliases:
+                mapping['aliases'] = aliases
             mappings.append(mapping)
     return mappings
 
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Build the INT8 hazard detector and compare it with the FP32 model.
+
+Calibrates the INT8 ONNX model on a folder of local room photos, then runs
+both models over the same photos and reports per-image latency and how many
+hazards ``map_detected_objects_to_hazards`` derives differently. Only switch
+to INFERENCE_PRECISION=int8 when the hazard differences are acceptable.
+
+    python scripts/evaluate_quantized.py --images data/rooms --output int8_report.json
+    INFERENCE_BACKEND=onnx INFERENCE_PRECISION=int8 gunicorn main:app ...
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from axa_app_mvp.logic.backends import load_model
+from axa_app_mvp.logic.detection import detect_image_views
+from axa_app_mvp.logic.hazard_scoring import HazardConfig
+from axa_app_mvp.logic.inference import DETECTION_MIN_CONFIDENCE, MODEL_PATH
+from axa_app_mvp.logic.preprocessing import letterbox_buffer, prepare_image
+from axa_app_mvp.logic.quantization import (
+    compare_hazard_counts,
+    hazard_counts,
+    latency_summary,
+    list_images,
+    quantize_model
+)
+
+CONFIG_PATH = Path(__file__).parent.parent / "axa_app_mvp" / "logic" / "config.json"
+
+
+def timed_detect(model, contents, name, classes, imgsz):
+    """
+    Run one encoded image through a model as the app serves it: decoded at
+    reduced size, letterboxed and mapped back to full resolution.
+
+    Returns:
+        (detections, milliseconds), or None if the image cannot be decoded
+    """
+    start = time.perf_counter()
+    prepared = prepare_image(contents, imgsz, out=letterbox_buffer(imgsz))
+    if prepared is None:
+        return None
+    detections = detect_image_views(model, [[prepared]], [name], classes=classes,
+                                    conf=DETECTION_MIN_CONFIDENCE)[0]
+    return detections, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=Path, required=True, help="Folder of room photos")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH, help=f"PyTorch weights (default: {MODEL_PATH})")
+    parser.add_argument("--fp32-backend", default="pytorch", choices=["pytorch", "onnx"],
+                        help="FP32 reference backend (default: pytorch)")
+    parser.add_argument("--imgsz", type=int, default=640, help="Model input size")
+    parser.add_argument("--calibration-images", type=int, default=100,
+                        help="Number of photos used to calibrate activation ranges")
+    parser.add_argument("--force", action="store_true", help="Re-quantize even if a cached INT8 model exists")
+    parser.add_argument("--output", type=Path, help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    images = list_images(args.images)
+    if not images:
+        print(f"No images found in {args.images}")
+        sys.exit(1)
+
+    quantize_model(args.model, images[:args.calibration_images], imgsz=args.imgsz, force=args.force)
+    fp32_model = load_model(args.model, args.fp32_backend)
+    int8_model = load_model(args.model, "onnx", precision="int8")
+    config = HazardConfig(CONFIG_PATH)
+    classes = config.get_detection_class_ids(fp32_model.names)
+
+    # Warm both models up so the first image does not skew latency
+    warmup = images[0].read_bytes()
+    for model in (fp32_model, int8_model):
+        timed_detect(model, warmup, "warmup", classes, args.imgsz)
+
+    fp32_latencies, int8_latencies, per_image = [], [], []
+    hazards_changed = detections_fp32 = detections_int8 = 0
+    for path in images:
+        contents = path.read_bytes()
+        fp32_run = timed_detect(fp32_model, contents, path.stem, classes, args.imgsz)
+        if fp32_run is None:
+            print(f"Skipping unreadable image {path.name}")
+            continue
+        fp32_dets, fp32_ms = fp32_run
+        int8_dets, int8_ms = timed_detect(int8_model, contents, path.stem, classes, args.imgsz)
+        fp32_latencies.append(fp32_ms)
+        int8_latencies.append(int8_ms)
+        detections_fp32 += len(fp32_dets)
+        detections_int8 += len(int8_dets)
+
+        fp32_hazards = hazard_counts(fp32_dets, config)
+        int8_hazards = hazard_counts(int8_dets, config)
+        changed = compare_hazard_counts(fp32_hazards, int8_hazards)
+        hazards_changed += changed
+        per_image.append({
+            "image": path.name,
+            "fp32_ms": round(fp32_ms, 2),
+            "int8_ms": round(int8_ms, 2),
+            "fp32_hazards": dict(fp32_hazards),
+            "int8_hazards": dict(int8_hazards),
+            "hazards_changed": changed,
+        })
+
+    fp32_summary = latency_summary(fp32_latencies)
+    int8_summary = latency_summary(int8_latencies)
+    report = {
+        "images": len(per_image),
+        "fp32_backend": args.fp32_backend,
+        "fp32_latency_ms": fp32_summary,
+        "int8_latency_ms": int8_summary,
+        "speedup": round(fp32_summary["mean"] / int8_summary["mean"], 2) if int8_summary["mean"] else None,
+        "fp32_detections": detections_fp32,
+        "int8_detections": detections_int8,
+        "hazards_changed": hazards_changed,
+        "images_with_changed_hazards": sum(1 for r in per_image if r["hazards_changed"]),
+        "per_image": per_image,
+    }
+
+    print(f"Images evaluated:            {report['images']}")
+    print(f"FP32 latency (ms):           {fp32_summary}")
+    print(f"INT8 latency (ms):           {int8_summary}")
+    print(f"Speedup:                     {report['speedup']}x")
+    print(f"Detections FP32 / INT8:      {detections_fp32} / {detections_int8}")
+    print(f"Hazards mapped differently:  {hazards_changed} "
+          f"(in {report['images_with_changed_hazards']} images)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
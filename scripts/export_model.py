@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Export the hazard detector for a CPU inference backend.
+
+One-off step per model/host: the exported artifact is cached next to the
+PyTorch weights and picked up by the app when INFERENCE_BACKEND is set.
+
+    python scripts/export_model.py --backend onnx
+    INFERENCE_BACKEND=onnx gunicorn main:app ...
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from axa_app_mvp.logic.backends import BACKENDS, export_model
+from axa_app_mvp.logic.inference import MODEL_PATH
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", required=True, choices=[name for name, b in BACKENDS.items() if b.export_format],
+                        help="Backend to export for")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH, help=f"PyTorch weights (default: {MODEL_PATH})")
+    parser.add_argument("--imgsz", type=int, default=640, help="Export input size")
+    parser.add_argument("--force", action="store_true", help="Re-export even if a cached artifact exists")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.model.exists():
+        print(f"Model weights not found: {args.model}")
+        sys.exit(1)
+
+    artifact = export_model(args.model, args.backend, imgsz=args.imgsz, force=args.force)
+    print(f"{args.backend} model ready at {artifact}")
+    print(f"Serve it with INFERENCE_BACKEND={args.backend}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Run the shared inference sidecar.
+
+One sidecar per host owns the detector processes; gunicorn workers started
+with INFERENCE_EXECUTOR=sidecar send it their batches instead of each
+loading their own model.
+
+    python scripts/inference_sidecar.py --workers 4 &
+    INFERENCE_EXECUTOR=sidecar gunicorn main:app --workers 8 ...
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from axa_app_mvp.logic.inference import INFERENCE_WARMUP, InferenceExecutor, ModelLoadError
+from axa_app_mvp.logic.sidecar import (
+    INFERENCE_SIDECAR_ADDRESS,
+    INFERENCE_SIDECAR_WORKERS,
+    SidecarServer
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--address", default=INFERENCE_SIDECAR_ADDRESS,
+                        help=f"Unix socket path or host:port (default: {INFERENCE_SIDECAR_ADDRESS})")
+    parser.add_argument("--workers", type=int, default=INFERENCE_SIDECAR_WORKERS,
+                        help=f"Model processes (default: {INFERENCE_SIDECAR_WORKERS})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    executor = InferenceExecutor(kind="process", workers=args.workers)
+    if INFERENCE_WARMUP:
+        start = time.perf_counter()
+        try:
+            asyncio.run(executor.warm_up())
+            logging.info(f"Warmed up {args.workers} model process(es) in {time.perf_counter() - start:.2f}s")
+        except ModelLoadError:
+            # Keep serving; each request reports the model error to its web worker
+            logging.exception("Model warm-up failed")
+
+    server = SidecarServer(executor, address=args.address)
+    signal.signal(signal.SIGTERM, lambda *_: server.close())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    main()
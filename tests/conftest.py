@@ -120,3 +120,64 @@ def sample_detection_mapping():
         'light_bulb_out': 'poor_lighting',
         'threshold': 'steps_or_thresholds'
     }
+
+
+class FakeBoxes:
+    """Minimal stand-in for ultralytics ``Boxes`` backed by numpy arrays."""
+
+    def __init__(self, cls, conf, xyxy):
+        import numpy as np
+        self.cls = np.asarray(cls, dtype=np.float32)
+        self.conf = np.asarray(conf, dtype=np.float32)
+        self.xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+
+    def __len__(self):
+        return len(self.cls)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield FakeBoxes(self.cls[i:i + 1], self.conf[i:i + 1], self.xyxy[i:i + 1])
+
+
+class FakeResult:
+    """Minimal stand-in for an ultralytics ``Results`` object."""
+
+    def __init__(self, cls, conf, xyxy):
+        self.boxes = FakeBoxes(cls, conf, xyxy)
+
+
+class FakeModel:
+    """YOLO stand-in returning canned results keyed by image shape (or by ``key(image)``)."""
+
+    names = {0: 'person', 1: 'rug', 2: 'box'}
+
+    def __init__(self, results_by_shape, key=None):
+        self.results_by_shape = results_by_shape
+        self.key = key or (lambda img: img.shape)
+        self.calls = []
+
+    def __call__(self, images, **kwargs):
+        self.calls.append((images, kwargs))
+        return [self.results_by_shape[self.key(img)] for img in images]
+
+
+@pytest.fixture
+def fake_result():
+    """Factory for fake detection results: fake_result(cls, conf, xyxy)."""
+    return FakeResult
+
+
+@pytest.fixture
+def fake_model_class():
+    """The FakeModel class, for tests that need their own canned results."""
+    return FakeModel
+
+
+@pytest.fixture
+def fake_model(fake_result):
+    """Fake detector with canned results for 10x10, 20x20 and 30x30 images."""
+    return FakeModel({
+        (10, 10, 3): fake_result([1, 0], [0.9, 0.4], [[1, 2, 3, 4], [5, 6, 7, 8]]),
+        (20, 20, 3): fake_result([2], [0.75], [[10.6, 11.2, 12.9, 13.1]]),
+        (30, 30, 3): fake_result([], [], []),
+    })
@@ -0,0 +1,54 @@
+import os
+import time
+
+from axa_app_mvp.logic.assessments import AssessmentStore
+from axa_app_mvp.logic.detection import Detection
+from axa_app_mvp.logic.hazard_scoring import HazardConfig, DEFAULT_CONFIG_PATH, map_detected_objects_to_hazards, score_hazards
+
+DETECTIONS = [Detection("rug", "sitting room", 0.9, 1, 2, 3, 4),
+              Detection("cord", "hallway", 0.6, 10, 20, 30, 40)]
+
+
+def test_detections_round_trip(temp_dir):
+    """Test that stored detections load back as equal Detection records."""
+    store = AssessmentStore(temp_dir / "assessments")
+
+    assessment_id = store.save(DETECTIONS, config_version="1.0.0+abc")
+    loaded = store.load(assessment_id)
+
+    assert loaded == DETECTIONS
+    assert all(isinstance(detection, Detection) for detection in loaded)
+
+
+def test_rescore_from_stored_detections(temp_dir):
+    """Test that re-scoring stored detections gives the score of the original detections."""
+    store = AssessmentStore(temp_dir / "assessments")
+    config = HazardConfig(DEFAULT_CONFIG_PATH)
+    profile = {"mobility": 1, "vision": 0.5, "cognition": 0}
+
+    loaded = store.load(store.save(DETECTIONS))
+
+    expected = score_hazards(map_detected_objects_to_hazards(DETECTIONS, config), profile, config, None)
+    rescored = score_hazards(map_detected_objects_to_hazards(loaded, config), profile, config, None)
+    assert rescored == expected
+
+
+def test_unknown_assessment_ids(temp_dir):
+    """Test that unknown or malformed assessment ids are not found."""
+    store = AssessmentStore(temp_dir / "assessments")
+
+    assert store.load("0" * 32) is None
+    assert store.load("../../etc/passwd") is None
+
+
+def test_purge_expired_assessments(temp_dir):
+    """Test that only assessments older than the retention period are deleted."""
+    store = AssessmentStore(temp_dir / "assessments", retention_hours=0)
+    old = store.save(DETECTIONS)
+    new = store.save([])
+    stale = time.time() - 7200
+    os.utime(temp_dir / "assessments" / f"{old}.json", (stale, stale))
+
+    assert store.purge(3600) == 1
+    assert store.load(old) is None
+    assert store.load(new) == []
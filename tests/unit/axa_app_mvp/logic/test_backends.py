@@ -0,0 +1,52 @@
+from pathlib import Path
+
+import pytest
+from axa_app_mvp.logic import backends
+from axa_app_mvp.logic.backends import BACKENDS, artifact_path, export_model, get_backend, load_model
+
+
+def test_artifact_path():
+    """Test where each backend expects its model artifact."""
+    weights = Path("models/yolov8n.pt")
+
+    assert artifact_path(weights, BACKENDS["pytorch"]) == weights
+    assert artifact_path(weights, BACKENDS["onnx"]) == Path("models/yolov8n.onnx")
+    assert artifact_path(weights, BACKENDS["openvino"]) == Path("models/yolov8n_openvino_model")
+
+
+def test_get_backend_unknown():
+    """Test that unknown backend names are rejected."""
+    assert get_backend("onnx").export_format == "onnx"
+    with pytest.raises(ValueError):
+        get_backend("tensorrt")
+
+
+def test_load_model_requires_export(temp_dir, monkeypatch):
+    """Test that an exported backend is not loaded before it has been exported."""
+    monkeypatch.setattr(backends, "find_spec", lambda name: object())
+    with pytest.raises(FileNotFoundError, match="export_model.py --backend onnx"):
+        load_model(temp_dir / "yolov8n.pt", "onnx")
+
+
+def test_missing_engine_is_reported(temp_dir, monkeypatch):
+    """Test that a backend whose engine is not installed names the package to install."""
+    monkeypatch.setattr(backends, "find_spec", lambda name: None)
+    weights = temp_dir / "yolov8n.pt"
+
+    with pytest.raises(ImportError, match="pip install openvino"):
+        load_model(weights, "openvino")
+    with pytest.raises(ImportError, match="pip install onnxruntime"):
+        export_model(weights, "onnx")
+    # PyTorch runs on ultralytics itself
+    assert export_model(weights, "pytorch") == weights
+
+
+def test_int8_artifact_path():
+    """Test INT8 artifact naming and backend support."""
+    weights = Path("models/yolov8n.pt")
+
+    assert artifact_path(weights, BACKENDS["onnx"], "int8") == Path("models/yolov8n_int8.onnx")
+    with pytest.raises(ValueError):
+        artifact_path(weights, BACKENDS["openvino"], "int8")
+    with pytest.raises(ValueError):
+        artifact_path(weights, BACKENDS["onnx"], "fp16")
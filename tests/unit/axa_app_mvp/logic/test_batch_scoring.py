@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from axa_app_mvp.logic.batch_scoring import read_records, score_chunk, score_records, write_results
+from axa_app_mvp.logic.hazard_scoring import (
+    DEFAULT_CONFIG_PATH,
+    HazardConfig,
+    map_detected_objects_to_hazards,
+    score_hazards
+)
+
+
+@pytest.fixture
+def config():
+    return HazardConfig(DEFAULT_CONFIG_PATH)
+
+
+def test_score_chunk_matches_score_hazards(config):
+    """Test that batch totals and risk levels equal score_hazards for each record."""
+    objects = list(config.detection_mapping)
+    records = [
+        {"id": i, "profile": {"mobility": i / 7 % 1, "vision": i / 3 % 1, "cognition": i / 5 % 1},
+         "detected_objects": [{"object": objects[(i + j) % len(objects)]} for j in range(i % 6)]}
+        for i in range(50)
+    ]
+
+    results = score_chunk(records, config)
+
+    for record, result in zip(records, results):
+        hazards = map_detected_objects_to_hazards(record["detected_objects"], config)
+        expected = score_hazards(hazards, record["profile"], config, config.risk_thresholds)
+        assert result["id"] == record["id"]
+        assert result["total_score"] == expected["total_score"]
+        assert result["risk_level"] == expected["risk_level"]
+        assert result["color"] == expected["color"]
+        assert result["hazards"] == len(expected["hazard_details"])
+        assert result["config_version"] == config.version
+
+
+def test_bad_records_get_errors(config):
+    """Test that malformed records are reported individually without failing the chunk."""
+    hazard_id = next(iter(config.hazards))
+    records = ['{"hazards": [', {"mobility": "high", "hazards": [hazard_id]}, [1, 2],
+               {"id": "ok", "mobility": 1, "hazards": [hazard_id]},
+               {"id": "none", "profile": None, "hazards": [hazard_id]},
+               {"id": "list", "profile": [1, 0, 0], "hazards": [hazard_id]}]
+
+    results = score_chunk(records, config, start=10)
+
+    assert results[0]["id"] == 11 and "Invalid JSON" in results[0]["error"]
+    assert results[1]["id"] == 12 and "error" in results[1]
+    assert results[2]["id"] == 13 and "error" in results[2]
+    assert results[3]["id"] == "ok" and results[3]["hazards"] == 1
+    assert results[4] == {"id": "none", "error": "Profile is not a JSON object"}
+    assert results[5] == {"id": "list", "error": "Profile is not a JSON object"}
+
+
+def test_csv_round_trip(temp_dir, config):
+    """Test that CSV records are read, scored and written back as CSV."""
+    hazard_ids = list(config.hazards)[:2]
+    source = temp_dir / "assessments.csv"
+    source.write_text("id,mobility,vision,cognition,objects,hazard_ids\n"
+                      f"a,1,0,0.5,,{';'.join(hazard_ids)}\n"
+                      "b,0,0,0,,\n")
+
+    written = write_results(score_records(read_records(source), workers=0), temp_dir / "out.csv")
+
+    lines = (temp_dir / "out.csv").read_text().splitlines()
+    assert written == 2
+    assert lines[0] == "id,total_score,risk_level,color,hazards,config_version,error"
+    assert lines[1].startswith("a,") and f",2,{config.version}," in lines[1]
+    assert lines[2] == f"b,0,None,green,0,{config.version},"
+
+
+def test_process_pool_matches_inline(temp_dir, config):
+    """Test that scoring in worker processes gives the inline results, in input order."""
+    objects = list(config.detection_mapping)
+    source = temp_dir / "assessments.jsonl"
+    source.write_text("".join(
+        json.dumps({"mobility": i % 2, "vision": 0.5, "detected_objects": objects[:i % 4]}) + "\n"
+        for i in range(30)))
+
+    inline = list(score_records(read_records(source), workers=0, chunk_size=7))
+    pooled = list(score_records(read_records(source, parse=False), workers=1, chunk_size=7))
+
+    assert pooled == inline
+    assert [result["id"] for result in pooled] == list(range(1, 31))
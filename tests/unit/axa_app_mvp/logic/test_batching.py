@@ -0,0 +1,177 @@
+import asyncio
+
+import pytest
+from axa_app_mvp.logic.batching import BatchScheduler, QueueFullError
+from axa_app_mvp.logic.inference import InferenceExecutor
+
+
+class RecordingBatchFn:
+    """Batch function that records each batch it is called with."""
+
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        if self.fail:
+            raise RuntimeError("model exploded")
+        return [item * 10 for item in items]
+
+
+def run_concurrently(scheduler, items):
+    async def main():
+        return await asyncio.gather(*(scheduler.submit(item) for item in items))
+    return asyncio.run(main())
+
+
+def test_concurrent_submissions_share_a_batch():
+    """Test that concurrent callers are grouped into one batch."""
+    batch_fn = RecordingBatchFn()
+    scheduler = BatchScheduler(InferenceExecutor(kind="inline"), batch_fn,
+                               max_batch_size=8, max_wait_ms=50, name="test_share")
+
+    results = run_concurrently(scheduler, [1, 2, 3])
+
+    assert results == [10, 20, 30]
+    assert batch_fn.batches == [[1, 2, 3]]
+    assert scheduler.batch_size.count == 1
+    assert scheduler.queue_depth.value == 0
+
+
+def test_batches_flush_at_max_batch_size():
+    """Test that a full batch is dispatched and the rest wait for the next one."""
+    batch_fn = RecordingBatchFn()
+    scheduler = BatchScheduler(InferenceExecutor(kind="inline"), batch_fn,
+                               max_batch_size=2, max_wait_ms=50, name="test_flush")
+
+    results = run_concurrently(scheduler, [1, 2, 3, 4, 5])
+
+    assert results == [10, 20, 30, 40, 50]
+    assert [len(batch) for batch in batch_fn.batches] == [2, 2, 1]
+
+
+def test_batch_failure_propagates_to_every_caller():
+    """Test that an exception in the batch function reaches each waiting caller."""
+    scheduler = BatchScheduler(InferenceExecutor(kind="inline"), RecordingBatchFn(fail=True),
+                               max_batch_size=4, max_wait_ms=1, name="test_fail")
+
+    async def main():
+        return await asyncio.gather(*(scheduler.submit(i) for i in range(3)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert len(results) == 3
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_scheduler_survives_new_event_loop():
+    """Test that the scheduler restarts cleanly under a fresh event loop."""
+    scheduler = BatchScheduler(InferenceExecutor(kind="inline"), RecordingBatchFn(),
+                               max_batch_size=4, max_wait_ms=1, name="test_loops")
+
+    assert run_concurrently(scheduler, [1]) == [10]
+    assert run_concurrently(scheduler, [2]) == [20]
+
+
+def test_queue_full_rejects_fast():
+    """Test that submissions beyond the depth limit are rejected with a retry hint."""
+    batch_fn = RecordingBatchFn()
+    scheduler = BatchScheduler(InferenceExecutor(kind="inline"), batch_fn, max_batch_size=8,
+                               max_wait_ms=20, max_queue_depth=2, name="test_queue_full")
+
+    async def main():
+        return await asyncio.gather(*(scheduler.submit(i) for i in range(4)), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert results[:2] == [0, 10]
+    assert all(isinstance(r, QueueFullError) for r in results[2:])
+    assert results[2].retry_after >= 1
+    assert batch_fn.batches == [[0, 1]]
+    assert scheduler.rejected.value() == 2
+
+
+def test_check_capacity_admits_requests_whole():
+    """Test that a multi-item request is rejected before anything is queued."""
+    scheduler = BatchScheduler(InferenceExecutor(kind="inline"), RecordingBatchFn(),
+                               max_queue_depth=3, name="test_capacity")
+
+    scheduler.check_capacity(3)
+    with pytest.raises(QueueFullError):
+        scheduler.check_capacity(4)
+    assert scheduler.depth == 0
+
+
+def test_submit_timed_reports_queue_and_run_time():
+    """Test that queue wait and batch run time are reported per item."""
+    scheduler = BatchScheduler(InferenceExecutor(kind="inline"), RecordingBatchFn(),
+                               max_batch_size=8, max_wait_ms=20, name="test_timed")
+
+    result, queue_ms, run_ms = asyncio.run(scheduler.submit_timed(3))
+
+    assert result == 30
+    # A lone item waits for the batching window before it is dispatched
+    assert queue_ms >= 15
+    assert run_ms >= 0
+    assert scheduler.batch_run.count == 1
+
+
+def test_max_concurrency_limits_batches_in_flight():
+    """Test that no more than max_concurrency batches run at once."""
+    running, peak = 0, 0
+
+    class SlowExecutor:
+        workers = 4
+
+        async def run(self, fn, items):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return fn(items)
+
+    scheduler = BatchScheduler(SlowExecutor(), RecordingBatchFn(), max_batch_size=1,
+                               max_wait_ms=0, max_concurrency=2, name="test_concurrency")
+
+    assert run_concurrently(scheduler, list(range(6))) == [0, 10, 20, 30, 40, 50]
+    assert peak == 2
+
+
+def test_exclusive_jobs_share_slots_and_admission():
+    """Test that a one-off job holds a batch slot and counts against the queue depth."""
+    order = []
+
+    class SlowExecutor:
+        workers = 1
+
+        async def run(self, fn, *args):
+            order.append(getattr(fn, "__name__", "batch"))
+            await asyncio.sleep(0.05 if fn is scan else 0)
+            return fn(*args)
+
+    def scan(path):
+        return f"scanned {path}"
+
+    scheduler = BatchScheduler(SlowExecutor(), RecordingBatchFn(), max_batch_size=8, max_wait_ms=0,
+                               max_queue_depth=2, name="test_exclusive")
+
+    async def main():
+        video = asyncio.ensure_future(scheduler.run_exclusive(scan, "a.mp4"))
+        await asyncio.sleep(0.01)  # the scan now holds the only slot
+        waiting = asyncio.ensure_future(scheduler.run_exclusive(scan, "b.mp4"))
+        photo = asyncio.ensure_future(scheduler.submit(1))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError) as rejected:
+            await scheduler.run_exclusive(scan, "c.mp4")
+        return await asyncio.gather(video, waiting, photo), rejected.value
+
+    results, rejected = asyncio.run(main())
+
+    assert results == ["scanned a.mp4", "scanned b.mp4", 10]
+    # Photos wait behind the running scan, and the retry hint covers both scans
+    assert order == ["scan", "scan", "batch"]
+    assert rejected.retry_after >= 1
+    assert scheduler.depth == 0
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+from axa_app_mvp.logic.detection import detect_image_views, nms
+from axa_app_mvp.logic.preprocessing import Letterbox
+
+NAMES = {0: "person", 1: "rug", 2: "box"}
+
+
+def detect_result(fake_model_class, result, room_name, **kwargs):
+    """Detections for one full-resolution view whose model output is ``result``."""
+    model = fake_model_class({0: result}, key=lambda img: 0)
+    view = (np.zeros((4, 4, 3), np.uint8), Letterbox(1.0, 1.0, 0, 0, 5000, 5000))
+    return detect_image_views(model, [[view]], [room_name], **kwargs)[0]
+
+
+def test_result_to_detections(fake_model_class, fake_result):
+    """Test converting a result into detection records."""
+    result = fake_result([1], [0.5], [[1.7, 2.2, 3.0, 4.9]])
+
+    detections = detect_result(fake_model_class, result, "sitting_room")
+
+    assert len(detections) == 1
+    assert detections[0]["object"] == "rug"
+    assert detections[0]["location"] == "sitting room"
+    assert detections[0]["confidence"] == pytest.approx(0.5)
+    assert detections[0]["bbox"] == {"x1": 1, "y1": 2, "x2": 3, "y2": 4}
+
+
+def test_detect_image_views_single_batch(fake_model):
+    """Test that all rooms go through one model call and are split back out."""
+    images = [np.zeros((size, size, 3), np.uint8) for size in (10, 20, 30)]
+    views = [[(image, Letterbox(1.0, 1.0, 0, 0, image.shape[1], image.shape[0]))] for image in images]
+
+    detections = detect_image_views(fake_model, views, ["bathroom", "hallway", "bedroom"])
+
+    assert len(fake_model.calls) == 1
+    assert len(fake_model.calls[0][0]) == 3
+    assert len(detections) == 3
+    assert [d["object"] for d in detections[0]] == ["rug", "person"]
+    assert detections[1][0]["location"] == "hallway"
+    assert detections[1][0]["bbox"] == {"x1": 10, "y1": 11, "x2": 12, "y2": 13}
+    assert detections[2] == []
+
+
+def test_detect_image_views_no_images(fake_model):
+    """Test that no model call is made without images."""
+    assert detect_image_views(fake_model, [], []) == []
+    assert fake_model.calls == []
+
+
+def test_result_filters(fake_model_class, fake_result):
+    """Test class and confidence filtering on the result arrays."""
+    result = fake_result([0, 1, 2, 1], [0.9, 0.2, 0.8, 0.6],
+                         [[0, 0, 1, 1], [1, 1, 2, 2], [2, 2, 3, 3], [3, 3, 4, 4]])
+
+    detections = detect_result(fake_model_class, result, "bathroom", classes=[1, 2], conf=0.5)
+
+    assert [(d["object"], d["bbox"]["x1"]) for d in detections] == [("box", 2), ("rug", 3)]
+
+
+def test_vectorized_conversion_matches_per_box_conversion(fake_model_class, fake_result):
+    """Test that vectorized conversion gives the same records as per-box conversion."""
+    rng = np.random.RandomState(0)
+    xyxy = rng.uniform(0, 4000, size=(50, 4))
+    result = fake_result(rng.randint(0, 3, 50), rng.uniform(0, 1, 50), xyxy)
+
+    detections = detect_result(fake_model_class, result, "bedroom")
+
+    expected = []
+    for box in result.boxes:
+        x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
+        expected.append({
+            "object": NAMES[int(box.cls[0])],
+            "location": "bedroom",
+            "confidence": float(box.conf[0]),
+            "bbox": {"x1": x1, "y1": y1, "x2": x2, "y2": y2}
+        })
+    assert detections == expected
+
+
+def test_result_without_boxes(fake_model_class, fake_result):
+    """Test a result without boxes."""
+    assert detect_result(fake_model_class, fake_result([], [], []), "hallway") == []
+
+
+def test_nms():
+    """Test greedy suppression, optionally per class."""
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [20, 20, 30, 30], [0, 0, 10, 9]])
+    scores = np.array([0.5, 0.9, 0.7, 0.6])
+
+    assert nms(boxes, scores, 0.5).tolist() == [1, 2]
+    assert nms(boxes, scores, 0.5, cls_ids=np.array([0, 0, 0, 1])).tolist() == [1, 2, 3]
+    assert nms(np.empty((0, 4)), np.empty(0), 0.5).tolist() == []
+
+
+def test_detect_image_views_merges_tiles(fake_model_class, fake_result):
+    """Test that tile boxes map to image coordinates and duplicates across views merge."""
+    model = fake_model_class({
+        0: fake_result([1], [0.6], [[0, 0, 20, 20]]),    # global view, half scale
+        1: fake_result([1, 2], [0.9, 0.8], [[0, 0, 40, 40], [30, 30, 35, 35]]),  # tile at (0, 0)
+        2: fake_result([1], [0.7], [[0, 0, 10, 10]]),    # tile at (50, 0)
+    }, key=lambda img: int(img[0, 0, 0]))
+    views = [[
+        (np.full((4, 4, 3), 0, np.uint8), Letterbox(0.5, 0.5, 0, 0, 100, 100)),
+        (np.full((4, 4, 3), 1, np.uint8), Letterbox(1.0, 1.0, 0, 0, 100, 100)),
+        (np.full((4, 4, 3), 2, np.uint8), Letterbox(1.0, 1.0, -50, 0, 100, 100)),
+    ]]
+
+    detections = detect_image_views(model, views, ["hallway"], conf=0.25, iou=0.5)
+
+    assert len(model.calls) == 1
+    assert len(model.calls[0][0]) == 3
+    assert [(d["object"], d["bbox"]["x1"], d["bbox"]["x2"]) for d in detections[0]] == [
+        ("rug", 0, 40),    # suppresses the global view's rug at (0, 0, 40, 40)
+        ("box", 30, 35),
+        ("rug", 50, 60),
+    ]
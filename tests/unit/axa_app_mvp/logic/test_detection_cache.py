@@ -0,0 +1,48 @@
+from axa_app_mvp.logic.detection import Detection
+from axa_app_mvp.logic.detection_cache import DetectionCache, content_key
+
+RUG = Detection("rug", "sitting room", 0.9, 1, 2, 3, 4)
+
+
+def test_content_key():
+    """Test that keys depend on both the image bytes and the detector version."""
+    assert content_key(b"image", "v1") == content_key(b"image", "v1")
+    assert content_key(b"image", "v1") != content_key(b"other", "v1")
+    assert content_key(b"image", "v1") != content_key(b"image", "v2")
+
+
+def test_cache_hit_relabels_room():
+    """Test that cached detections are returned for the room asking for them."""
+    cache = DetectionCache(4, name="test_cache_relabel")
+    cache.put("a", [RUG])
+
+    hit = cache.get("a", "steps")
+
+    assert hit == [{"object": "rug", "location": "steps", "confidence": 0.9,
+                    "bbox": {"x1": 1, "y1": 2, "x2": 3, "y2": 4}}]
+    assert cache.get("b", "steps") is None
+    assert cache.requests.value("hit") == 1
+    assert cache.requests.value("miss") == 1
+
+
+def test_cache_lru_eviction():
+    """Test that the least recently used entry is evicted when full."""
+    cache = DetectionCache(2, name="test_cache_lru")
+    cache.put("a", [RUG])
+    cache.put("b", [])
+    cache.get("a", "hallway")  # a is now the most recently used
+    cache.put("c", [])
+
+    assert len(cache) == 2
+    assert cache.get("b", "hallway") is None
+    assert cache.get("a", "hallway") is not None
+    assert cache.get("c", "hallway") == []
+
+
+def test_cache_disabled():
+    """Test that a zero-sized cache stores nothing."""
+    cache = DetectionCache(0, name="test_cache_disabled")
+    cache.put("a", [RUG])
+
+    assert not cache.enabled
+    assert cache.get("a", "hallway") is None
@@ -200,3 +200,43 @@ def test_score_hazards_no_hazards(hazard_config):
     assert result['risk_level'] == 'None'
     assert result['hazard_details'] == []
     assert 'recommendation' in result
+
+def _scalar_score(hazard, profile):
+    """Reference per-hazard formula the vectorized scorer must reproduce exactly."""
+    weights = hazard.get('weights', {})
+    impact = (profile.get('mobility', 0) * weights.get('mobility', 1)
+              + profile.get('vision', 0) * weights.get('vision', 1)
+              + profile.get('cognition', 0) * weights.get('cognition', 1))
+    return min(max(0, hazard.get('base_score', 0) * (1 + impact / 3)), 100)
+
+@pytest.mark.parametrize('profile', [
+    {'mobility': 0.8, 'vision': 0.0, 'cognition': 0.5},
+    {'mobility': 1, 'vision': 1, 'cognition': 1},
+    {'vision': 0.3},
+    {'mobility': 40, 'vision': 0, 'cognition': 0},  # clamped to 100
+])
+def test_score_hazards_matches_scalar_formula(hazard_config, profile):
+    """Test the vectorized scores, clamping and average match the per-hazard formula exactly."""
+    hazards = map_detected_objects_to_hazards(
+        [{'object': name, 'location': 'hallway'}
+         for name in ['rug', 'light_bulb_out', 'threshold', 'rug', 'unknown']],
+        hazard_config)
+    hazards.append({'hazard_id': 'not_in_config', 'hazard_name': 'Unknown'})
+    
+    result = score_hazards(hazards, profile, hazard_config, hazard_config.risk_thresholds)
+    
+    expected = [_scalar_score(hazard_config.get_hazard(h['hazard_id']), profile)
+                for h in hazards if hazard_config.get_hazard(h['hazard_id'])]
+    total = 0
+    for score in expected:
+        total += score
+    assert [d['score'] for d in result['hazard_details']] == [round(s, 1) for s in expected]
+    assert result['total_score'] == round(total / len(expected), 1)
+    assert result['risk_level'] == hazard_config.get_risk_level(total / len(expected))['label']
+
+def test_compiled_weights(hazard_config):
+    """Test the config is compiled into a weight matrix and base-score vector by hazard id."""
+    row = hazard_config.hazard_index['loose_rugs']
+    assert hazard_config.weight_matrix[row].tolist() == [2, 1, 1]
+    assert hazard_config.base_scores[row] == 10
+    assert hazard_config.weight_matrix.shape == (len(hazard_config.hazards), 3)
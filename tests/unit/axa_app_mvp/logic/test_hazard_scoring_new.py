@@ -3,7 +3,10 @@ import os
 import json
 import tempfile
 from pathlib import Path
-from axa_app_mvp.logic.hazard_scoring import HazardConfig, map_detected_objects_to_hazards, score_hazards
+from axa_app_mvp.logic.hazard_scoring import (
+    HazardConfig, get_hazard_config, map_detected_objects_to_hazards, normalize_label, score_hazards,
+    unmapped_labels
+)
 
 # Sample test data
 SAMPLE_CONFIG = {
@@ -141,6 +144,56 @@ def test_get_hazard_for_object(temp_config_file):
     # Test non-existent object
     assert config.get_hazard_for_object("nonexistent") is None
 
+def test_normalize_label():
+    """Test that labels are lower-cased, split into words and made singular."""
+    assert normalize_label("Extension_Cords") == "extension cord"
+    assert normalize_label("boxes") == "box"
+    assert normalize_label("light-bulbs out") == "light bulb out"
+    assert normalize_label("glasses") == "glass"
+    assert normalize_label("bus") == "bus"
+
+def test_alias_lookup(temp_dir):
+    """Test that plurals, spellings and declared aliases map like the object itself."""
+    mappings = [dict(m) for m in SAMPLE_CONFIG["detection_mappings"]]
+    mappings[0]["aliases"] = ["throw rug", "bath mat"]
+    path = temp_dir / "config.json"
+    path.write_text(json.dumps(dict(SAMPLE_CONFIG, detection_mappings=mappings)))
+    config = HazardConfig(path)
+    
+    for label in ["rugs", "Rug", "bath_mats", "Throw Rug", "light bulb out", "Thresholds"]:
+        assert config.get_hazard_for_object(label) is not None, label
+    assert config.get_hazard_for_object("rug")["id"] == "loose_rugs"
+    assert config.get_hazard_for_object("bath_mats")["id"] == "loose_rugs"
+    assert config.get_hazard_for_object("person") is None
+
+def test_conflicting_aliases_are_rejected(temp_dir):
+    """Test that a label mapping to two hazards is a config error."""
+    mappings = [dict(m) for m in SAMPLE_CONFIG["detection_mappings"]]
+    mappings[1]["aliases"] = ["rugs"]
+    path = temp_dir / "config.json"
+    path.write_text(json.dumps(dict(SAMPLE_CONFIG, detection_mappings=mappings)))
+    
+    with pytest.raises(ValueError, match="maps to both"):
+        HazardConfig(path)
+
+def test_unmapped_labels_are_counted(temp_config_file):
+    """Test that labels without a hazard are counted per label."""
+    config = HazardConfig(temp_config_file)
+    before = unmapped_labels.value("sofa")
+    
+    hazards = map_detected_objects_to_hazards([{"object": "sofa"}, {"object": "rugs"}, {"object": "sofa"}], config)
+    
+    assert [h["hazard_id"] for h in hazards] == ["loose_rugs"]
+    assert unmapped_labels.value("sofa") == before + 2
+
+def test_get_detection_class_ids(temp_config_file):
+    """Test compiling the detection class allow-list from the mappings."""
+    config = HazardConfig(temp_config_file)
+    
+    names = {0: "person", 1: "rug", 2: "chair", 3: "threshold", 4: "light_bulb_out"}
+    assert config.get_detection_class_ids(names) == [1, 3, 4]
+    assert config.get_detection_class_ids({0: "person"}) == []
+
 def test_get_risk_level(temp_config_file):
     """Test determining risk level based on score."""
     config = HazardConfig(temp_config_file)
@@ -159,6 +212,34 @@ def test_get_risk_level(temp_config_file):
     
     # Test out of bounds (should return highest risk)
     assert config.get_risk_level(150)["label"] == "High"
+    
+    # Test fractional scores between integer bands
+    assert config.get_risk_level(33.5)["label"] == "Low"
+    assert config.get_risk_level(66.99)["label"] == "Medium"
+
+def test_classify_scores_matches_get_risk_level(temp_config_file):
+    """Test that the vectorized lookup agrees with get_risk_level."""
+    config = HazardConfig(temp_config_file)
+    scores = [-1, 0, 15, 33, 33.5, 34, 66, 66.5, 67, 100, 100.5, 150, float("nan")]
+    
+    levels = config.classify_scores(scores)
+    
+    assert [config.risk_bands[level] for level in levels] == [config.get_risk_level(s) for s in scores]
+
+@pytest.mark.parametrize("bands, message", [
+    ([(0, 33), (30, 66), (67, 100)], "overlap"),
+    ([(0, 33), (40, 66), (67, 100)], "gap"),
+])
+def test_invalid_risk_thresholds(temp_dir, bands, message):
+    """Test that overlapping or non-adjacent risk thresholds are rejected."""
+    config = dict(SAMPLE_CONFIG, risk_thresholds=[
+        {"label": f"Band {i}", "min_score": low, "max_score": high, "color": "red"}
+        for i, (low, high) in enumerate(bands)])
+    path = temp_dir / "config.json"
+    path.write_text(json.dumps(config))
+    
+    with pytest.raises(ValueError, match=message):
+        HazardConfig(path)
 
 def test_map_detected_objects_to_hazards(temp_config_file):
     """Test mapping detected objects to hazard configurations."""
@@ -236,3 +317,49 @@ def test_score_hazards_no_hazards(temp_config_file):
     assert result["risk_level"] == "None"
     assert result["color"] == "green"
     assert len(result["hazard_details"]) == 0
+
+
+def _rewrite(path, content, bump_ns):
+    """Write new content and move the mtime forward so the change is visible."""
+    with open(path, "w") as f:
+        f.write(content)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump_ns))
+
+def test_get_hazard_config_is_shared_and_hot_reloaded(temp_config_file):
+    """Test that the config is parsed once and reloaded only when its content changes."""
+    config = get_hazard_config(temp_config_file)
+    assert get_hazard_config(temp_config_file) is config
+    assert config.version.startswith("1.0.0+")
+    
+    # Touched without changes: same config
+    _rewrite(temp_config_file, json.dumps(SAMPLE_CONFIG), 1_000_000)
+    assert get_hazard_config(temp_config_file) is config
+    
+    edited = json.loads(json.dumps(SAMPLE_CONFIG))
+    edited["hazards"][0]["base_score"] = 20
+    _rewrite(temp_config_file, json.dumps(edited), 2_000_000)
+    reloaded = get_hazard_config(temp_config_file)
+    assert reloaded is not config
+    assert reloaded.version != config.version
+    assert reloaded.get_hazard("loose_rugs")["base_score"] == 20
+    # Requests holding the old config are unaffected
+    assert config.get_hazard("loose_rugs")["base_score"] == 10
+
+def test_get_hazard_config_keeps_last_good_config(temp_config_file):
+    """Test that an invalid edit does not replace the loaded config."""
+    config = get_hazard_config(temp_config_file)
+    
+    _rewrite(temp_config_file, '{"hazards": [', 1_000_000)
+    
+    assert get_hazard_config(temp_config_file) is config
+
+def test_get_hazard_config_survives_missing_file(temp_config_file):
+    """Test that a config file removed after loading keeps the loaded config in use."""
+    config = get_hazard_config(temp_config_file)
+    
+    os.rename(temp_config_file, temp_config_file + ".bak")
+    try:
+        assert get_hazard_config(temp_config_file) is config
+    finally:
+        os.rename(temp_config_file + ".bak", temp_config_file)
@@ -0,0 +1,237 @@
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+from axa_app_mvp.logic import inference
+from axa_app_mvp.logic.detection_cache import DetectionCache
+from axa_app_mvp.logic.hazard_scoring import DEFAULT_CONFIG_PATH, HazardConfig, unmapped_labels
+from axa_app_mvp.logic.inference import (
+    InferenceExecutor,
+    detect_encoded_images,
+    detect_encoded_images_timed,
+    detect_room_images,
+    parse_warmup_sizes,
+    submit_room_images,
+    unmapped_model_classes,
+    warm_up_model
+)
+
+
+def encode(shape, value=0):
+    ok, buf = cv2.imencode(".png", np.full(shape, value, np.uint8))
+    assert ok
+    return buf.tobytes()
+
+
+@pytest.fixture
+def fake_model(fake_model_class, fake_result):
+    """Fake detector keyed on the centre pixel, as every input is letterboxed to one size."""
+    return fake_model_class({
+        10: fake_result([1, 0], [0.9, 0.4], [[8, 24, 40, 40], [5, 6, 7, 8]]),
+        30: fake_result([], [], []),
+        114: fake_result([], [], []),  # warm-up frames
+    }, key=lambda img: int(img[img.shape[0] // 2, img.shape[1] // 2, 0]))
+
+
+@pytest.fixture(autouse=True)
+def loaded_model(monkeypatch, fake_model):
+    monkeypatch.setattr(inference, "INFERENCE_IMGSZ", 64)
+    monkeypatch.setattr(inference, "_model", fake_model)
+    monkeypatch.setattr(inference, "_warmed_up", False)
+    monkeypatch.setattr(inference, "_detection_classes", None)
+
+
+def test_detect_encoded_images(fake_model):
+    """Test decoding a batch of images and detecting them in one pass."""
+    items = [
+        ("bathroom", encode((32, 128, 3), 10)),
+        ("bedroom", b"not an image"),
+        ("hallway", encode((30, 30, 3), 30)),
+        ("bathroom", encode((10, 10, 3), 10)),
+    ]
+
+    detections = detect_encoded_images(items)
+
+    assert len(fake_model.calls) == 1
+    images, kwargs = fake_model.calls[0]
+    assert [img.shape for img in images] == [(64, 64, 3)] * 3
+    # Only rug and box map to hazards in config.json
+    assert kwargs["classes"] == [1, 2]
+    assert kwargs["conf"] == inference.DETECTION_MIN_CONFIDENCE
+    assert len(detections) == 4
+    assert detections[0][0]["object"] == "rug"
+    # Letterboxed at half scale with 24px top padding, mapped back to the 128x32 upload
+    assert detections[0][0]["bbox"] == {"x1": 16, "y1": 0, "x2": 80, "y2": 32}
+    assert detections[1] is None
+    assert detections[2] == []
+    assert detections[3][0]["location"] == "bathroom"
+
+
+def test_detect_encoded_images_timed(fake_model):
+    """Test that each item reports its decode, model and post-processing time."""
+    results = detect_encoded_images_timed([("bathroom", encode((32, 32, 3), 10)), ("bedroom", b"")])
+
+    (detections, stages), (missing, missing_stages) = results
+    assert detections[0]["object"] == "rug"
+    assert set(stages) == {"decode_ms", "model_ms", "postprocess_ms"}
+    assert all(ms >= 0 for ms in stages.values())
+    assert missing is None
+    assert missing_stages["model_ms"] == 0.0
+
+
+def test_detect_encoded_images_no_mapped_classes(fake_model, monkeypatch):
+    """Test that the model is skipped when none of its classes map to a hazard."""
+    monkeypatch.setattr(fake_model, "names", {0: "person", 1: "tv"})
+
+    assert detect_encoded_images([("bathroom", encode((10, 10, 3), 10))]) == [[]]
+    assert fake_model.calls == []
+
+
+def test_unmapped_model_classes(fake_model, monkeypatch):
+    """Test that model classes left out of the allow-list are reported per config, not counted as detections."""
+    monkeypatch.setattr(inference, "_unmapped_classes", (None, {}, []))
+    before = unmapped_labels.value("person")
+
+    detect_encoded_images([("bathroom", encode((10, 10, 3), 10))])
+
+    assert unmapped_model_classes() == ["person"]
+    assert inference.unmapped_classes_gauge.value == 1
+    assert unmapped_labels.value("person") == before
+
+    # A config reload that maps every class clears them
+    config = inference.get_hazard_config(inference.HAZARD_CONFIG_PATH)
+    reloaded = HazardConfig(DEFAULT_CONFIG_PATH)
+    reloaded.version = config.version + "-reloaded"
+    monkeypatch.setattr(reloaded, "get_detection_class_ids", lambda names: sorted(names))
+    monkeypatch.setattr(inference, "get_hazard_config", lambda path: reloaded)
+
+    assert unmapped_model_classes() == []
+    assert inference.unmapped_classes_gauge.value == 0
+
+
+def test_unmapped_model_classes_from_workers(monkeypatch):
+    """Test that a web process not holding the model uses the class names fetched at warm-up."""
+    monkeypatch.setattr(inference, "_model", None)
+    monkeypatch.setattr(inference, "_unmapped_classes", (None, {}, []))
+    monkeypatch.setattr(inference, "_worker_class_names", None)
+    assert unmapped_model_classes() is None
+
+    monkeypatch.setattr(inference, "_worker_class_names", {0: "person", 1: "rug", 5: "tv"})
+
+    assert unmapped_model_classes() == ["person", "tv"]
+
+
+def test_detect_encoded_images_nothing_decodable(fake_model):
+    """Test that the model is not called when no image decodes."""
+    assert detect_encoded_images([("bathroom", b"")]) == [None]
+    assert fake_model.calls == []
+
+
+class InlineScheduler:
+    """Batch scheduler stand-in that detects each submitted image on the spot."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def check_capacity(self, count=1):
+        pass
+
+    async def submit_timed(self, item, check_capacity=True):
+        self.submitted.append(item[0])
+        return detect_encoded_images_timed([item])[0], 1.0, 2.0
+
+
+def test_detect_room_images_uses_cache(monkeypatch):
+    """Test that resubmitted images skip detection and keep their room label."""
+    scheduler = InlineScheduler()
+    monkeypatch.setattr(inference, "batch_scheduler", scheduler)
+    monkeypatch.setattr(inference, "detection_cache", DetectionCache(8, name="test_room_cache"))
+    photo = encode((10, 10, 3), 10)
+    timings = {}
+
+    first = asyncio.run(detect_room_images({"bathroom": photo, "bedroom": b"not an image"}))
+    second = asyncio.run(detect_room_images({"hallway": photo, "bedroom": b"not an image"}, timings=timings))
+
+    assert first["bathroom"][0]["location"] == "bathroom"
+    assert first["bedroom"] is None
+    assert list(second) == ["hallway", "bedroom"]
+    assert second["hallway"] == [dict(d, location="hallway") for d in first["bathroom"]]
+    # Undecodable images are not cached
+    assert scheduler.submitted == ["bathroom", "bedroom", "bedroom"]
+    assert timings["hallway"] == {"queue_ms": 0.0, "inference_ms": 0.0}
+    assert timings["bedroom"]["queue_ms"] == 1.0
+    assert timings["bedroom"]["inference_ms"] == 2.0
+    assert timings["bedroom"]["model_ms"] == 0.0  # never reached the model
+
+
+class DelayedScheduler(InlineScheduler):
+    """InlineScheduler whose results take longer the earlier a room was submitted."""
+
+    async def submit_timed(self, item, check_capacity=True):
+        self.submitted.append(item[0])
+        await asyncio.sleep(0.05 * (3 - len(self.submitted)))
+        return ([], {}), 1.0, 2.0
+
+
+def test_submit_room_images_yields_as_rooms_finish(monkeypatch):
+    """Test that rooms are returned in completion order, cache hits first."""
+    monkeypatch.setattr(inference, "batch_scheduler", DelayedScheduler())
+    monkeypatch.setattr(inference, "detection_cache", DetectionCache(8, name="test_stream_cache"))
+    inference.detection_cache.put(inference.content_key(b"seen", inference.detector_version()), [])
+
+    async def main():
+        rooms = submit_room_images({"bathroom": encode((10, 10, 3), 10), "hallway": b"seen",
+                                    "bedroom": encode((10, 10, 3), 30)})
+        return [room_name async for room_name, _ in rooms]
+
+    assert asyncio.run(main()) == ["hallway", "bedroom", "bathroom"]
+
+
+@pytest.mark.parametrize("kind", ["inline", "thread"])
+def test_inference_executor_run(kind):
+    """Test running work on the executor and awaiting the result."""
+    executor = InferenceExecutor(kind=kind, workers=2)
+    try:
+        assert asyncio.run(executor.run(pow, 2, 10)) == 1024
+    finally:
+        executor.shutdown()
+
+
+def test_inference_executor_unknown_kind():
+    """Test that an unknown executor kind is rejected."""
+    with pytest.raises(ValueError):
+        InferenceExecutor(kind="gpu")
+
+
+def test_parse_warmup_sizes():
+    """Test parsing the warm-up size setting."""
+    assert parse_warmup_sizes("640") == [(640, 640)]
+    assert parse_warmup_sizes("480x640, 1280,") == [(480, 640), (1280, 1280)]
+
+
+def test_warm_up_model(monkeypatch, fake_result):
+    """Test warm-up runs one synthetic frame per size, once per process."""
+    calls = []
+
+    def model(images, **kwargs):
+        calls.append(([img.shape for img in images], kwargs))
+        return [fake_result([], [], []) for _ in images]
+
+    monkeypatch.setattr(inference, "_model", model)
+
+    warm_up_model([(32, 32), (24, 48)])
+    warm_up_model([(32, 32)])
+
+    assert calls == [([(32, 32, 3)], {"verbose": False}), ([(24, 48, 3)], {"verbose": False})]
+
+
+def test_inference_executor_warm_up(monkeypatch):
+    """Test warming up through the executor."""
+    monkeypatch.setattr(inference, "INFERENCE_WARMUP_SIZES", "10")
+    executor = InferenceExecutor(kind="thread")
+    try:
+        asyncio.run(executor.warm_up())
+    finally:
+        executor.shutdown()
+    assert inference._warmed_up
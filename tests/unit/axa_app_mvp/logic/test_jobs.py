@@ -0,0 +1,147 @@
+import asyncio
+import fcntl
+import subprocess
+import sys
+
+from axa_app_mvp.logic.batching import QueueFullError
+from axa_app_mvp.logic.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobError, JobRunner, JobStore
+
+
+def run_jobs(runner, job_ids=(), until=lambda: True, timeout=5.0):
+    """Run a JobRunner until ``until()`` holds, then stop it."""
+    async def main():
+        runner.start()
+        for job_id in job_ids:
+            runner.enqueue(job_id)
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not until() and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.01)
+        await runner.stop()
+    asyncio.run(main())
+
+
+def finished(store, job_id):
+    return lambda: store.get(job_id)["status"] in (SUCCEEDED, FAILED)
+
+
+def test_job_round_trip(temp_dir):
+    """Test that a job's images and profile reach the processor and its result is stored."""
+    store = JobStore(temp_dir / "jobs")
+    seen = []
+
+    async def process(room_bytes, profile):
+        seen.append((room_bytes, profile))
+        return {"score": 42}
+
+    job = store.create({"bathroom": b"img1", "hallway": b"img2"}, {"age": 80})
+    assert job["status"] == QUEUED
+
+    run_jobs(JobRunner(store, process, poll_interval=60), [job["job_id"]], finished(store, job["job_id"]))
+
+    assert seen == [({"bathroom": b"img1", "hallway": b"img2"}, {"age": 80})]
+    done = store.get(job["job_id"])
+    assert done["status"] == SUCCEEDED
+    assert done["result"] == {"score": 42}
+    # Uploaded images are dropped once the job has finished
+    assert not (temp_dir / "jobs" / job["job_id"] / "images").exists()
+
+
+def test_failed_job_records_error(temp_dir):
+    """Test that a JobError fails the job with its message."""
+    store = JobStore(temp_dir / "jobs")
+
+    async def process(room_bytes, profile):
+        raise JobError("Failed to load object detection model")
+
+    job = store.create({"bathroom": b"img"}, {})
+    run_jobs(JobRunner(store, process, poll_interval=60), [job["job_id"]], finished(store, job["job_id"]))
+
+    done = store.get(job["job_id"])
+    assert done["status"] == FAILED
+    assert done["error"] == "Failed to load object detection model"
+
+
+def test_full_queue_is_retried(temp_dir):
+    """Test that a job waits for inference capacity instead of failing."""
+    store = JobStore(temp_dir / "jobs")
+    calls = []
+
+    async def process(room_bytes, profile):
+        calls.append(1)
+        if len(calls) == 1:
+            raise QueueFullError(0)
+        return {"score": 1}
+
+    job = store.create({"bathroom": b"img"}, {})
+    run_jobs(JobRunner(store, process, poll_interval=60), [job["job_id"]], finished(store, job["job_id"]))
+
+    assert len(calls) == 2
+    assert store.get(job["job_id"])["status"] == SUCCEEDED
+
+
+def test_unfinished_jobs_resume_after_restart(temp_dir):
+    """Test that queued and interrupted jobs on disk are picked up by a new runner."""
+    store = JobStore(temp_dir / "jobs")
+    queued = store.create({"bathroom": b"a"}, {})
+    interrupted = store.create({"hallway": b"b"}, {})
+    store.update(interrupted["job_id"], status=RUNNING)
+    # Claimed by a process that has since exited
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"],
+                          capture_output=True, text=True)
+    (temp_dir / "jobs" / interrupted["job_id"] / "claim").write_text(f"{dead.stdout.strip()}:old")
+
+    async def process(room_bytes, profile):
+        return {"rooms": list(room_bytes)}
+
+    assert store.unfinished() == [queued["job_id"], interrupted["job_id"]]
+    run_jobs(JobRunner(store, process, poll_interval=0.01),
+             until=lambda: not store.unfinished())
+
+    assert store.get(queued["job_id"])["result"] == {"rooms": ["bathroom"]}
+    assert store.get(interrupted["job_id"])["result"] == {"rooms": ["hallway"]}
+
+
+def test_claim_is_exclusive(temp_dir):
+    """Test that a job claimed by a live process is not claimed again."""
+    store = JobStore(temp_dir / "jobs")
+    job = store.create({"bathroom": b"img"}, {})
+    with open(temp_dir / "jobs" / job["job_id"] / "claim", "w") as other:
+        fcntl.flock(other, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        assert not store.claim(job["job_id"])
+
+    # Released when its owner goes away
+    assert store.claim(job["job_id"])
+
+
+def test_takeover_is_exclusive(temp_dir):
+    """Test that only one of several workers takes over a dead owner's claim."""
+    stores = [JobStore(temp_dir / "jobs") for _ in range(3)]
+    job = stores[0].create({"bathroom": b"img"}, {})
+    (temp_dir / "jobs" / job["job_id"] / "claim").write_text("999999:dead")
+
+    assert [store.claim(job["job_id"]) for store in stores] == [True, False, False]
+    stores[0].release(job["job_id"])
+    assert stores[1].claim(job["job_id"])
+
+
+def test_finished_jobs_are_not_scanned(temp_dir):
+    """Test that finished jobs drop out of unfinished() and only expired ones are purged."""
+    store = JobStore(temp_dir / "jobs")
+    done = store.create({"bathroom": b"a"}, {})
+    queued = store.create({"hallway": b"b"}, {})
+    store.update(done["job_id"], status=SUCCEEDED, result={"score": 1})
+
+    assert store.unfinished() == [queued["job_id"]]
+    assert store.purge(3600) == 0
+    assert store.purge(-1) == 1
+    assert store.get(done["job_id"]) is None
+    assert store.get(queued["job_id"]) is not None
+
+
+def test_unknown_job_ids(temp_dir):
+    """Test that unknown or malformed job ids are not found."""
+    store = JobStore(temp_dir / "jobs")
+
+    assert store.get("0" * 32) is None
+    assert store.get("../../etc/passwd") is None
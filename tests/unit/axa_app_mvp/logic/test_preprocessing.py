@@ -0,0 +1,146 @@
+import io
+
+import numpy as np
+import pytest
+from axa_app_mvp.logic.preprocessing import (
+    EXIF_ORIENTATION,
+    LETTERBOX_COLOR,
+    choose_reduce_factor,
+    decode_image,
+    letterbox,
+    letterbox_buffer,
+    plan_tiles,
+    prepare_image,
+    prepare_views,
+    to_model_input
+)
+from PIL import Image
+
+
+def test_letterbox_landscape():
+    """Test that a landscape image is scaled to fit and padded top and bottom."""
+    image = np.full((300, 600, 3), 255, dtype=np.uint8)
+
+    boxed, scale, (pad_x, pad_y) = letterbox(image, 64)
+
+    assert boxed.shape == (64, 64, 3)
+    assert scale == pytest.approx(64 / 600)
+    assert (pad_x, pad_y) == (0, 16)
+    assert (boxed[:16] == LETTERBOX_COLOR).all()
+    assert (boxed[16:48] == 255).all()
+
+
+def test_to_model_input():
+    """Test conversion to a normalised NCHW RGB tensor."""
+    image = np.zeros((2, 2, 3), dtype=np.uint8)
+    image[..., 2] = 255  # red in BGR
+
+    tensor = to_model_input(image)
+
+    assert tensor.shape == (1, 3, 2, 2)
+    assert tensor.dtype == np.float32
+    assert (tensor[0, 0] == 1.0).all() and (tensor[0, 2] == 0.0).all()
+
+
+def test_letterbox_into_buffer():
+    """Test that letterboxing reuses a provided buffer and clears old contents."""
+    buffer = np.zeros((64, 64, 3), dtype=np.uint8)
+
+    boxed, _, _ = letterbox(np.full((64, 32, 3), 255, dtype=np.uint8), 64, out=buffer)
+
+    assert boxed is buffer
+    assert (buffer[:, :16] == LETTERBOX_COLOR).all()
+    assert (buffer[:, 16:48] == 255).all()
+
+
+def test_letterbox_buffer_reused_per_slot():
+    """Test that each batch slot gets its own reusable buffer."""
+    assert letterbox_buffer(64, 0) is letterbox_buffer(64, 0)
+    assert letterbox_buffer(64, 0) is not letterbox_buffer(64, 1)
+    assert letterbox_buffer(32, 0).shape == (32, 32, 3)
+
+
+def test_choose_reduce_factor():
+    """Test picking the largest decode reduction that still covers the model size."""
+    assert choose_reduce_factor(4032, 3024, 640) == 4
+    assert choose_reduce_factor(6000, 4000, 640) == 8
+    assert choose_reduce_factor(1280, 720, 640) == 2
+    assert choose_reduce_factor(1000, 800, 640) == 1
+
+
+def test_decode_image_reduced():
+    """Test that large JPEGs are decoded at reduced scale but report their full size."""
+    image, size = decode_image(encode_jpeg(np.full((1300, 2600, 3), 200, dtype=np.uint8)), target_size=640)
+
+    assert image.shape == (325, 650, 3)
+    assert size == (2600, 1300)
+
+
+def test_decode_image_exif_orientation():
+    """Test that the EXIF orientation is applied (6: rotate 90 degrees clockwise)."""
+    pixels = np.zeros((20, 40, 3), dtype=np.uint8)
+    pixels[:, :20] = 255  # left half white
+
+    image, size = decode_image(encode_jpeg(pixels, orientation=6))
+
+    assert image.shape == (40, 20, 3)
+    assert size == (20, 40)
+    # The left half ends up on top
+    assert image[:16].mean() > 200 and image[24:].mean() < 50
+
+
+def test_decode_image_invalid():
+    """Test that undecodable bytes return None."""
+    assert decode_image(b"") is None
+    assert decode_image(b"not an image") is None
+
+
+def test_prepare_image_maps_boxes_to_original():
+    """Test that letterbox boxes map back to full-resolution coordinates."""
+    boxed, mapping = prepare_image(encode_jpeg(np.zeros((1280, 2560, 3), dtype=np.uint8)), 64)
+
+    assert boxed.shape == (64, 64, 3)
+    assert (mapping.width, mapping.height) == (2560, 1280)
+    # 64x32 content with 16px top padding covers the whole image
+    original = mapping.to_original(np.array([[0, 16, 64, 48], [32, 0, 80, 40]]))
+    assert original.tolist() == [[0, 0, 2560, 1280], [1280, 0, 2560, 960]]
+
+
+def test_plan_tiles():
+    """Test that tiles cover the image edge to edge with at least the requested overlap."""
+    tiles = plan_tiles(1920, 1440, 640, 0.2)
+
+    xs = sorted({x0 for x0, _, _, _ in tiles})
+    ys = sorted({y0 for _, y0, _, _ in tiles})
+    assert xs == [0, 427, 853, 1280]
+    assert ys == [0, 400, 800]
+    assert all(x1 - x0 == 640 and y1 - y0 == 640 for x0, y0, x1, y1 in tiles)
+    assert plan_tiles(500, 300, 640, 0.2) == [(0, 0, 500, 300)]
+
+
+def test_prepare_views_tiles_large_images():
+    """Test that only images above the size threshold get tiles."""
+    large = encode_jpeg(np.zeros((1500, 3000, 3), dtype=np.uint8))
+    small = encode_jpeg(np.zeros((600, 1200, 3), dtype=np.uint8))
+
+    views = prepare_views(large, 640, tile_min_size=2000, tile_resolution=1500)
+    assert views[0][0].shape == (640, 640, 3)
+    # Decoded at half scale (1500x750): 3 x 2 tiles
+    assert len(views) == 7
+    tile, mapping = views[-1]
+    assert tile.shape == (640, 640, 3)
+    assert mapping.to_original(np.array([[0, 0, 640, 640]])).tolist() == [[1720, 220, 3000, 1500]]
+
+    assert len(prepare_views(small, 640, tile_min_size=2000)) == 1
+    assert len(prepare_views(large, 640)) == 1
+    assert prepare_views(b"not an image", 640, tile_min_size=2000) is None
+
+
+def encode_jpeg(pixels, orientation=None):
+    """Encode an RGB array as JPEG, optionally tagged with an EXIF orientation."""
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[EXIF_ORIENTATION] = orientation
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=95, exif=exif.tobytes())
+    return buffer.getvalue()
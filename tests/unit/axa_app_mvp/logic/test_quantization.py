@@ -0,0 +1,59 @@
+from collections import Counter
+from pathlib import Path
+
+import cv2
+import numpy as np
+from axa_app_mvp.logic.hazard_scoring import HazardConfig
+from axa_app_mvp.logic.preprocessing import prepare_image, to_model_input
+from axa_app_mvp.logic.quantization import (
+    calibration_inputs,
+    compare_hazard_counts,
+    hazard_counts,
+    latency_summary,
+    list_images
+)
+
+CONFIG_PATH = Path(__file__).parents[4] / "axa_app_mvp" / "logic" / "config.json"
+
+
+def test_hazard_counts():
+    """Test counting the hazards derived from detections."""
+    config = HazardConfig(CONFIG_PATH)
+    detections = [{"object": "rug"}, {"object": "cord"}, {"object": "box"}, {"object": "person"}]
+
+    assert hazard_counts(detections, config) == Counter({"clutter": 2, "loose_rugs": 1})
+
+
+def test_compare_hazard_counts():
+    """Test counting added plus removed hazards between two models."""
+    fp32 = Counter({"clutter": 2, "loose_rugs": 1})
+
+    assert compare_hazard_counts(fp32, Counter(fp32)) == 0
+    assert compare_hazard_counts(fp32, Counter({"clutter": 1, "poor_lighting": 1})) == 3
+
+
+def test_latency_summary():
+    """Test latency summary statistics."""
+    assert latency_summary([10, 20, 30]) == {"mean": 20.0, "p50": 20.0, "p95": 29.0}
+    assert latency_summary([]) == {"mean": 0.0, "p50": 0.0, "p95": 0.0}
+
+
+def test_list_images(temp_dir):
+    """Test that only image files are picked up, in name order."""
+    for name in ("b.jpg", "a.PNG", "notes.txt"):
+        (temp_dir / name).write_bytes(b"")
+
+    assert [p.name for p in list_images(temp_dir)] == ["a.PNG", "b.jpg"]
+
+
+def test_calibration_inputs_match_serving(temp_dir):
+    """Test that calibration photos are preprocessed like served uploads, skipping unreadable ones."""
+    ok, buf = cv2.imencode(".jpg", np.random.default_rng(0).integers(0, 255, (300, 1200, 3)).astype(np.uint8))
+    (temp_dir / "a.jpg").write_bytes(buf.tobytes())
+    (temp_dir / "b.jpg").write_bytes(b"not an image")
+
+    inputs = list(calibration_inputs(list_images(temp_dir), imgsz=64))
+
+    assert len(inputs) == 1
+    assert inputs[0].shape == (1, 3, 64, 64)
+    np.testing.assert_array_equal(inputs[0], to_model_input(prepare_image(buf.tobytes(), 64)[0]))
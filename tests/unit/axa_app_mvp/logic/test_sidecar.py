@@ -0,0 +1,114 @@
+import threading
+from multiprocessing.connection import Listener
+
+import pytest
+from axa_app_mvp.logic import inference
+from axa_app_mvp.logic.inference import InferenceExecutor
+from axa_app_mvp.logic.sidecar import (
+    SidecarClient,
+    SidecarServer,
+    SidecarUnavailableError,
+    pack_items,
+    parse_address,
+    run_job
+)
+from axa_app_mvp.logic.video import VideoDecodeError
+
+
+@pytest.fixture(autouse=True)
+def echo_detector(monkeypatch):
+    """Replace detection with a function echoing what it received."""
+    monkeypatch.setattr(inference, "detect_encoded_images",
+                        lambda items: [(room_name, bytes(contents)) for room_name, contents in items])
+
+
+@pytest.fixture
+def sidecar(temp_dir):
+    """A sidecar serving on a Unix socket with a thread executor."""
+    executor = InferenceExecutor(kind="thread", workers=2)
+    server = SidecarServer(executor, address=str(temp_dir / "inference.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = SidecarClient(address=str(temp_dir / "inference.sock"), connect_timeout=5)
+    yield client
+    client.close()
+    server.close()
+    thread.join(timeout=5)
+    executor.shutdown()
+
+
+def test_parse_address():
+    """Test Unix socket paths and host:port addresses."""
+    assert parse_address("/tmp/axa.sock") == "/tmp/axa.sock"
+    assert parse_address("127.0.0.1:8765") == ("127.0.0.1", 8765)
+    assert parse_address("localhost:8765") == ("localhost", 8765)
+    assert parse_address("[::1]:8765") == ("::1", 8765)
+    for address in ("0.0.0.0:8765", "10.0.0.5:8765", "inference.internal:8765"):
+        with pytest.raises(ValueError):
+            parse_address(address)
+
+
+def test_tcp_requires_explicit_authkey():
+    """Test that TCP sidecars refuse to run on the default authkey."""
+    executor = InferenceExecutor(kind="inline")
+    with pytest.raises(ValueError, match="INFERENCE_SIDECAR_AUTHKEY"):
+        SidecarServer(executor, address="127.0.0.1:8765", authkey=None)
+    with pytest.raises(ValueError, match="INFERENCE_SIDECAR_AUTHKEY"):
+        SidecarClient(address="127.0.0.1:8765", authkey=None)
+
+    assert SidecarServer(executor, address="127.0.0.1:8765", authkey=b"secret").authkey == b"secret"
+
+
+def test_pack_items_and_run_job():
+    """Test that images round-trip through a shared memory segment."""
+    shm, slices = pack_items([("bathroom", b"abc"), ("hallway", b""), ("steps", b"de")])
+    try:
+        assert slices == [("bathroom", 0, 3), ("hallway", 3, 0), ("steps", 3, 2)]
+        assert run_job("detect_encoded_images", (slices,), shm.name) == [
+            ("bathroom", b"abc"), ("hallway", b""), ("steps", b"de")
+        ]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    assert pack_items([("hallway", b"")])[0] is None
+    with pytest.raises(ValueError):
+        run_job("open", ("/etc/passwd",))
+
+
+def test_sidecar_roundtrip(sidecar, fake_model, monkeypatch):
+    """Test calls through the sidecar, including errors raised in the worker."""
+    monkeypatch.setattr(inference, "_model", fake_model)
+    assert sidecar.call("detect_encoded_images", [("bedroom", b"jpeg bytes")]) == [("bedroom", b"jpeg bytes")]
+    # The connection is reused for the next call
+    assert sidecar.call("detect_encoded_images", [("bedroom", b"")]) == [("bedroom", b"")]
+
+    with pytest.raises(VideoDecodeError):
+        sidecar.call("detect_video", "/does/not/exist.mp4", "hallway")
+
+
+def test_sidecar_unavailable(temp_dir):
+    """Test that a missing sidecar is reported once the connect timeout passes."""
+    client = SidecarClient(address=str(temp_dir / "missing.sock"), connect_timeout=0)
+
+    with pytest.raises(SidecarUnavailableError):
+        client.call("warm_up_model")
+
+
+def test_sidecar_call_timeout(temp_dir):
+    """Test that a sidecar which never answers fails the call instead of blocking it."""
+    address = str(temp_dir / "hung.sock")
+    listener = Listener(address, authkey=b"axa-inference")
+    accepted = []
+    thread = threading.Thread(target=lambda: accepted.append(listener.accept()), daemon=True)
+    thread.start()
+    client = SidecarClient(address=address, connect_timeout=5, call_timeout=0.2)
+
+    try:
+        with pytest.raises(SidecarUnavailableError, match="did not answer"):
+            client.call("warm_up_model")
+    finally:
+        thread.join(timeout=5)
+        for conn in accepted:
+            conn.close()
+        listener.close()
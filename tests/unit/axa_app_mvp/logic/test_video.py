@@ -0,0 +1,114 @@
+import cv2
+import numpy as np
+import pytest
+from axa_app_mvp.logic.video import (
+    KeyframeSelector,
+    ObjectCounter,
+    VideoDecodeError,
+    select_keyframes,
+    sharpness
+)
+
+
+def textured_frame(colour, seed, blur=False):
+    """A coloured frame with fine texture (sharp) or the same texture blurred."""
+    rng = np.random.default_rng(seed)
+    frame = np.clip(np.array(colour, np.int16) + rng.integers(-40, 40, (96, 128, 3)), 0, 255).astype(np.uint8)
+    return cv2.GaussianBlur(frame, (9, 9), 5) if blur else frame
+
+
+def write_video(path, frames, fps=10):
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (128, 96))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+def detection(obj, confidence, x1, y1, x2, y2):
+    return {"object": obj, "location": "hallway", "confidence": confidence,
+            "bbox": {"x1": x1, "y1": y1, "x2": x2, "y2": y2}}
+
+
+def test_sharpness_prefers_focused_frames():
+    """Test that blur lowers the sharpness score."""
+    assert sharpness(textured_frame((120, 120, 120), 0)) > sharpness(textured_frame((120, 120, 120), 0, blur=True))
+
+
+def test_keyframe_selector_picks_sharpest_frame_per_shot():
+    """Test one keyframe per shot, the sharpest frame of that shot."""
+    selector = KeyframeSelector(scene_threshold=0.3, min_sharpness=0)
+    red = [textured_frame((0, 0, 200), 1, blur=True), textured_frame((0, 0, 200), 2),
+           textured_frame((0, 0, 200), 3, blur=True)]
+    blue = [textured_frame((200, 0, 0), 4), textured_frame((200, 0, 0), 5, blur=True)]
+
+    emitted = [selector.push(i, frame) for i, frame in enumerate(red + blue)]
+
+    assert [k[0] if k else None for k in emitted] == [None, None, None, 1, None]
+    assert selector.flush()[0] == 3
+    assert selector.flush() is None
+
+
+def test_keyframe_selector_max_interval_and_blur():
+    """Test that long shots are split and blurry shots dropped."""
+    frames = [textured_frame((90, 90, 90), i) for i in range(5)]
+    selector = KeyframeSelector(scene_threshold=1.1, min_sharpness=0, max_interval=2)
+    assert sum(selector.push(i, f) is not None for i, f in enumerate(frames)) == 2
+
+    selector = KeyframeSelector(min_sharpness=1e9)
+    for i, frame in enumerate(frames):
+        assert selector.push(i, frame) is None
+    assert selector.flush() is None
+
+
+def test_select_keyframes_from_video(temp_dir):
+    """Test streaming keyframe selection from a video file."""
+    path = temp_dir / "walkthrough.avi"
+    frames = [textured_frame((0, 0, 200), i) for i in range(10)] + \
+             [textured_frame((200, 0, 0), i) for i in range(10)]
+    write_video(path, frames)
+
+    keyframes = list(select_keyframes(str(path), sample_fps=5,
+                                      selector=KeyframeSelector(min_sharpness=0)))
+
+    assert len(keyframes) == 2
+    assert keyframes[0][0] < 10 <= keyframes[1][0]
+    assert keyframes[0][1].shape == (96, 128, 3)
+    assert len(list(select_keyframes(str(path), max_keyframes=1, sample_fps=5,
+                                     selector=KeyframeSelector(min_sharpness=0)))) == 1
+
+
+def test_select_keyframes_invalid_video(temp_dir):
+    """Test that unreadable files raise VideoDecodeError."""
+    path = temp_dir / "broken.mp4"
+    path.write_bytes(b"not a video")
+
+    with pytest.raises(VideoDecodeError):
+        list(select_keyframes(str(path)))
+
+
+def test_object_counter_counts_moving_objects_once():
+    """Test that an object whose box moves between keyframes is reported once."""
+    counter = ObjectCounter()
+    counter.update([detection("rug", 0.6, 0, 0, 100, 100), detection("box", 0.5, 200, 200, 250, 250)])
+    # The camera moved: the same rug and box, nowhere near their previous boxes
+    counter.update([detection("rug", 0.9, 300, 150, 420, 260), detection("box", 0.7, 10, 10, 60, 60)])
+    counter.update([])
+
+    objects = counter.objects()
+
+    assert len(counter) == 2
+    assert [(d["object"], d["confidence"]) for d in objects] == [("rug", 0.9), ("box", 0.7)]
+
+
+def test_object_counter_keeps_most_seen_at_once():
+    """Test that each class is counted by the keyframe showing most of it."""
+    counter = ObjectCounter()
+    counter.update([detection("box", 0.9, 0, 0, 10, 10)])
+    counter.update([detection("box", 0.4, 0, 0, 10, 10), detection("box", 0.5, 50, 50, 60, 60),
+                    detection("rug", 0.8, 0, 0, 100, 100)])
+    counter.update([detection("box", 0.8, 0, 0, 10, 10), detection("box", 0.3, 50, 50, 60, 60)])
+
+    objects = counter.objects()
+
+    assert len(counter) == 3
+    assert [(d["object"], d["confidence"]) for d in objects] == [("box", 0.8), ("box", 0.3), ("rug", 0.8)]
@@ -0,0 +1,73 @@
+import pytest
+from axa_app_mvp.utils.metrics import MetricsRegistry, StageTimer
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_and_gauge(registry):
+    """Test counter increments and gauge updates."""
+    counter = registry.counter("requests_total")
+    counter.inc()
+    counter.inc(2)
+    gauge = registry.gauge("queue_depth")
+    gauge.set(5)
+    gauge.dec()
+
+    snapshot = registry.snapshot()
+
+    assert snapshot["requests_total"] == {"type": "counter", "value": 3}
+    assert snapshot["queue_depth"] == {"type": "gauge", "value": 4}
+
+
+def test_labelled_counter(registry):
+    """Test counters split by label."""
+    counter = registry.counter("unmapped_total")
+    counter.inc(label="chair")
+    counter.inc(label="chair")
+    counter.inc(label="tv")
+
+    assert registry.snapshot()["unmapped_total"]["values"] == {"chair": 2, "tv": 1}
+
+
+def test_histogram(registry):
+    """Test histogram buckets and percentiles."""
+    histogram = registry.histogram("latency_ms", buckets=(10, 100))
+    for value in range(1, 101):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot["count"] == 100
+    assert snapshot["buckets"] == {"10": 10, "100": 90, "+Inf": 0}
+    assert snapshot["p50"] == 51
+    assert snapshot["p99"] == 99
+    assert registry.histogram("empty_ms").percentile(50) is None
+
+
+def test_registry_returns_same_metric(registry):
+    """Test that metrics are shared by name and types cannot clash."""
+    assert registry.counter("a") is registry.counter("a")
+    with pytest.raises(ValueError):
+        registry.gauge("a")
+
+
+def test_stage_timer(registry):
+    """Test per-stage and per-room timings feed the stage histograms."""
+    timer = StageTimer("assessment", registry=registry)
+    timer.add("decode", 4.0, room="bathroom")
+    timer.add("decode", 6.0, room="hallway")
+    timer.add("scoring", 1.5)
+    timer.add("scoring", 0.5)
+    with timer.stage("config"):
+        pass
+
+    breakdown = timer.as_dict()
+
+    assert breakdown["rooms"] == {"bathroom": {"decode": 4.0}, "hallway": {"decode": 6.0}}
+    assert breakdown["stages"]["scoring"] == 2.0
+    assert "config" in breakdown["stages"]
+    assert registry.histogram("assessment_decode_ms").count == 2
+    assert registry.histogram("assessment_config_ms").count == 1
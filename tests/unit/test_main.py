@@ -0,0 +1,283 @@
+import asyncio
+import io
+import json
+import time
+
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from axa_app_mvp.logic import inference
+from axa_app_mvp.logic.detection_cache import DetectionCache
+from axa_app_mvp.logic.batching import QueueFullError
+from axa_app_mvp.logic.inference import ModelLoadError
+
+PROFILE = {"mobility": 1, "vision": 0.5, "cognition": 0}
+
+
+def encode(value, shape=(32, 32, 3)):
+    ok, buf = cv2.imencode(".png", np.full(shape, value, np.uint8))
+    assert ok
+    return buf.tobytes()
+
+
+@pytest.fixture
+def fake_model(fake_model_class, fake_result):
+    """Fake detector keyed on the centre pixel: 10 shows a rug and a box, 30 nothing."""
+    return fake_model_class({
+        10: fake_result([1, 2], [0.9, 0.8], [[8, 24, 40, 40], [0, 0, 16, 16]]),
+        30: fake_result([], [], []),
+    }, key=lambda img: int(img[img.shape[0] // 2, img.shape[1] // 2, 0]))
+
+
+@pytest.fixture
+def client(monkeypatch, temp_dir, fake_model):
+    """The app on a fake model, running inference inline and storing state under temp_dir."""
+    monkeypatch.setattr(inference.inference_executor, "kind", "inline")
+    monkeypatch.setattr(inference, "_model", fake_model)
+    monkeypatch.setattr(inference, "_detection_classes", None)
+    monkeypatch.setattr(inference, "INFERENCE_IMGSZ", 64)
+    monkeypatch.setattr(inference, "detection_cache", DetectionCache(16))
+    monkeypatch.setattr(main, "INFERENCE_WARMUP", False)
+    monkeypatch.setattr(main, "OUTPUT_DIR", temp_dir)
+    monkeypatch.setattr(main.job_store, "root", temp_dir / "jobs")
+    monkeypatch.setattr(main.assessment_store, "root", temp_dir / "assessments")
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def test_ready_without_warm_up(client):
+    """Test that the app is ready straight away when warm-up is disabled."""
+    response = client.get("/api/ready")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
+
+
+def test_ready_reports_warm_up_state(monkeypatch):
+    """Test that /api/ready is 503 while warming up or after a failure, and 200 once warm."""
+    client = TestClient(main.app)
+    monkeypatch.setattr(main.app.state, "model_ready", False, raising=False)
+    monkeypatch.setattr(main.app.state, "model_error", None, raising=False)
+
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+
+    main.app.state.model_error = "Failed to load object detection model"
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json() == {"status": "error", "detail": "Failed to load object detection model"}
+
+    main.app.state.model_ready = True
+    assert client.get("/api/ready").status_code == 200
+
+
+def test_warm_up_is_retried(monkeypatch):
+    """Test that a failed warm-up is retried until the model is ready."""
+    attempts = []
+
+    class FlakyExecutor:
+        async def warm_up(self):
+            attempts.append(len(attempts))
+            if len(attempts) < 3:
+                raise ModelLoadError("Failed to load object detection model")
+
+    monkeypatch.setattr(main, "inference_executor", FlakyExecutor())
+    monkeypatch.setattr(main, "INFERENCE_WARMUP_RETRY_S", 0)
+    monkeypatch.setattr(main.app.state, "model_ready", False, raising=False)
+    monkeypatch.setattr(main.app.state, "model_error", None, raising=False)
+
+    asyncio.run(main.warm_up_inference())
+
+    assert len(attempts) == 3
+    assert main.app.state.model_ready
+    assert main.app.state.model_error is None
+
+
+def assess(client, **rooms):
+    files = {room: (f"{room}.png", contents, "image/png") for room, contents in rooms.items()}
+    return client.post("/api/assess-hazards", files=files, data={"profile_json": json.dumps(PROFILE)})
+
+
+def test_rescore_round_trip(client):
+    """Test that a stored assessment re-scores from its detections for a new profile."""
+    report = assess(client, bathroom=encode(10), hallway=encode(30)).json()
+    assert report["rescore_url"] == f"/api/assessments/{report['assessment_id']}/rescore"
+
+    same = client.post(report["rescore_url"], json=PROFILE).json()
+    changed = client.post(report["rescore_url"], json={"mobility": 0, "vision": 0, "cognition": 0}).json()
+
+    assert [d["object"] for d in report["detected_objects"]] == ["rug", "box"]
+    assert same["detected_objects"] == report["detected_objects"]
+    assert same["total_score"] == report["total_score"]
+    assert same["assessment_id"] == report["assessment_id"]
+    assert changed["detected_objects"] == report["detected_objects"]
+    assert changed["total_score"] < report["total_score"]
+    # The detector ran once, for the original upload
+    assert len(inference._model.calls) == 1
+
+
+def test_rescore_unknown_assessment(client):
+    """Test that unknown or malformed assessment ids are a 404."""
+    for assessment_id in ("0" * 32, "not-an-id"):
+        response = client.post(f"/api/assessments/{assessment_id}/rescore", json=PROFILE)
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Assessment not found"
+
+
+def parse_sse(body):
+    events = []
+    for message in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_sends_rooms_then_report(client):
+    """Test the SSE stream: one room event per room, undecodable ones included, then the report."""
+    files = {room: (f"{room}.png", contents, "image/png") for room, contents in
+             {"bathroom": encode(10), "hallway": b"not an image", "bedroom": encode(30)}.items()}
+
+    response = client.post("/api/assess-hazards/stream", files=files,
+                           data={"profile_json": json.dumps(PROFILE)})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [event for event, _ in events] == ["room", "room", "room", "report"]
+    rooms = {data["room"]: data for _, data in events[:3]}
+    assert rooms.keys() == {"bathroom", "hallway", "bedroom"}
+    assert rooms["hallway"] == {"room": "hallway", "status": "error", "message": "Image could not be decoded"}
+    assert [d["object"] for d in rooms["bathroom"]["detected_objects"]] == ["rug", "box"]
+    assert rooms["bedroom"]["hazards"] == []
+
+    report = events[-1][1]
+    assert report["detected_objects"] == rooms["bathroom"]["detected_objects"]
+    assert report["total_score"] == assess(client, bathroom=encode(10)).json()["total_score"]
+    assert "assessment_id" in report
+
+
+def test_assessment_job_runs_to_success(client):
+    """Test that a submitted job is processed in the background and polled to its report."""
+    files = {"bathroom": ("bathroom.png", encode(10), "image/png")}
+    response = client.post("/api/assessment-jobs", files=files, data={"profile_json": json.dumps(PROFILE)})
+
+    assert response.status_code == 202
+    submitted = response.json()
+    assert submitted["status"] == "queued"
+
+    deadline = time.monotonic() + 10
+    while True:
+        job = client.get(submitted["status_url"]).json()
+        if job["status"] in ("succeeded", "failed") or time.monotonic() > deadline:
+            break
+        time.sleep(0.02)
+
+    assert job["status"] == "succeeded"
+    assert job["job_id"] == submitted["job_id"]
+    assert "profile" not in job
+    assert [d["object"] for d in job["result"]["detected_objects"]] == ["rug", "box"]
+    assert client.get("/api/assessment-jobs/" + "0" * 32).status_code == 404
+
+
+def test_full_queue_is_503_with_retry_after(client, monkeypatch):
+    """Test that a request that would overflow the inference queue is turned away with Retry-After."""
+    monkeypatch.setattr(inference.batch_scheduler, "max_queue_depth", 1)
+
+    response = assess(client, bathroom=encode(10), bedroom=encode(30))
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["detail"] == "Hazard detection is busy, please retry shortly"
+    # Nothing was admitted, so nothing reached the detector
+    assert inference._model.calls == []
+    assert assess(client, bathroom=encode(10)).status_code == 200
+
+
+def test_metrics_list_unmapped_model_classes(client):
+    """Test that /api/metrics reports the model classes config.json does not map."""
+    metrics = client.get("/api/metrics").json()
+
+    assert metrics["unmapped_model_classes"] == ["person"]
+    assert metrics["hazard_unmapped_model_classes"]["value"] == 1
+
+
+def walkthrough_video(path, frames=10):
+    """A short MJPG clip of one sharp, textured shot."""
+    frame = np.random.default_rng(0).integers(0, 255, (96, 128, 3)).astype(np.uint8)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 10, (128, 96))
+    for _ in range(frames):
+        writer.write(frame)
+    writer.release()
+    return path.read_bytes()
+
+
+def assess_video(client, contents, room="hallway"):
+    return client.post("/api/assess-hazards/video", files={"video": ("walk.avi", contents, "video/x-msvideo")},
+                       data={"room": room, "profile_json": json.dumps(PROFILE)})
+
+
+def test_video_assessment(client, monkeypatch, temp_dir, fake_model_class, fake_result):
+    """Test assessing a walkthrough clip: keyframes detected, objects counted once, report stored."""
+    model = fake_model_class({0: fake_result([1], [0.9], [[8, 8, 40, 40]])}, key=lambda img: 0)
+    monkeypatch.setattr(inference, "_model", model)
+
+    response = assess_video(client, walkthrough_video(temp_dir / "walk.avi"))
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["video"] == {"keyframes": 1, "unique_objects": 1}
+    assert [(d["object"], d["location"]) for d in report["detected_objects"]] == [("rug", "hallway")]
+    assert report["total_score"] > 0
+    assert "assessment_id" in report
+
+
+def test_video_assessment_rejects_bad_uploads(client, monkeypatch):
+    """Test the 400 for empty or undecodable clips and the 413 for oversized ones."""
+    response = assess_video(client, b"")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No video provided"
+
+    response = assess_video(client, b"not a video")
+    assert response.status_code == 400
+
+    monkeypatch.setattr(main, "VIDEO_MAX_UPLOAD_MB", 1)
+    response = assess_video(client, b"\0" * (2 * main.UPLOAD_CHUNK_SIZE + 1))
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Video larger than 1 MB"
+    assert inference._model.calls == []
+
+
+def test_copy_upload_stops_at_limit(temp_dir):
+    """Test that an oversized upload is abandoned once the limit is passed, not copied in full."""
+    source = io.BytesIO(b"x" * (3 * main.UPLOAD_CHUNK_SIZE))
+    with open(temp_dir / "copy", "wb") as target:
+        assert main.copy_upload(source, target, main.UPLOAD_CHUNK_SIZE) is None
+    assert source.tell() == 2 * main.UPLOAD_CHUNK_SIZE
+
+    source = io.BytesIO(b"x" * 10)
+    with open(temp_dir / "copy", "wb") as target:
+        assert main.copy_upload(source, target, 10) == 10
+    assert (temp_dir / "copy").read_bytes() == b"x" * 10
+
+
+@pytest.mark.parametrize("error, status_code, detail", [
+    (QueueFullError(7), 503, "Hazard detection is busy, please retry shortly"),
+    (ModelLoadError("Failed to load object detection model"), 500, "Failed to load object detection model"),
+])
+def test_video_assessment_errors(client, monkeypatch, temp_dir, error, status_code, detail):
+    """Test that a full queue and a missing model map to 503 with Retry-After and 500."""
+    async def scan_video(path, room_name):
+        raise error
+
+    monkeypatch.setattr(main, "scan_video", scan_video)
+
+    response = assess_video(client, walkthrough_video(temp_dir / "walk.avi"))
+
+    assert response.status_code == status_code
+    assert response.json()["detail"] == detail
+    if status_code == 503:
+        assert response.headers["Retry-After"] == "7"